@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
-import yaml
 from jinja2 import Environment, FileSystemLoader
 import argparse, os, sys, ipaddress
+from functools import lru_cache
+
+from scripts.models import Device, ValidationError
 
 REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
 
@@ -70,38 +72,59 @@ def choose_template(env, vendor, dev_type):
         f"Last error: {last_err}"
     )
 
-def main():
-    ap = argparse.ArgumentParser(description="Render device config from YAML + Jinja2.")
-    ap.add_argument("--config", required=True,
-                    help="Path to YAML (e.g., data/devices/R1_access.yaml)")
-    args = ap.parse_args()
-
-    yaml_path = os.path.abspath(args.config)
-    if not os.path.exists(yaml_path):
-        sys.exit(f"YAML not found: {yaml_path}")
+@lru_cache(maxsize=None)
+def environment() -> Environment:
+    # One Environment per process: templates are compiled once and only
+    # re-read when their file changes (auto_reload), which matters when
+    # scripts/ztp.py renders on demand.
+    env = Environment(loader=FileSystemLoader(DEVICE_TPL_DIR),
+                      trim_blocks=True, lstrip_blocks=True)
+    return add_helpers(env)
 
-    with open(yaml_path) as f:
-        data = yaml.safe_load(f) or {}
+def render(yaml_path: str):
+    """
+    Validate <name>_<type>.yaml and render it.
+    Returns (output file name, rendered text, template name); SystemExit on bad input.
+    """
+    # One validation/normalisation pass: drops the GUI's empty placeholder rows
+    # so the templates never see `vlan None` / `ip route None None`.
+    try:
+        device = Device.from_yaml_file(yaml_path).to_dict()
+    except ValidationError as e:
+        raise SystemExit(f"Invalid device data in {yaml_path}:\n  " + "\n  ".join(e.errors))
+    data = {"device": device}
 
-    device = data.get("device", {})
     base = os.path.splitext(os.path.basename(yaml_path))[0]
     if "_" not in base:
-        sys.exit("YAML filename must be <name>_<type>.yaml (e.g., R1_access.yaml)")
+        raise SystemExit("YAML filename must be <name>_<type>.yaml (e.g., R1_access.yaml)")
     name, dev_type = base.split("_", 1)
     dev_type = dev_type.lower()
     vendor = normalize_vendor(device.get("vendor"))
 
-    env = Environment(loader=FileSystemLoader(DEVICE_TPL_DIR),
-                      trim_blocks=True, lstrip_blocks=True)
-    env = add_helpers(env)
-
-    tpl, tpl_name = choose_template(env, vendor, dev_type)
-    rendered = tpl.render(data)
+    tpl, tpl_name = choose_template(environment(), vendor, dev_type)
+    return f"{device.get('name', name)}.cfg", tpl.render(data), tpl_name
 
-    out_name = f"{device.get('name', name)}.cfg"
-    out_path = os.path.join(OUTPUT_DIR, out_name)
-    with open(out_path, "w") as f:
+def write_output(out_name: str, rendered: str, out_dir: str = OUTPUT_DIR) -> str:
+    """Write <out_dir>/<out_name> atomically (a ZTP fetch never sees half a file)."""
+    out_path = os.path.join(out_dir, out_name)
+    tmp = out_path + ".tmp"
+    with open(tmp, "w") as f:
         f.write(rendered)
+    os.replace(tmp, out_path)
+    return out_path
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Render device config from YAML + Jinja2.")
+    ap.add_argument("--config", required=True,
+                    help="Path to YAML (e.g., data/devices/R1_access.yaml)")
+    args = ap.parse_args(argv)
+
+    yaml_path = os.path.abspath(args.config)
+    if not os.path.exists(yaml_path):
+        sys.exit(f"YAML not found: {yaml_path}")
+
+    out_name, rendered, tpl_name = render(yaml_path)
+    out_path = write_output(out_name, rendered)
 
     print(f"[ok] wrote {out_path} using {tpl_name}")
 
@@ -1,13 +1,22 @@
-import os, glob, subprocess, yaml
-from flask import Flask, render_template, request, redirect, jsonify
+import os, sys, glob, json, time, threading, subprocess
+from flask import Flask, Response, render_template, request, redirect, jsonify, send_file
 
 # ---------- Paths (repo-relative) ----------
 HERE = os.path.dirname(os.path.abspath(__file__))
 REPO_ROOT = os.path.abspath(os.path.join(HERE, ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from scripts.models import Device, ValidationError
+from scripts.eventstore import DB_PATH as EVENTS_DB, EventStore
+from scripts.routes import RouteIndex
+from scripts.ztp import ConfigStore, RenderError, open_entry, request_keys
+
 DATA_DEVICES_DIR = os.path.join(REPO_ROOT, "data", "devices")
 GENERATED_CONFIGS_DIR = os.path.join(REPO_ROOT, "generated-configs")
 TEMPLATES_DIR = os.path.join(REPO_ROOT, "templates")
 SCRIPT_PATH = os.path.join(REPO_ROOT, "generate_config.py")
+COMPLIANCE_REPORT = os.path.join(REPO_ROOT, "reports", "compliance.json")
 os.makedirs(DATA_DEVICES_DIR, exist_ok=True)
 os.makedirs(GENERATED_CONFIGS_DIR, exist_ok=True)
 
@@ -21,13 +30,11 @@ def list_devices():
     rows = []
     for y in sorted(glob.glob(os.path.join(DATA_DEVICES_DIR, "*.yaml"))):
         try:
-            with open(y) as f:
-                d = yaml.safe_load(f) or {}
-            dev = d.get("device", {})
+            dev = Device.from_yaml_file(y)
             rows.append({
-                "name": dev.get("name"),
-                "vendor": dev.get("vendor"),
-                "mgmt_ip": dev.get("mgmt_ip"),
+                "name": dev.name,
+                "vendor": dev.vendor,
+                "mgmt_ip": dev.mgmt_ip,
                 "yaml_file": os.path.basename(y),
             })
         except Exception:
@@ -44,8 +51,131 @@ def index():
 def grafana():
     return redirect(f"{GRAFANA_URL}/d/{GRAFANA_DASH_UID}/device-status?orgId=1&refresh=5s")
 
-def clean_empty_fields(x):
-    return None if (x is None or str(x).strip() == "") else x
+@app.route("/compliance")
+def compliance():
+    # Same report Jenkins/cron produce; ?refresh=1 re-runs the (cached) engine
+    if request.args.get("refresh") or not os.path.exists(COMPLIANCE_REPORT):
+        subprocess.run(["python3", "-m", "scripts.compliance", "--json", COMPLIANCE_REPORT,
+                        "--fail-on", "never"], cwd=REPO_ROOT, stdout=subprocess.DEVNULL)
+    try:
+        with open(COMPLIANCE_REPORT) as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        report = None
+    if request.args.get("format") == "json":
+        return jsonify(report or {})
+    return render_template("compliance.html", report=report)
+
+# ---------- Health (state events from scripts/ingest.py) ----------
+_events = None
+
+def event_store():
+    global _events
+    if _events is None:
+        _events = EventStore(EVENTS_DB)
+    return _events
+
+@app.route("/health")
+def health():
+    store = event_store()
+    state = store.current_state(request.args.get("device"))
+    recent = store.query(device=request.args.get("device"), max_severity=4, limit=100)
+    if request.args.get("format") == "json":
+        return jsonify({"state": state, "recent": recent, "last_id": store.last_id()})
+    down = [s for s in state if s["state"] != "up"]
+    return render_template("health.html", state=state, down=down, recent=recent,
+                           last_id=store.last_id())
+
+@app.route("/health/stream")
+def health_stream():
+    """Server-sent events: one `data:` line per new link/OSPF/BGP event."""
+    store = event_store()
+    after = request.headers.get("Last-Event-ID", type=int) or request.args.get("after", type=int)
+    if after is None:
+        after = store.last_id()
+
+    def stream(after):
+        while True:
+            rows = store.changes(after)
+            for r in rows:
+                yield f"id: {r['id']}\ndata: {json.dumps(r)}\n\n"
+            if rows:
+                after = rows[-1]["id"]
+            else:
+                yield ": keepalive\n\n"
+                time.sleep(1)
+
+    return Response(stream(after), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache"})
+
+# ---------- Path trace over the route index (scripts/routes.py) ----------
+_routes = None
+_routes_lock = threading.Lock()
+
+@app.route("/trace")
+def trace():
+    global _routes
+    src = request.args.get("src")
+    dst = (request.args.get("dst") or "").strip()
+    vrf = request.args.get("vrf") or "default"
+    paths = error = None
+    with _routes_lock:
+        if _routes is None:
+            _routes = RouteIndex()
+        _routes.refresh()          # only re-reads tables that changed on disk
+        _routes.load_owners_from_configs()     # likewise only when the newest goldens change
+        devices = _routes.devices()
+        if src and dst:
+            if src not in _routes.routes:
+                error = f"No route table for {src} (run: python3 -m scripts.netman routes collect)"
+            else:
+                try:
+                    paths = _routes.trace(src, dst, vrf)
+                except ValueError:
+                    error = f"Not an IPv4 address: {dst}"
+    if request.args.get("format") == "json":
+        return jsonify({"src": src, "dst": dst, "vrf": vrf, "paths": paths, "error": error}), (400 if error else 200)
+    return render_template("trace.html", devices=devices, src=src, dst=dst, vrf=vrf,
+                           paths=paths, error=error)
+
+# ---------- ZTP: day-0 configs by hostname / serial / MAC (scripts/ztp.py) ----------
+_ztp = ConfigStore(GENERATED_CONFIGS_DIR, DATA_DEVICES_DIR,
+                   render=os.environ.get("NETMAN_ZTP_RENDER", "1") != "0")
+
+@app.route("/ztp", defaults={"key": None})
+@app.route("/ztp/<key>")
+def ztp_config(key):
+    try:
+        entry = _ztp.lookup(request_keys(key, request.args, request.headers))
+    except RenderError as e:
+        return Response(f"render failed: {e.kind}\n", status=500, mimetype="text/plain")
+    if entry is None:
+        return Response("unknown device\n", status=404, mimetype="text/plain")
+    # conditional=True answers If-None-Match with 304; the file itself goes
+    # through the WSGI server's file_wrapper (sendfile under gunicorn). The
+    # handle is the one entry.etag belongs to, even if a re-render lands now.
+    resp = send_file(open_entry(entry), mimetype="text/plain", etag=entry.etag,
+                     last_modified=entry.mtime, conditional=True)
+    if resp.status_code == 200:
+        resp.content_length = entry.stat[1]
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+def form_rows(**columns):
+    """
+    Zip parallel form lists into row dicts, e.g.
+    form_rows(prefix='staticPrefix[]', next_hop='staticNextHop[]').
+    Values are passed through raw; Device.from_dict blanks/validates them and
+    drops rows left completely empty.
+    """
+    lists = {key: request.form.getlist(field) for key, field in columns.items()}
+    n = max((len(v) for v in lists.values()), default=0)
+    return [{key: (v[i] if i < len(v) else None) for key, v in lists.items()} for i in range(n)]
+
+def nest_ospfv3_area(rows, key='ospfv3_area'):
+    for row in rows:
+        row['ospfv3'] = {'area': row.pop(key)}
+    return rows
 
 @app.route('/add-device', methods=['GET', 'POST'])
 def add_device():
@@ -54,136 +184,73 @@ def add_device():
                                vendors=['arista_eos', 'cisco_ios', 'juniper_junos'])
     # POST
     router_type = request.form.get('routerType', '').strip()   # Access or Core
-    if not router_type:
+    if router_type not in ('Access', 'Core'):
         return jsonify({'status':'error','message':'Select Access or Core'}), 400
 
-    device = {
-        "name": request.form.get('deviceName','').strip(),
-        "vendor": request.form.get('vendor','').strip(),
-        "mgmt_ip": request.form.get('wanIp','').strip(),
-        "site": clean_empty_fields(request.form.get('site'))
+    raw = {
+        "name": request.form.get('deviceName'),
+        "vendor": request.form.get('vendor'),
+        "mgmt_ip": request.form.get('wanIp'),
+        "site": request.form.get('site'),
     }
 
     if router_type == 'Access':
-        device.update({
-            'vlans': [
-                {
-                    'id': request.form.getlist('vlanId[]')[i],
-                    'name': clean_empty_fields(request.form.getlist('vlanName[]')[i]),
-                    'ipv4_subnet': clean_empty_fields(request.form.getlist('ipv4Subnet[]')[i]),
-                    'ipv6_subnet': clean_empty_fields(request.form.getlist('ipv6Subnet[]')[i]),
-                    'ospfv3': {'area': clean_empty_fields(request.form.getlist('ospfv3Area[]')[i])},
-                    'dhcp_enabled': request.form.getlist('dhcpEnabled[]')[i] == 'true',
-                    'dhcp_range_start': clean_empty_fields(request.form.getlist('dhcpRangeStart[]')[i]),
-                    'dhcp_range_end': clean_empty_fields(request.form.getlist('dhcpRangeEnd[]')[i]),
-                    'default_gateway': clean_empty_fields(request.form.getlist('defaultGateway[]')[i]),
-                    'dhcpv6_range_start': clean_empty_fields(request.form.getlist('dhcpv6RangeStart[]')[i]),
-                    'dhcpv6_range_end': clean_empty_fields(request.form.getlist('dhcpv6RangeEnd[]')[i]),
-                    'ipv4_virtual_router_address': clean_empty_fields(request.form.getlist('ipv4VRouter[]')[i]),
-                    'ipv6_virtual_router_address': clean_empty_fields(request.form.getlist('ipv6VRouter[]')[i])
-                } for i in range(len(request.form.getlist('vlanId[]')))
-            ],
-            'interfaces': [
-                {
-                    'name': request.form.getlist('interfaceName[]')[i],
-                    'ipv4': clean_empty_fields(request.form.getlist('ipv4[]')[i]),
-                    'ipv6': clean_empty_fields(request.form.getlist('ipv6[]')[i]),
-                    'mtu': clean_empty_fields(request.form.getlist('mtu[]')[i]) if 'mtu[]' in request.form else None,
-                    'switchport_mode': clean_empty_fields(request.form.getlist('switchportMode[]')[i])
-                } for i in range(len(request.form.getlist('interfaceName[]')))
-            ],
+        raw.update({
+            'vlans': nest_ospfv3_area(form_rows(
+                id='vlanId[]', name='vlanName[]',
+                ipv4_subnet='ipv4Subnet[]', ipv6_subnet='ipv6Subnet[]',
+                ospfv3_area='ospfv3Area[]', dhcp_enabled='dhcpEnabled[]',
+                dhcp_range_start='dhcpRangeStart[]', dhcp_range_end='dhcpRangeEnd[]',
+                default_gateway='defaultGateway[]',
+                dhcpv6_range_start='dhcpv6RangeStart[]', dhcpv6_range_end='dhcpv6RangeEnd[]',
+                ipv4_virtual_router_address='ipv4VRouter[]',
+                ipv6_virtual_router_address='ipv6VRouter[]')),
+            'interfaces': form_rows(name='interfaceName[]', ipv4='ipv4[]', ipv6='ipv6[]',
+                                    mtu='mtu[]', switchport_mode='switchportMode[]'),
             'routes': {
-                'static': [
-                    {'prefix': clean_empty_fields(request.form.getlist('staticPrefix[]')[i]),
-                     'next_hop': clean_empty_fields(request.form.getlist('staticNextHop[]')[i])}
-                    for i in range(len(request.form.getlist('staticPrefix[]')))
-                ],
-                'ipv6_static': [
-                    {'prefix': clean_empty_fields(request.form.getlist('ipv6StaticPrefix[]')[i]),
-                     'next_hop': clean_empty_fields(request.form.getlist('ipv6StaticNextHop[]')[i])}
-                    for i in range(len(request.form.getlist('ipv6StaticPrefix[]')))
-                ]
+                'static': form_rows(prefix='staticPrefix[]', next_hop='staticNextHop[]'),
+                'ipv6_static': form_rows(prefix='ipv6StaticPrefix[]', next_hop='ipv6StaticNextHop[]'),
             },
             'routing_protocols': {
-                'ospf': {
-                    'id': clean_empty_fields(request.form.get('ospfId')),
-                    'networks': [
-                        {'prefix': clean_empty_fields(request.form.getlist('ospfNetwork[]')[i]),
-                         'area': clean_empty_fields(request.form.getlist('ospfArea[]')[i])}
-                        for i in range(len(request.form.getlist('ospfNetwork[]')))
-                    ]
-                },
-                'rip': {
-                    'networks': [
-                        {'prefix': clean_empty_fields(request.form.getlist('ripNetwork[]')[i])}
-                        for i in range(len(request.form.getlist('ripNetwork[]')))
-                    ]
-                }
-            }
+                'ospf': {'id': request.form.get('ospfId'),
+                         'networks': form_rows(prefix='ospfNetwork[]', area='ospfArea[]')},
+                'rip': {'networks': form_rows(prefix='ripNetwork[]')},
+            },
         })
-        yaml_path = os.path.join(DATA_DEVICES_DIR, f"{device['name']}_access.yaml")
 
     elif router_type == 'Core':
-        device.update({
-            'vlans': [
-                {
-                    'id': request.form.getlist('vlanIdCore[]')[i],
-                    'name': clean_empty_fields(request.form.getlist('vlanNameCore[]')[i]),
-                    'ipv4_subnet': clean_empty_fields(request.form.getlist('ipv4SubnetCore[]')[i]),
-                    'ipv6_subnet': clean_empty_fields(request.form.getlist('ipv6SubnetCore[]')[i]),
-                    'ospfv3': {'area': clean_empty_fields(request.form.getlist('ospfv3AreaCore[]')[i])}
-                } for i in range(len(request.form.getlist('vlanIdCore[]')))
-            ],
-            'interfaces': [
-                {
-                    'name': request.form.getlist('interfaceNameCore[]')[i],
-                    'ipv4': clean_empty_fields(request.form.getlist('ipv4Core[]')[i]),
-                    'ipv6': clean_empty_fields(request.form.getlist('ipv6Core[]')[i]),
-                    'switchport_mode': clean_empty_fields(request.form.getlist('switchportModeCore[]')[i]),
-                    'ospfv3_area': clean_empty_fields(request.form.getlist('ospfv3AreaInterfaceCore[]')[i])
-                } for i in range(len(request.form.getlist('interfaceNameCore[]')))
-            ],
+        raw.update({
+            'vlans': nest_ospfv3_area(form_rows(
+                id='vlanIdCore[]', name='vlanNameCore[]',
+                ipv4_subnet='ipv4SubnetCore[]', ipv6_subnet='ipv6SubnetCore[]',
+                ospfv3_area='ospfv3AreaCore[]')),
+            'interfaces': form_rows(name='interfaceNameCore[]', ipv4='ipv4Core[]', ipv6='ipv6Core[]',
+                                    switchport_mode='switchportModeCore[]',
+                                    ospfv3_area='ospfv3AreaInterfaceCore[]'),
             'routes': {
-                'static': [
-                    {'prefix': clean_empty_fields(request.form.getlist('staticPrefixCore[]')[i]),
-                     'next_hop': clean_empty_fields(request.form.getlist('staticNextHopCore[]')[i])}
-                    for i in range(len(request.form.getlist('staticPrefixCore[]')))
-                ],
-                'ipv6_static': [
-                    {'prefix': clean_empty_fields(request.form.getlist('ipv6StaticPrefixCore[]')[i]),
-                     'next_hop': clean_empty_fields(request.form.getlist('ipv6StaticNextHopCore[]')[i])}
-                    for i in range(len(request.form.getlist('ipv6StaticPrefixCore[]')))
-                ]
+                'static': form_rows(prefix='staticPrefixCore[]', next_hop='staticNextHopCore[]'),
+                'ipv6_static': form_rows(prefix='ipv6StaticPrefixCore[]', next_hop='ipv6StaticNextHopCore[]'),
             },
             'routing_protocols': {
-                'ospf': {
-                    'id': clean_empty_fields(request.form.get('ospfId')),
-                    'networks': [
-                        {'prefix': clean_empty_fields(request.form.getlist('ospfNetworkCore[]')[i]),
-                         'area': clean_empty_fields(request.form.getlist('ospfAreaCore[]')[i])}
-                        for i in range(len(request.form.getlist('ospfNetworkCore[]')))
-                    ]
-                },
-                'ospfv3': {'address_family': 'ipv6', 'redistribute_bgp': 'true'},
-                'bgp': {
-                    'as': clean_empty_fields(request.form.get('bgpAsCore')),
-                    'neighbors': [
-                        {'ip': clean_empty_fields(request.form.getlist('neighborIpCore[]')[i]),
-                         'remote_as': clean_empty_fields(request.form.getlist('remoteAsCore[]')[i])}
-                        for i in range(len(request.form.getlist('neighborIpCore[]')))
-                    ],
-                    'networks': [
-                        clean_empty_fields(request.form.getlist('bgpNetworkPrefixCore[]')[i])
-                        for i in range(len(request.form.getlist('bgpNetworkPrefixCore[]')))
-                    ]
-                }
-            }
+                'ospf': {'id': request.form.get('ospfId'),
+                         'networks': form_rows(prefix='ospfNetworkCore[]', area='ospfAreaCore[]')},
+                'ospfv3': {'address_family': 'ipv6', 'redistribute_bgp': True},
+                'bgp': {'as': request.form.get('bgpAsCore'),
+                        'neighbors': form_rows(ip='neighborIpCore[]', remote_as='remoteAsCore[]'),
+                        'networks': request.form.getlist('bgpNetworkPrefixCore[]')},
+            },
         })
-        yaml_path = os.path.join(DATA_DEVICES_DIR, f"{device['name']}_core.yaml")
+
+    # One validation/normalisation pass (blank fields -> None, placeholder rows dropped)
+    try:
+        device = Device.from_dict(raw)
+    except ValidationError as e:
+        return jsonify({'status':'error','message':'Invalid device data','errors':e.errors}), 400
+    yaml_path = os.path.join(DATA_DEVICES_DIR, f"{device.name}_{router_type.lower()}.yaml")
 
     # Save YAML
     with open(yaml_path, "w") as f:
-        yaml.dump({'device': device}, f, sort_keys=False)
+        f.write(device.to_yaml())
 
     # Render .cfg via generator
     try:
@@ -193,7 +260,7 @@ def add_device():
 
     # Commit & push (best effort; will silently no-op if nothing to commit)
     subprocess.run(["git", "add", "."], cwd=REPO_ROOT)
-    subprocess.run(["git", "commit", "-m", f"add: {device['name']} {router_type} yaml+cfg"], cwd=REPO_ROOT)
+    subprocess.run(["git", "commit", "-m", f"add: {device.name} {router_type} yaml+cfg"], cwd=REPO_ROOT)
     subprocess.run(["git", "push"], cwd=REPO_ROOT)
 
     return jsonify({"status":"ok","yaml":os.path.basename(yaml_path)})
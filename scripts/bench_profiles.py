@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Benchmark the safe vs fast Netmiko session profiles against live or lab
+(containerlab cEOS) devices, or against recorded sessions replayed locally:
+
+  python3 -m scripts.bench_profiles --csv data/ssh/sshInfo.csv --only R1 R2 --repeat 3
+  python3 -m scripts.bench_profiles --replay --rtt 20               # golden configs + canned output
+  python3 -m scripts.bench_profiles --replay ~/advanced-netman/logs/netmiko/health_10.100.0.7.log
+  python3 -m scripts.bench_profiles --replay R1.json --rtt 5 80     # one run per RTT (ms)
+
+For each device and profile it opens a session, runs the backup prep
+commands, the main show command and the health-check commands, and records
+per-phase spans (scripts/timing.py). Prints wall time per run, the
+p50/p95 per phase for each profile, and the fast/safe speed-up. Add
+NETMAN_TRACE_FILE=bench.jsonl to keep every span.
+
+--replay runs the real netmiko driver for the device type (prompt
+detection, fast_cli, send_command_timing's quiet-period wait, ...) over a
+ReplayChannel instead of SSH. The channel answers each command line with
+its echo, the recorded output and the prompt, readable one RTT (plus
+size / --bandwidth) after the write. Recordings are netmiko session logs
+(the `session_log` files backup/health already write) or JSON
+{"prompt": "R1", "device_type": "arista_eos", "rtt_ms": 20,
+ "outputs": {"<command>": "<output>", ...}}; commands missing from a
+recording get an empty reply. With no files, every device's newest golden
+config is replayed as its running-config plus canned health output.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+try:
+    from scripts import compliance, config, sessions, timing
+except ImportError:  # run directly from scripts/
+    import compliance, config, sessions, timing
+
+HEALTH_CMDS = [
+    "show processes top once | grep Cpu",
+    "show ip ospf neighbor",
+    "show ip bgp summary",
+    "show ip route",
+]
+
+
+# Replies for the session-setup commands netmiko's drivers wait for by pattern
+SETUP_REPLIES = {
+    "terminal width 511": "Width set to 511 columns.",
+    "terminal length 0": "Pagination disabled.",
+    "set cli screen-length 0": "Screen length set to 0",
+}
+
+CANNED_HEALTH = {
+    "show processes top once | grep Cpu":
+        "%Cpu(s):  3.2 us,  5.6 sy,  0.0 ni, 90.9 id,  0.0 wa,  0.2 hi,  0.1 si,  0.0 st",
+    "show ip ospf neighbor":
+        "Neighbor ID     Instance VRF      Pri State                  Dead Time   Address         Interface\n"
+        "2.2.2.2         1        default  1   FULL/DR                00:00:35    10.0.12.2       Ethernet1\n"
+        "3.3.3.3         1        default  1   FULL/BDR               00:00:31    10.0.13.2       Ethernet2",
+    "show ip bgp summary":
+        "BGP summary information for VRF default\n"
+        "Router identifier 1.1.1.1, local AS number 65001\n"
+        "  Neighbor         V  AS           MsgRcvd   MsgSent  InQ OutQ  Up/Down State   PfxRcd PfxAcc\n"
+        "  10.0.12.2        4  65002            210       212    0    0 03:05:01 Estab   42     42",
+    "show ip route": "\n".join(
+        f" O        10.{i // 256}.{i % 256}.0/24 [110/20] via 10.0.12.2, Ethernet1" for i in range(2000)),
+}
+
+
+class ReplayChannel:
+    """
+    netmiko Channel stand-in: each command line written gets its echo, the
+    recorded output and the prompt back, readable `rtt` seconds (plus
+    size / bandwidth) after the write.
+    """
+
+    def __init__(self, prompt: str, outputs: Dict[str, str], rtt: float, bandwidth: float):
+        self.prompt = prompt
+        self.outputs = outputs
+        self.rtt = rtt
+        self.bandwidth = bandwidth
+        self._line = ""
+        self._pending: List = []        # (ready_at, text)
+        self._lock = threading.Lock()
+
+    def write_channel(self, out_data: str) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            self._line += out_data
+            while "\n" in self._line:
+                line, self._line = self._line.split("\n", 1)
+                cmd = line.strip("\r").strip()
+                out = self.outputs.get(cmd, SETUP_REPLIES.get(cmd, ""))
+                reply = f"{cmd}\n{out}\n{self.prompt}" if cmd else f"\n{self.prompt}"
+                self._pending.append((now + self.rtt + len(reply) / self.bandwidth, reply))
+
+    def read_channel(self) -> str:
+        now = time.perf_counter()
+        with self._lock:
+            ready = [text for at, text in self._pending if at <= now]
+            self._pending = [(at, text) for at, text in self._pending if at > now]
+        return "".join(ready)
+
+    read_buffer = read_channel
+
+
+def parse_session_log(text: str) -> Dict:
+    """Recording from a netmiko session log: prompt, then command -> output."""
+    m = re.search(r"^([\w.-]+)(?:\([^)\n]*\))?[>#]", text, re.M)
+    if not m:
+        raise ValueError("no prompt found in session log")
+    host = m.group(1)
+    prompt_line = re.compile(rf"^{re.escape(host)}(?:\([^)\n]*\))?[>#](.*)$")
+    outputs: Dict[str, str] = {}
+    cmd, lines = None, []
+    for line in text.replace("\r", "").splitlines():
+        pm = prompt_line.match(line)
+        if pm:
+            if cmd:
+                outputs.setdefault(cmd, "\n".join(lines))
+            cmd, lines = pm.group(1).strip() or None, []
+        elif cmd:
+            lines.append(line)
+    return {"prompt": host, "outputs": outputs}
+
+
+def load_recording(path: str) -> Dict:
+    with open(path, errors="replace") as f:
+        text = f.read()
+    rec = json.loads(text) if path.endswith(".json") else parse_session_log(text)
+    rec.setdefault("device_type", "arista_eos")
+    return rec
+
+
+def golden_recordings() -> List[Dict]:
+    """One recording per device: newest golden config as running-config + canned health output."""
+    recs = []
+    for path in compliance.latest_golden(compliance.SOURCES["golden"]):
+        with open(path) as f:
+            running = f.read()
+        name = compliance.GOLDEN_NAME_RE.match(os.path.basename(path)).group("device")
+        recs.append({"prompt": name, "device_type": "arista_eos",
+                     "outputs": {**CANNED_HEALTH, "show running-config": running}})
+    return recs
+
+
+def replay_connect(rec: Dict, rtt: float, bandwidth: float) -> Callable:
+    """ConnectHandler stand-in running the real netmiko driver over a ReplayChannel."""
+    from netmiko.ssh_dispatcher import CLASS_MAPPER
+
+    class ReplayConnection(CLASS_MAPPER[rec["device_type"]]):
+        def establish_connection(self, width: int = 511, height: int = 1000) -> None:
+            self.channel = ReplayChannel(f"{rec['prompt']}#", rec["outputs"], rtt, bandwidth)
+
+    def connect(**params):
+        params = {k: v for k, v in params.items() if k != "session_log"}
+        return ReplayConnection(**params)
+    return connect
+
+
+def run_once(name: str, meta: Dict[str, str], profile: str,
+             connect: Optional[Callable] = None) -> float:
+    """One full session (connect, prep, commands, disconnect); returns seconds."""
+    dtype = meta["Device_Type"]
+    cmds = config.SHOW_CMDS[dtype]
+    params = {
+        "device_type": dtype,
+        "host": meta["IP"],
+        "username": meta["Username"],
+        "password": meta["Password"],
+        "timeout": 60,
+    }
+    t0 = time.perf_counter()
+    with timing.span(f"bench:{profile}", device=name, vendor=dtype):
+        with sessions.open_session(connect or config.get_connect_handler(), params, profile) as s:
+            with timing.span("enable"):
+                s.enable()
+            for p in cmds["prep"]:
+                with timing.span("prep", cmd=p):
+                    s.prep(p)
+            with timing.span("command", cmd=cmds["run"]):
+                s.send(cmds["run"], read_timeout=90)
+            for cmd in HEALTH_CMDS:
+                with timing.span("command", cmd=cmd):
+                    s.enable()
+                    s.send(cmd)
+    return time.perf_counter() - t0
+
+
+def bench(targets: Dict[str, Dict[str, str]], profiles: List[str], repeat: int,
+          connects: Optional[Dict[str, Callable]] = None) -> Dict[str, List[float]]:
+    """Run every target `repeat` times per profile; prints per-run and per-phase timings."""
+    walls: Dict[str, List[float]] = {p: [] for p in profiles}
+    for profile in profiles:
+        timing.reset()
+        for name, meta in targets.items():
+            for i in range(repeat):
+                try:
+                    wall = run_once(name, meta, profile, (connects or {}).get(name))
+                except Exception as e:
+                    print(f"{name:<8} {profile:<5} run {i + 1}: FAILED ({e})")
+                    continue
+                walls[profile].append(wall)
+                print(f"{name:<8} {profile:<5} run {i + 1}: {wall:7.2f} s")
+
+        print(f"\n[{profile}] {'phase':<14} {'vendor':<14} {'n':>4} {'p50 ms':>10} {'p95 ms':>10}")
+        for row in timing.summary():
+            print(f"[{profile}] {row['phase']:<14} {row['vendor']:<14} {row['count']:>4} "
+                  f"{row['p50_ms']:>10.1f} {row['p95_ms']:>10.1f}")
+        print()
+
+    for profile, values in walls.items():
+        if values:
+            print(f"{profile:<5} median session: {statistics.median(values):.2f} s over {len(values)} runs")
+    if walls.get("safe") and walls.get("fast"):
+        speedup = statistics.median(walls["safe"]) / statistics.median(walls["fast"])
+        print(f"fast is {speedup:.1f}x the speed of safe")
+    return walls
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Benchmark safe vs fast session profiles.")
+    ap.add_argument("--csv", default=str(config.CSV_PATH), help="Path to sshInfo.csv")
+    ap.add_argument("--only", nargs="*", help="Only these device names")
+    ap.add_argument("--repeat", type=int, default=3, help="Runs per device and profile")
+    ap.add_argument("--profiles", nargs="+", default=["safe", "fast"],
+                    choices=sorted(sessions.PROFILES))
+    ap.add_argument("--replay", nargs="*", metavar="RECORDING",
+                    help="Replay recorded sessions (netmiko session logs or JSON) instead of SSH; "
+                         "no files: golden configs + canned health output")
+    ap.add_argument("--rtt", nargs="+", type=float, metavar="MS",
+                    help="Replay round trip(s) in ms; one benchmark per value "
+                         "(default: the recording's rtt_ms, else 20)")
+    ap.add_argument("--bandwidth", type=float, default=1_000_000,
+                    help="Replay output rate in bytes/s (default: 1 MB/s)")
+    args = ap.parse_args(argv)
+
+    timing.configure(enabled=True)
+
+    if args.replay is None:
+        devices = config.load_devices(config.Path(args.csv))
+        targets = {n: m for n, m in devices.items()
+                   if (not args.only or n in args.only) and m["Device_Type"] in config.SHOW_CMDS}
+        if not targets:
+            print("No matching devices.")
+            return 2
+        bench(targets, args.profiles, args.repeat)
+        return 0
+
+    recordings = [load_recording(p) for p in args.replay] if args.replay else golden_recordings()
+    recordings = [r for r in recordings if not args.only or r["prompt"] in args.only]
+    if not recordings:
+        print("No recordings to replay.")
+        return 2
+    for rtt_ms in args.rtt or [None]:
+        targets, connects = {}, {}
+        for rec in recordings:
+            rtt = (rtt_ms if rtt_ms is not None else rec.get("rtt_ms", 20)) / 1000
+            name = rec["prompt"]
+            targets[name] = {"Device_Type": rec["device_type"], "IP": f"replay-{name}",
+                             "Username": "replay", "Password": "replay"}
+            connects[name] = replay_connect(rec, rtt, args.bandwidth)
+        print(f"=== replay, rtt {'recorded' if rtt_ms is None else f'{rtt_ms:g} ms'}, "
+              f"{len(targets)} device(s) ===")
+        bench(targets, args.profiles, args.repeat, connects)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
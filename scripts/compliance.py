@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Config compliance engine.
+
+Evaluates the declarative rules in data/compliance/rules.yaml against
+
+  generated-configs/*.cfg            (source: generated)
+  startup_configs/*.cfg              (source: startup)
+  golden-configs/<day>/<dev>_*.cfg   (source: golden, newest file per device)
+
+  python3 -m scripts.compliance                        # table, exit 1 on failures
+  python3 -m scripts.compliance --json reports/compliance.json --junit reports/compliance.xml
+  python3 -m scripts.compliance --sources golden --fail-on high
+
+How it stays cheap as rules and files grow:
+  * All unscoped patterns are compiled into ONE alternation that pre-filters
+    each line; only lines it hits are checked rule by rule.
+  * Section rules ("router ospf" must contain "max-lsa") are tracked in the
+    same single pass over the lines: headers are only tested on top-level
+    lines, children only while a matching section is open.
+  * Files are evaluated across a process pool (--jobs), and results are
+    cached by sha256(rules + source + config text) in .cache/compliance.json,
+    so an unchanged config is never re-evaluated.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RULES_PATH = os.path.join(REPO_ROOT, "data", "compliance", "rules.yaml")
+CACHE_PATH = os.path.join(REPO_ROOT, ".cache", "compliance.json")
+REPORT_PATH = os.path.join(REPO_ROOT, "reports", "compliance.json")
+
+SOURCES = {
+    "generated": os.path.join(REPO_ROOT, "generated-configs"),
+    "startup":   os.path.join(REPO_ROOT, "startup_configs"),
+    "golden":    os.path.join(REPO_ROOT, "golden-configs"),
+}
+
+SEVERITIES = ("low", "medium", "high")
+
+# R1_20250930-204644Z.cfg (written by scripts/config.py save_config)
+GOLDEN_NAME_RE = re.compile(r"^(?P<device>.+)_(?P<stamp>\d{8}-\d{6}Z)\.cfg$")
+
+
+class Rule(NamedTuple):
+    id: str
+    description: str
+    severity: str
+    kind: str                  # "forbid" | "require"
+    pattern: str
+    section: Optional[str]
+    sources: Optional[Tuple[str, ...]]
+
+    def applies_to(self, source: str) -> bool:
+        return not self.sources or source in self.sources
+
+
+def parse_rules(doc: Dict) -> List[Rule]:
+    """Validate the YAML document and return Rule tuples (raises ValueError)."""
+    rules: List[Rule] = []
+    seen = set()
+    for i, raw in enumerate((doc or {}).get("rules") or []):
+        rid = str(raw.get("id") or "").strip()
+        if not rid:
+            raise ValueError(f"rule #{i + 1}: missing id")
+        if rid in seen:
+            raise ValueError(f"rule {rid}: duplicate id")
+        seen.add(rid)
+
+        kinds = [k for k in ("forbid", "require") if raw.get(k)]
+        if len(kinds) != 1:
+            raise ValueError(f"rule {rid}: needs exactly one of forbid/require")
+        severity = str(raw.get("severity", "medium")).lower()
+        if severity not in SEVERITIES:
+            raise ValueError(f"rule {rid}: severity must be one of {', '.join(SEVERITIES)}")
+        sources = raw.get("sources")
+        if sources:
+            unknown = set(sources) - set(SOURCES)
+            if unknown:
+                raise ValueError(f"rule {rid}: unknown sources {sorted(unknown)}")
+
+        pattern = str(raw[kinds[0]])
+        section = raw.get("section")
+        for rx in filter(None, (pattern, section)):
+            try:
+                re.compile(rx)
+            except re.error as e:
+                raise ValueError(f"rule {rid}: bad regex {rx!r}: {e}") from e
+
+        rules.append(Rule(rid, str(raw.get("description", "")), severity, kinds[0],
+                          pattern, section, tuple(sources) if sources else None))
+    return rules
+
+
+def load_rules(path: str = RULES_PATH) -> List[Rule]:
+    import yaml
+    with open(path) as f:
+        return parse_rules(yaml.safe_load(f))
+
+
+# An inline global flag group such as (?i) or (?ms)
+_GLOBAL_FLAGS_RE = re.compile(r"\(\?[aiLmsux]+\)")
+# A reference to another group: \1 (not an escaped backslash), (?P=name), (?(1)...)
+_GROUP_REF_RE = re.compile(r"(?<!\\)(?:\\\\)*\\[1-9]|\(\?P=|\(\?\(")
+
+
+def _needs_own_regex(pattern: str) -> bool:
+    """True if `pattern` changes meaning (or fails) inside an alternation with others."""
+    return bool(_GLOBAL_FLAGS_RE.search(pattern) or _GROUP_REF_RE.search(pattern)
+                or re.compile(pattern).groupindex)
+
+
+class _AnyOf:
+    """
+    Prefilter answering "does any of these patterns match?". Plain patterns
+    share one alternation. Patterns that would not survive being joined are
+    compiled on their own: inline global flags (an error past the start on
+    Python 3.11+, otherwise applied to every other pattern), named groups (a
+    name two rules share is a re.error) and group references (a \\1 would count
+    the other patterns' groups too).
+    """
+
+    def __init__(self, patterns: List[str]):
+        own = [p for p in patterns if _needs_own_regex(p)]
+        plain = [p for p in patterns if not _needs_own_regex(p)]
+        self._union = re.compile("|".join(f"(?:{p})" for p in plain)) if plain else None
+        self._own = [re.compile(p) for p in own]
+
+    def search(self, line: str) -> bool:
+        if self._union is not None and self._union.search(line):
+            return True
+        return any(rx.search(line) for rx in self._own)
+
+
+def _union(patterns: List[str]):
+    return _AnyOf(patterns) if patterns else None
+
+
+class RuleSet:
+    """Rules compiled for single-pass evaluation."""
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+        self.digest = hashlib.sha256(json.dumps(rules).encode()).hexdigest()[:16]
+
+        self.line_rules = [(i, re.compile(r.pattern)) for i, r in enumerate(rules) if not r.section]
+        self.line_any = _union([rules[i].pattern for i, _ in self.line_rules])
+
+        self.section_rules = [(i, re.compile(r.section), re.compile(r.pattern))
+                              for i, r in enumerate(rules) if r.section]
+        self.header_any = _union([r.section for r in rules if r.section])
+        self.child_any = _union([r.pattern for r in rules if r.section])
+
+    def evaluate(self, text: str, source: str) -> List[Dict]:
+        """One pass over `text`; returns a result dict per applicable rule."""
+        hits: Dict[int, List[Tuple[int, str]]] = {i: [] for i in range(len(self.rules))}
+        # require-rules whose section header was seen but no child matched yet
+        missing: Dict[int, List[Tuple[int, str]]] = {i: [] for i, _, _ in self.section_rules}
+        seen_section = set()
+
+        open_rules: List[Tuple[int, object]] = []   # (rule index, child regex)
+        open_header: Tuple[int, str] = (0, "")
+        satisfied = set()
+
+        def close_section():
+            for i, _ in open_rules:
+                if self.rules[i].kind == "require" and i not in satisfied:
+                    missing[i].append(open_header)
+
+        line_any, header_any, child_any = self.line_any, self.header_any, self.child_any
+        for lineno, line in enumerate(text.splitlines(), 1):
+            line = line.rstrip()
+            if not line:
+                continue
+
+            if not line[0].isspace():
+                if open_rules:
+                    close_section()
+                    open_rules = []
+                if header_any is not None and header_any.search(line):
+                    open_rules = [(i, child) for i, hdr, child in self.section_rules if hdr.search(line)]
+                    open_header = (lineno, line)
+                    satisfied = set()
+                    seen_section.update(i for i, _ in open_rules)
+            elif open_rules and child_any.search(line):
+                for i, child in open_rules:
+                    if child.search(line):
+                        satisfied.add(i)
+                        hits[i].append((lineno, line))
+
+            if line_any is not None and line_any.search(line):
+                for i, rx in self.line_rules:
+                    if rx.search(line):
+                        hits[i].append((lineno, line))
+        if open_rules:
+            close_section()
+
+        results = []
+        for i, rule in enumerate(self.rules):
+            if not rule.applies_to(source):
+                continue
+            if rule.section:
+                if rule.kind == "forbid":
+                    bad = hits[i]
+                else:
+                    bad = missing[i]
+                applicable = i in seen_section
+            else:
+                bad = hits[i] if rule.kind == "forbid" else ([] if hits[i] else [(0, "")])
+                applicable = True
+            status = "n/a" if not applicable else ("fail" if bad else "pass")
+            results.append({
+                "rule": rule.id,
+                "severity": rule.severity,
+                "description": rule.description,
+                "status": status,
+                "matches": [{"line": n, "text": t} for n, t in bad if n],
+            })
+        return results
+
+
+# ---------- file discovery ----------
+
+def latest_golden(golden_root: str) -> List[str]:
+    """Newest golden config per device across all day directories."""
+    newest: Dict[str, Tuple[str, str]] = {}
+    for day in sorted(os.listdir(golden_root)) if os.path.isdir(golden_root) else []:
+        day_dir = os.path.join(golden_root, day)
+        if not os.path.isdir(day_dir):
+            continue
+        for name in os.listdir(day_dir):
+            m = GOLDEN_NAME_RE.match(name)
+            if not m:
+                continue
+            dev, stamp = m.group("device"), m.group("stamp")
+            if dev not in newest or stamp > newest[dev][0]:
+                newest[dev] = (stamp, os.path.join(day_dir, name))
+    return [path for _, (_, path) in sorted(newest.items())]
+
+
+def discover(sources=tuple(SOURCES), roots: Dict[str, str] = SOURCES) -> List[Tuple[str, str]]:
+    """[(source, path)] for every config to check."""
+    files: List[Tuple[str, str]] = []
+    for source in sources:
+        root = roots[source]
+        if source == "golden":
+            paths = latest_golden(root)
+        elif os.path.isdir(root):
+            paths = sorted(os.path.join(root, n) for n in os.listdir(root) if n.endswith(".cfg"))
+        else:
+            paths = []
+        files.extend((source, p) for p in paths)
+    return files
+
+
+# ---------- evaluation with cache + process pool ----------
+
+_worker_ruleset: Optional[RuleSet] = None
+
+
+def _init_worker(rules: List[Rule]) -> None:
+    global _worker_ruleset
+    _worker_ruleset = RuleSet(rules)
+
+
+def _evaluate_in_worker(job: Tuple[str, str]) -> List[Dict]:
+    text, source = job
+    return _worker_ruleset.evaluate(text, source)
+
+
+def load_cache(path: str) -> Dict[str, List[Dict]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(path: str, cache: Dict[str, List[Dict]]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp, path)
+
+
+def run(files: List[Tuple[str, str]], rules: List[Rule], jobs: int = 0,
+        cache_path: Optional[str] = CACHE_PATH) -> Dict:
+    """Evaluate `files` and return the report dict (see write_json)."""
+    ruleset = RuleSet(rules)
+    cache = load_cache(cache_path) if cache_path else {}
+
+    entries, pending = [], []
+    for source, path in files:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        sha = hashlib.sha256(text.encode()).hexdigest()
+        key = f"{ruleset.digest}:{source}:{sha}"
+        entry = {"path": os.path.relpath(path, REPO_ROOT), "source": source, "sha256": sha,
+                 "cached": key in cache, "results": cache.get(key)}
+        entries.append(entry)
+        if entry["results"] is None:
+            pending.append((entry, key, text))
+
+    jobs = jobs or os.cpu_count() or 1
+    if len(pending) > 1 and jobs > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending)),
+                                 initializer=_init_worker, initargs=(rules,)) as pool:
+            outputs = pool.map(_evaluate_in_worker, [(t, e["source"]) for e, _, t in pending],
+                               chunksize=max(1, len(pending) // (jobs * 4)))
+            outputs = list(outputs)
+    else:
+        outputs = [ruleset.evaluate(t, e["source"]) for e, _, t in pending]
+
+    for (entry, key, _), results in zip(pending, outputs):
+        entry["results"] = cache[key] = results
+
+    if cache_path and pending:
+        # Keep only entries for the current rule set so the cache can't grow forever
+        save_cache(cache_path, {k: v for k, v in cache.items() if k.startswith(ruleset.digest)})
+
+    return build_report(entries, ruleset)
+
+
+def build_report(entries: List[Dict], ruleset: RuleSet) -> Dict:
+    by_rule: Dict[str, Dict[str, int]] = {r.id: {"pass": 0, "fail": 0, "n/a": 0} for r in ruleset.rules}
+    failures = 0
+    for e in entries:
+        e["failures"] = sum(1 for r in e["results"] if r["status"] == "fail")
+        failures += e["failures"]
+        for r in e["results"]:
+            by_rule[r["rule"]][r["status"]] += 1
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "ruleset": ruleset.digest,
+        "summary": {
+            "files": len(entries),
+            "failed_files": sum(1 for e in entries if e["failures"]),
+            "failures": failures,
+            "cached_files": sum(1 for e in entries if e["cached"]),
+            "by_rule": by_rule,
+        },
+        "files": entries,
+    }
+
+
+# ---------- reports ----------
+
+def write_json(report: Dict, path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def write_junit(report: Dict, path: str) -> None:
+    """One <testsuite> per config file, one <testcase> per rule."""
+    import xml.etree.ElementTree as ET
+
+    suites = ET.Element("testsuites", name="compliance",
+                        tests=str(sum(len(e["results"]) for e in report["files"])),
+                        failures=str(report["summary"]["failures"]))
+    for e in report["files"]:
+        suite = ET.SubElement(suites, "testsuite", name=e["path"],
+                              tests=str(len(e["results"])), failures=str(e["failures"]))
+        for r in e["results"]:
+            case = ET.SubElement(suite, "testcase", classname=f"compliance.{e['source']}", name=r["rule"])
+            if r["status"] == "fail":
+                detail = "\n".join(f"line {m['line']}: {m['text']}" for m in r["matches"]) or "required line not found"
+                failure = ET.SubElement(case, "failure", type=r["severity"], message=r["description"])
+                failure.text = detail
+            elif r["status"] == "n/a":
+                ET.SubElement(case, "skipped", message="no matching section")
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    ET.ElementTree(suites).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def print_report(report: Dict) -> None:
+    for e in report["files"]:
+        bad = [r for r in e["results"] if r["status"] == "fail"]
+        print(f"{'FAIL' if bad else 'PASS'}  {e['path']}" + ("  (cached)" if e["cached"] else ""))
+        for r in bad:
+            where = ", ".join(str(m["line"]) for m in r["matches"]) or "missing"
+            print(f"      [{r['severity']}] {r['rule']}: {r['description']} (line {where})")
+    s = report["summary"]
+    print(f"\n{s['files']} files, {s['failed_files']} failing, {s['failures']} failures "
+          f"({s['cached_files']} from cache)")
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Check configs against the compliance rules.")
+    ap.add_argument("--rules", default=RULES_PATH, help="Rules YAML")
+    ap.add_argument("--sources", nargs="+", choices=sorted(SOURCES), default=list(SOURCES),
+                    help="Which config sets to check (default: all)")
+    ap.add_argument("--jobs", type=int, default=0, help="Worker processes (default: CPU count)")
+    ap.add_argument("--json", help="Write the JSON report here")
+    ap.add_argument("--junit", help="Write a JUnit XML report here")
+    ap.add_argument("--no-cache", action="store_true", help="Ignore and don't update the result cache")
+    ap.add_argument("--fail-on", choices=SEVERITIES + ("never",), default="low",
+                    help="Exit 1 if a failure of at least this severity is found (default: low)")
+    args = ap.parse_args(argv)
+
+    try:
+        rules = load_rules(args.rules)
+    except (OSError, ValueError) as e:
+        print(f"Cannot load rules: {e}")
+        return 2
+
+    report = run(discover(args.sources), rules, jobs=args.jobs,
+                 cache_path=None if args.no_cache else CACHE_PATH)
+    print_report(report)
+    if args.json:
+        write_json(report, args.json)
+    if args.junit:
+        write_junit(report, args.junit)
+
+    if args.fail_on == "never":
+        return 0
+    threshold = SEVERITIES.index(args.fail_on)
+    for e in report["files"]:
+        for r in e["results"]:
+            if r["status"] == "fail" and SEVERITIES.index(r["severity"]) >= threshold:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
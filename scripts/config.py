@@ -23,14 +23,9 @@ from datetime import datetime, timezone
 from typing import Dict, List, Optional
 
 try:
-    from netmiko import ConnectHandler
-except Exception as e:
-    raise SystemExit(
-        "Netmiko is not installed in this Python environment.\n"
-        "Activate your venv and install it:\n"
-        "  source ~/advanced-netman/gui/.venv/bin/activate\n"
-        "  pip install netmiko paramiko scp\n"
-    ) from e
+    from scripts import sessions, timing
+except ImportError:  # run directly as scripts/config.py
+    import sessions, timing
 
 # ---------- paths ----------
 REPO_ROOT = Path.home() / "advanced-netman"
@@ -136,7 +131,25 @@ def load_devices(csv_path: Path) -> Dict[str, Dict[str, str]]:
     return devices
 
 
-def fetch_running_config(name: str, meta: Dict[str, str]) -> str:
+def get_connect_handler():
+    """
+    Import Netmiko on first use rather than at module import, so loading the
+    CSV helpers (tests, `netman --help`) doesn't pull in paramiko & friends.
+    """
+    try:
+        from netmiko import ConnectHandler
+    except Exception as e:
+        raise SystemExit(
+            "Netmiko is not installed in this Python environment.\n"
+            "Activate your venv and install it:\n"
+            "  source ~/advanced-netman/gui/.venv/bin/activate\n"
+            "  pip install netmiko paramiko scp\n"
+        ) from e
+    return ConnectHandler
+
+
+def fetch_running_config(name: str, meta: Dict[str, str],
+                         profile: str = sessions.DEFAULT_PROFILE) -> str:
     dtype = meta["Device_Type"]
     ip    = meta["IP"]
     user  = meta["Username"]
@@ -154,24 +167,30 @@ def fetch_running_config(name: str, meta: Dict[str, str]) -> str:
         "host": ip,
         "username": user,
         "password": pwd,
-        "fast_cli": False,
         "timeout": 60,
     }
 
-    log.info(f"[{name}] connecting to {ip} ({dtype})")
-    with ConnectHandler(**device) as conn:
+    ConnectHandler = get_connect_handler()
+
+    log.info(f"[{name}] connecting to {ip} ({dtype}, {profile} profile)")
+    conn = sessions.open_session(ConnectHandler, device, profile)
+    with conn:
         try:
-            conn.enable()
+            with timing.span("enable"):
+                conn.enable()
         except Exception:
             pass
 
         for p in cmds["prep"]:
             try:
-                conn.send_command_timing(p)
+                with timing.span("prep", cmd=p):
+                    conn.prep(p)
             except Exception:
                 pass
 
-        output = conn.send_command(cmds["run"], read_timeout=90)
+        with timing.span("command", cmd=cmds["run"]) as sp:
+            output = conn.send(cmds["run"], read_timeout=90)
+            sp.set(bytes=len(output or ""))
 
     if not output or not output.strip():
         raise RuntimeError(f"{name}: empty configuration received")
@@ -185,17 +204,20 @@ def save_config(device: str, text: str, out_root: Path) -> Path:
 
     stamp = now.strftime("%Y%m%d-%H%M%SZ")
     path  = day_dir / f"{device}_{stamp}.cfg"
-    path.write_text(text, encoding="utf-8")
+    with timing.span("write", bytes=len(text)):
+        path.write_text(text, encoding="utf-8")
     return path
 
 
-def main():
+def main(argv=None):
     import argparse
     ap = argparse.ArgumentParser(description="Golden Config backup with timestamped filenames.")
     ap.add_argument("--csv", default=str(CSV_PATH), help="Path to sshInfo.csv")
     ap.add_argument("--outdir", default=str(OUT_ROOT), help="Output root directory")
     ap.add_argument("--only", nargs="*", help="Only these device names (space-separated)")
-    args = ap.parse_args()
+    ap.add_argument("--profile", choices=sorted(sessions.PROFILES), default=sessions.DEFAULT_PROFILE,
+                    help="Netmiko session profile (default: $NETMAN_PROFILE or safe)")
+    args = ap.parse_args(argv)
 
     csv_path = Path(args.csv)
     out_root = Path(args.outdir)
@@ -216,12 +238,15 @@ def main():
         if name not in target:
             continue
         try:
-            cfg = fetch_running_config(name, meta)
-            out = save_config(name, cfg, out_root)
+            with timing.span("backup", device=name, vendor=meta.get("Device_Type")):
+                cfg = fetch_running_config(name, meta, args.profile)
+                out = save_config(name, cfg, out_root)
             log.info(f"[{name}] saved -> {out}")
         except Exception as e:
             log.error(f"[{name}] failed: {e}")
 
+    timing.log_summary()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Local store for syslog messages and SNMP traps (written by scripts/ingest.py,
+read by the GUI health view).
+
+One SQLite file (default .cache/events.db, override with NETMAN_EVENTS_DB)
+with two tables:
+
+  events   every message, append-only, indexed by time, device+time,
+           severity+time and device+interface+time
+  state    latest state per (device, event, subject), e.g.
+           ("R1", "link", "Ethernet1") -> "down"; this is what the health
+           view shows
+
+Writes come in batches (one transaction + executemany per batch) and the
+database runs in WAL mode, so the GUI can read while the receiver writes.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.environ.get("NETMAN_EVENTS_DB") or os.path.join(REPO_ROOT, ".cache", "events.db")
+
+# Event kinds that drive the health view (anything else is just logged)
+STATE_EVENTS = ("link", "ospf", "bgp")
+
+
+class Event(NamedTuple):
+    ts: float                   # receive time (epoch seconds)
+    device: str
+    source: str                 # sender address
+    kind: str                   # "syslog" | "trap"
+    severity: int               # syslog 0 (emerg) .. 7 (debug)
+    facility: Optional[int]
+    app: Optional[str]          # syslog tag / app-name, trap OID name
+    interface: Optional[str]
+    event: Optional[str]        # link | ospf | bgp | None
+    subject: Optional[str]      # interface or neighbour address
+    state: Optional[str]        # up | down | <protocol state>
+    message: str
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id        INTEGER PRIMARY KEY,
+    ts        REAL NOT NULL,
+    device    TEXT NOT NULL,
+    source    TEXT NOT NULL,
+    kind      TEXT NOT NULL,
+    severity  INTEGER NOT NULL,
+    facility  INTEGER,
+    app       TEXT,
+    interface TEXT,
+    event     TEXT,
+    subject   TEXT,
+    state     TEXT,
+    message   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_ts        ON events (ts);
+CREATE INDEX IF NOT EXISTS events_device_ts ON events (device, ts);
+CREATE INDEX IF NOT EXISTS events_sev_ts    ON events (severity, ts);
+CREATE INDEX IF NOT EXISTS events_iface_ts  ON events (device, interface, ts)
+    WHERE interface IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS state (
+    device   TEXT NOT NULL,
+    event    TEXT NOT NULL,
+    subject  TEXT NOT NULL,
+    state    TEXT NOT NULL,
+    ts       REAL NOT NULL,
+    event_id INTEGER NOT NULL,
+    message  TEXT NOT NULL,
+    PRIMARY KEY (device, event, subject)
+) WITHOUT ROWID;
+"""
+
+_INSERT = ("INSERT INTO events (ts, device, source, kind, severity, facility, app, interface,"
+           " event, subject, state, message) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)")
+
+# Out-of-order batches must not roll the state back
+_UPSERT_STATE = """
+INSERT INTO state (device, event, subject, state, ts, event_id, message) VALUES (?,?,?,?,?,?,?)
+ON CONFLICT (device, event, subject) DO UPDATE SET
+    state = excluded.state, ts = excluded.ts, event_id = excluded.event_id, message = excluded.message
+WHERE excluded.ts >= state.ts
+"""
+
+
+class EventStore:
+    """Thread-safe wrapper around the SQLite file (one connection, one lock)."""
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- writes ----------
+
+    def add_batch(self, events: Iterable[Event]) -> int:
+        """Insert a batch in one transaction; returns the number stored."""
+        events = list(events)
+        if not events:
+            return 0
+        with self._lock, self._db:
+            cur = self._db.execute("SELECT COALESCE(MAX(id), 0) FROM events")
+            first_id = cur.fetchone()[0] + 1
+            self._db.executemany(_INSERT, events)
+            updates = [(e.device, e.event, e.subject, e.state, e.ts, first_id + i, e.message)
+                       for i, e in enumerate(events)
+                       if e.event in STATE_EVENTS and e.subject and e.state]
+            if updates:
+                self._db.executemany(_UPSERT_STATE, updates)
+        return len(events)
+
+    def prune(self, before_ts: float) -> int:
+        """Drop events older than before_ts (state rows are kept)."""
+        with self._lock, self._db:
+            return self._db.execute("DELETE FROM events WHERE ts < ?", (before_ts,)).rowcount
+
+    # ---------- reads ----------
+
+    def query(self, device: Optional[str] = None, interface: Optional[str] = None,
+              max_severity: Optional[int] = None, since: Optional[float] = None,
+              until: Optional[float] = None, after_id: Optional[int] = None,
+              event: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """Newest-first events matching every given filter."""
+        where, params = [], []
+        for clause, value in (("device = ?", device), ("interface = ?", interface),
+                              ("severity <= ?", max_severity), ("ts >= ?", since),
+                              ("ts < ?", until), ("id > ?", after_id), ("event = ?", event)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        sql = "SELECT * FROM events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY ts DESC, id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [dict(r) for r in self._db.execute(sql, params)]
+
+    def changes(self, after_id: int, limit: int = 500) -> List[Dict]:
+        """Link/OSPF/BGP events with id > after_id, oldest first (for streaming)."""
+        sql = ("SELECT * FROM events WHERE id > ? AND event IS NOT NULL "
+               "ORDER BY id LIMIT ?")
+        with self._lock:
+            return [dict(r) for r in self._db.execute(sql, (after_id, limit))]
+
+    def current_state(self, device: Optional[str] = None) -> List[Dict]:
+        sql = "SELECT * FROM state"
+        params: List = []
+        if device is not None:
+            sql += " WHERE device = ?"
+            params.append(device)
+        sql += " ORDER BY device, event, subject"
+        with self._lock:
+            return [dict(r) for r in self._db.execute(sql, params)]
+
+    def last_id(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM events").fetchone()[0]
@@ -1,20 +1,28 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from art import text2art
-from loguru import logger
-from InquirerPy import prompt
-from rich.console import Console
-from rich.table import Table
-from termcolor import colored
-from netmiko import ConnectHandler
 import csv
 import re
 import os
 import sys
+from functools import lru_cache
 from typing import Dict, Any
 
-console = Console()
+try:
+    from scripts import sessions, timing
+except ImportError:  # run directly as scripts/health_check.py
+    import sessions, timing
+
+# Heavy UI/SSH dependencies (rich, loguru, netmiko, art, InquirerPy, termcolor)
+# are imported where they are used so that importing this module -- from the
+# netman CLI or the unit tests -- stays cheap. See scripts/importtime.py.
+ConnectHandler = None  # netmiko.ConnectHandler, bound on first connect()
+
+
+@lru_cache(maxsize=None)
+def get_console():
+    from rich.console import Console
+    return Console()
 
 CSV_PATH = os.environ.get(
     "SSHINFO_CSV",
@@ -32,7 +40,7 @@ def load_ssh_info(csv_file: str) -> Dict[str, Dict[str, str]]:
             reader = csv.DictReader(f)
             required = {"Device", "IP", "Username", "Password", "Device_Type"}
             if set(reader.fieldnames or []) != required:
-                console.print(
+                get_console().print(
                     f"[bold red]CSV header must be exactly: {','.join(sorted(required))}[/bold red]"
                 )
                 sys.exit(2)
@@ -47,19 +55,21 @@ def load_ssh_info(csv_file: str) -> Dict[str, Dict[str, str]]:
                     "Device_Type": row["Device_Type"].strip() or "arista_eos",
                 }
         if not data:
-            console.print("[bold red]No rows found in CSV.[/bold red]")
+            get_console().print("[bold red]No rows found in CSV.[/bold red]")
             sys.exit(2)
         return data
     except FileNotFoundError:
-        console.print(f"[bold red]CSV not found: {csv_file}[/bold red]")
+        get_console().print(f"[bold red]CSV not found: {csv_file}[/bold red]")
         sys.exit(2)
     except Exception as e:
-        console.print(f"[bold red]Failed reading CSV: {e}[/bold red]")
+        get_console().print(f"[bold red]Failed reading CSV: {e}[/bold red]")
         sys.exit(2)
 
-def connect(ip: str, username: str, password: str, device_type: str) -> Any:
+def connect(ip: str, username: str, password: str, device_type: str,
+            profile: str = sessions.DEFAULT_PROFILE) -> Any:
     """
     Establish Netmiko connection. For EOS, device_type='arista_eos'.
+    Returns a sessions.Session running under `profile` (safe/fast).
     """
     params = {
         "device_type": device_type,
@@ -67,22 +77,26 @@ def connect(ip: str, username: str, password: str, device_type: str) -> Any:
         "username": username,
         "password": password,
         # EOS usually doesn’t need separate secret; enable() works with login creds
-        "fast_cli": False,
-        "global_delay_factor": 1,
+        # fast_cli/global_delay_factor come from the session profile
         "session_log": os.path.expanduser(
             f"~/advanced-netman/logs/netmiko/health_{ip}.log"
         ),
     }
     os.makedirs(os.path.dirname(params["session_log"]), exist_ok=True)
-    return ConnectHandler(**params)
+    global ConnectHandler
+    if ConnectHandler is None:
+        from netmiko import ConnectHandler
+    return sessions.open_session(ConnectHandler, params, profile)
 
 def run_cmd(nc, cmd: str) -> str:
     try:
         # EOS: many commands okay with send_command; use enable() first for show
-        nc.enable()
+        with timing.span("enable"):
+            nc.enable()
     except Exception:
         pass
-    return nc.send_command(cmd, strip_prompt=False, strip_command=False)
+    with timing.span("command", cmd=cmd):
+        return nc.send(cmd, strip_prompt=False, strip_command=False)
 
 def extract_cpu_sy(cpu_line: str) -> str:
     """
@@ -93,7 +107,12 @@ def extract_cpu_sy(cpu_line: str) -> str:
     m = re.search(r'(\d+(?:\.\d+)?)\s+sy', cpu_line)
     return f"{m.group(1)}%" if m else "N/A"
 
-def health_check_one(dev_name: str, meta: Dict[str, str]) -> None:
+def health_check_one(dev_name: str, meta: Dict[str, str],
+                     profile: str = sessions.DEFAULT_PROFILE) -> None:
+    from loguru import logger
+    from rich.table import Table
+
+    console = get_console()
     ip = meta["IP"]; user = meta["Username"]; pw = meta["Password"]; dtype = meta["Device_Type"] or "arista_eos"
     console.rule(f"[bold cyan]Health Check for {dev_name} ({ip})[/bold cyan]")
 
@@ -101,62 +120,178 @@ def health_check_one(dev_name: str, meta: Dict[str, str]) -> None:
     table.add_column("Check")
     table.add_column("Result")
 
-    try:
-        logger.info(f"Connecting to {dev_name} {ip} as {user}")
-        nc = connect(ip, user, pw, dtype)
-
-        # CPU
-        # Works on EOS: 'show processes top once' shows CPU line
-        cpu_raw = run_cmd(nc, "show processes top once | grep Cpu")
-        cpu_sy = extract_cpu_sy(cpu_raw)
-        table.add_row("CPU (sy%)", cpu_sy)
-
-        # OSPF neighbors (EOS classic)
-        ospf = run_cmd(nc, "show ip ospf neighbor")
-        # Quick parse: Neighbor ID + State + Interface lines
-        neigh_lines = []
-        for line in ospf.splitlines():
-            m = re.search(r'(\d+\.\d+\.\d+\.\d+).+?\s+(\S+)\s+(\S+)$', line.strip())
-            # fallback to simple include of FULL lines
-            if "FULL" in line or "2WAY" in line or "DOWN" in line:
-                neigh_lines.append(line.strip())
-            elif m:
-                neigh_lines.append(f"{m.group(1)}  {m.group(2)}  {m.group(3)}")
-        table.add_row("OSPF Neighborships", "\n".join(neigh_lines) or "None")
-
-        # BGP summary (if used)
-        bgp = run_cmd(nc, "show ip bgp summary")
-        table.add_row("BGP Summary", bgp.strip() or "None")
-
-        # Route table (show a slice to keep output compact)
-        routes = run_cmd(nc, "show ip route")
-        if "Gateway of last resort" in routes:
-            start = routes.find("Gateway of last resort")
-            routes = routes[start:]
-        table.add_row("Route Table (tail)", routes.strip()[:1500] or "None")
-
-        # Ping mgmt gateway-ish (adjust as needed)
-        ping = run_cmd(nc, "ping 1.1.1.2")
-        table.add_row("IP Connectivity (ping 8.8.8.8)", ping.strip() or "No output")
+    with timing.span("health", device=dev_name, vendor=dtype):
+        try:
+            logger.info(f"Connecting to {dev_name} {ip} as {user}")
+            nc = connect(ip, user, pw, dtype, profile)
 
-        console.print(table)
+            # CPU
+            # Works on EOS: 'show processes top once' shows CPU line
+            cpu_raw = run_cmd(nc, "show processes top once | grep Cpu")
+            cpu_sy = extract_cpu_sy(cpu_raw)
+            table.add_row("CPU (sy%)", cpu_sy)
+
+            # OSPF neighbors (EOS classic)
+            ospf = run_cmd(nc, "show ip ospf neighbor")
+            # Quick parse: Neighbor ID + State + Interface lines
+            neigh_lines = []
+            for line in ospf.splitlines():
+                m = re.search(r'(\d+\.\d+\.\d+\.\d+).+?\s+(\S+)\s+(\S+)$', line.strip())
+                # fallback to simple include of FULL lines
+                if "FULL" in line or "2WAY" in line or "DOWN" in line:
+                    neigh_lines.append(line.strip())
+                elif m:
+                    neigh_lines.append(f"{m.group(1)}  {m.group(2)}  {m.group(3)}")
+            table.add_row("OSPF Neighborships", "\n".join(neigh_lines) or "None")
+
+            # BGP summary (if used)
+            bgp = run_cmd(nc, "show ip bgp summary")
+            table.add_row("BGP Summary", bgp.strip() or "None")
+
+            # Route table: keep all of it for the route index (scripts/routes.py),
+            # show a per-protocol summary here
+            try:
+                from scripts import routes as route_index
+            except ImportError:  # run directly as scripts/health_check.py
+                import routes as route_index
+            routes = run_cmd(nc, route_index.ROUTE_CMDS.get(dtype, "show ip route"))
+            tables = route_index.parse_routes(routes)
+            if tables:     # an error/empty reply must not replace the last good table
+                route_index.save_table(dev_name, routes)
+            table.add_row("Route Table", route_index.summarize(tables))
+
+            # Ping mgmt gateway-ish (adjust as needed)
+            ping = run_cmd(nc, "ping 1.1.1.2")
+            table.add_row("IP Connectivity (ping 8.8.8.8)", ping.strip() or "No output")
+
+            console.print(table)
+
+            try:
+                with timing.span("disconnect"):
+                    nc.disconnect()
+            except Exception:
+                pass
+
+        except Exception as e:
+            table.add_row("ERROR", str(e))
+            console.print(table)
 
+# One gNMI Collector per process. Each EOS device is subscribed the first
+# time it is checked and stays subscribed, so later checks (each interactive
+# menu choice, a long-running caller) read the latest-value cache instead of
+# dialling in and waiting for an initial sync again.
+_collector = None
+
+def gnmi_collector(targets: Dict[str, Dict[str, str]]):
+    global _collector
+    if _collector is None:
         try:
-            nc.disconnect()
-        except Exception:
-            pass
+            from scripts import telemetry
+        except ImportError:  # run directly as scripts/health_check.py
+            import telemetry
+        _collector = telemetry.Collector({})
+        _collector.start()
+    _collector.add(targets)
+    return _collector
 
-    except Exception as e:
-        table.add_row("ERROR", str(e))
+def stop_gnmi_collector() -> None:
+    global _collector
+    if _collector is not None:
+        _collector.stop()
+        _collector = None
+
+def health_check_gnmi(names, ssh: Dict[str, Dict[str, str]], sync_timeout: float = 15.0,
+                      profile: str = sessions.DEFAULT_PROFILE) -> None:
+    """
+    Same report as health_check_one() from gNMI subscriptions (scripts/telemetry.py):
+    no SSH login; values come from the process-wide collector's cache, which
+    only waits for an initial sync the first time a device is checked.
+    Devices without gNMI (non-EOS) go through the SSH path with `profile`.
+    """
+    from rich.table import Table
+
+    console = get_console()
+    eos = [n for n in names if (ssh[n]["Device_Type"] or "arista_eos") == "arista_eos"]
+    for name in names:
+        if name not in eos:
+            console.print(f"[yellow]{name}: no gNMI for {ssh[name]['Device_Type']}, using SSH[/yellow]")
+            health_check_one(name, ssh[name], profile)
+    if not eos:
+        return
+
+    try:
+        from scripts import telemetry
+    except ImportError:  # run directly as scripts/health_check.py
+        import telemetry
+    collector = gnmi_collector({n: ssh[n] for n in eos})
+    collector.wait_synced(sync_timeout, eos)
+    for name in eos:
+        stream = collector.streams[name]
+        view = telemetry.device_view(collector.cache, name)
+        console.rule(f"[bold cyan]Health Check for {name} ({ssh[name]['IP']}) via gNMI[/bold cyan]")
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("Check")
+        table.add_column("Result")
+        if not stream.synced.is_set():
+            table.add_row("ERROR", f"no gNMI sync: {stream.status['last_error'] or 'timed out'}")
+        table.add_row("CPU (util%)", "N/A" if view["cpu"] is None else f"{view['cpu']:.1f}%")
+        ifs = view["interfaces"]
+        down = sorted(n for n, i in ifs.items() if i.get("oper-status") not in (None, "UP"))
+        errors = sorted(n for n, i in ifs.items() if i.get("in-errors") or i.get("out-errors"))
+        table.add_row("Interfaces",
+                      f"{len(ifs) - len(down)}/{len(ifs)} up"
+                      + (f"\ndown: {', '.join(down)}" if down else "")
+                      + (f"\nerrors: {', '.join(errors)}" if errors else ""))
+        table.add_row("OSPF Neighborships", "\n".join(
+            f"{nbr}  {state}" for nbr, state in sorted(view["ospf_neighbors"].items())) or "None")
+        table.add_row("BGP Peers", "\n".join(
+            f"{peer}  {state}" for peer, state in sorted(view["bgp_neighbors"].items())) or "None")
         console.print(table)
 
-def main():
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Health checks for EOS devices.")
+    ap.add_argument("--csv", default=CSV_PATH, help="Path to sshInfo.csv")
+    ap.add_argument("--only", nargs="*",
+                    help="Check these devices (all if no names) and exit without the menu")
+    ap.add_argument("--profile", choices=sorted(sessions.PROFILES), default=sessions.DEFAULT_PROFILE,
+                    help="Netmiko session profile (default: $NETMAN_PROFILE or safe)")
+    ap.add_argument("--backend", choices=("ssh", "gnmi"), default=os.environ.get("NETMAN_HEALTH_BACKEND", "ssh"),
+                    help="ssh: log in and run show commands; gnmi: read subscribed telemetry "
+                         "(EOS; no route table/ping). Default: $NETMAN_HEALTH_BACKEND or ssh")
+    args = ap.parse_args(argv)
+
+    def check(names):
+        if args.backend == "gnmi":
+            health_check_gnmi(names, ssh, profile=args.profile)
+        else:
+            for name in names:
+                health_check_one(name, ssh[name], args.profile)
+
+    ssh = load_ssh_info(args.csv)
+
+    # Non-interactive mode for cron/Jenkins: no banner, no menu
+    if args.only is not None:
+        names = []
+        for name in args.only or ssh.keys():
+            if name not in ssh:
+                get_console().print(f"[bold red]Unknown device: {name}[/bold red]")
+                continue
+            names.append(name)
+        check(names)
+        stop_gnmi_collector()
+        timing.log_summary()
+        return
+
+    from art import text2art
+    from InquirerPy import prompt
+    from termcolor import colored
+
     # Title
     title = text2art("NetHealth", font="doom")
     print(title)
     print(colored("Health checks for EOS devices\n", "cyan"))
 
-    ssh = load_ssh_info(CSV_PATH)
     devices = list(ssh.keys()) + ["Quit"]
 
     while True:
@@ -170,9 +305,12 @@ def main():
         ])
         choice = answers["choice"]
         if choice == "Quit":
-            console.print("\n[bold yellow]Bye![/bold yellow]\n")
+            get_console().print("\n[bold yellow]Bye![/bold yellow]\n")
             break
-        health_check_one(choice, ssh[choice])
+        check([choice])
+
+    stop_gnmi_collector()
+    timing.log_summary()
 
 if __name__ == "__main__":
     main()
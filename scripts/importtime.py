@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the operational scripts.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter (so
+nothing is already cached in sys.modules), parses the report on stderr and
+prints the most expensive imports:
+
+  python3 -m scripts.importtime                       # scripts.netman, default budget
+  python3 -m scripts.importtime scripts.health_check --top 15
+  python3 -m scripts.importtime scripts.netman --budget-ms 50
+
+Exits non-zero when a module costs more than --budget-ms, or when it drags in
+one of the HEAVY packages (which must only be loaded by the subcommand that
+needs them). Suitable as a Jenkins stage.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Top-level packages that cost tens to hundreds of ms each and must stay out
+# of the start-up path of the CLI and of the unit-test imports.
+HEAVY = ("netmiko", "paramiko", "rich", "loguru", "InquirerPy", "art",
+         "termcolor", "jinja2", "flask")
+
+DEFAULT_MODULES = ["scripts.netman"]
+DEFAULT_BUDGET_MS = 100.0
+
+# import time:       262 |     187755 | netmiko
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+class ImportRecord(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(text: str) -> List[ImportRecord]:
+    """Parse `-X importtime` output (stderr) into records, in report order."""
+    records: List[ImportRecord] = []
+    for line in text.splitlines():
+        m = LINE_RE.match(line)
+        if not m:
+            continue
+        # CPython indents nested imports by two spaces per level after the '|'
+        depth = max(len(m.group(3)) - 1, 0) // 2
+        records.append(ImportRecord(m.group(4), int(m.group(1)), int(m.group(2)), depth))
+    return records
+
+
+def measure(module: str, python: str = sys.executable) -> List[ImportRecord]:
+    """Import `module` in a clean interpreter and return its importtime records."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["(no output)"]
+        raise RuntimeError(f"import {module} failed: {tail[0]}")
+    return parse_importtime(proc.stderr)
+
+
+def total_us(records: List[ImportRecord], module: str) -> int:
+    """Cumulative cost of `module` itself (its own top-level record)."""
+    for r in records:
+        if r.module == module and r.depth == 0:
+            return r.cumulative_us
+    return sum(r.self_us for r in records)
+
+
+def heavy_imports(records: List[ImportRecord], heavy=HEAVY) -> Dict[str, int]:
+    """Return {package: cumulative_us} for every HEAVY top-level package loaded."""
+    found: Dict[str, int] = {}
+    for r in records:
+        if r.module in heavy:
+            found[r.module] = max(found.get(r.module, 0), r.cumulative_us)
+    return found
+
+
+def report(module: str, records: List[ImportRecord], top: int) -> None:
+    print(f"\n== {module}: {total_us(records, module) / 1000:.1f} ms "
+          f"({len(records)} modules imported)")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for r in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        print(f"{r.cumulative_us / 1000:>10.1f}ms {r.self_us / 1000:>8.1f}ms  "
+              f"{'  ' * r.depth}{r.module}")
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Measure and bound module import cost.")
+    ap.add_argument("modules", nargs="*", default=DEFAULT_MODULES,
+                    help="Modules to import (default: scripts.netman)")
+    ap.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                    help=f"Fail if a module's import exceeds this (default {DEFAULT_BUDGET_MS:g} ms)")
+    ap.add_argument("--top", type=int, default=10, help="Show the N most expensive imports")
+    ap.add_argument("--allow-heavy", action="store_true",
+                    help="Do not fail when a heavy dependency is imported")
+    args = ap.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        try:
+            records = measure(module)
+        except RuntimeError as e:
+            print(f"FAIL: {e}")
+            failed = True
+            continue
+
+        report(module, records, args.top)
+
+        cost_ms = total_us(records, module) / 1000
+        if cost_ms > args.budget_ms:
+            print(f"FAIL: {module} import {cost_ms:.1f} ms > budget {args.budget_ms:g} ms")
+            failed = True
+
+        heavy = heavy_imports(records)
+        if heavy and not args.allow_heavy:
+            names = ", ".join(f"{k} ({v / 1000:.1f} ms)" for k, v in sorted(heavy.items()))
+            print(f"FAIL: {module} imports heavy dependencies at load time: {names}")
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
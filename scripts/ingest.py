@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+"""
+Syslog + SNMP v2c trap receiver.
+
+The golden configs send `logging host 10.100.0.5` and
+`snmp-server enable traps snmp link-down link-up` to the management host;
+this is what listens there:
+
+  python3 -m scripts.ingest                              # udp/514 + udp/162
+  python3 -m scripts.ingest --syslog-port 5514 --trap-port 10162 --db /tmp/events.db
+  python3 -m scripts.replay_events --count 100000        # local event storm
+
+Syslog: RFC 5424 and RFC 3164 (what EOS/IOS send by default).
+Traps:  SNMPv2-Trap and InformRequest PDUs; linkDown/linkUp, ospfNbrStateChange
+        and the BGP established/backward-transition notifications become state
+        events. Informs are acknowledged with a Response straight from the
+        socket reader (when --community is set, only for that community), so
+        senders don't retransmit them.
+
+Messages land in scripts/eventstore.py (indexed by device, severity, time and
+interface). Link, OSPF and BGP changes also update its `state` table, which
+the GUI health view (/health) shows and streams.
+
+Keeping up with an event storm:
+  * the socket reader drains every waiting datagram per wakeup and only
+    appends (time, kind, addr, bytes) to a list -- no parsing, no I/O on the
+    event loop;
+  * every --flush-ms (or as soon as --batch datagrams are waiting) that list
+    is swapped out and parsed + stored in one transaction by a separate
+    writer process, so a slow disk delays batches but never the socket
+    reads, and parsing never holds the receiver's GIL;
+  * the sockets ask for a large kernel receive buffer (--rcvbuf) to ride out
+    scheduler hiccups;
+  * only if more than --max-pending datagrams are queued (the store is
+    stalled outright) are new ones dropped, and that is counted and logged.
+"""
+
+import argparse
+import asyncio
+import csv
+import logging
+import os
+import re
+import signal
+import socket
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from scripts.eventstore import DB_PATH, Event, EventStore
+except ImportError:  # run directly as scripts/ingest.py
+    from eventstore import DB_PATH, Event, EventStore
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CSV_PATH = os.environ.get("SSHINFO_CSV") or os.path.join(REPO_ROOT, "data", "ssh", "sshInfo.csv")
+
+log = logging.getLogger("netman.ingest")
+
+
+# ---------- syslog ----------
+
+_PRI_RE = re.compile(rb"^<(\d{1,3})>")
+# <PRI>1 TIMESTAMP HOSTNAME APP-NAME PROCID MSGID [SD] MSG
+_RFC5424_RE = re.compile(
+    r"^1 (?P<ts>\S+) (?P<host>\S+) (?P<app>\S+) (?P<procid>\S+) (?P<msgid>\S+) "
+    r"(?P<sd>-|(?:\[(?:[^\]\\]|\\.)*\])+)(?: (?P<msg>.*))?$", re.S)
+# <PRI>Mmm dd hh:mm:ss HOSTNAME TAG[pid]: MSG   (hostname is optional)
+_RFC3164_RE = re.compile(
+    r"^(?P<ts>[A-Z][a-z]{2} [ \d]\d \d\d:\d\d:\d\d) (?:(?P<host>[^\s:\[]+) )?"
+    r"(?:(?P<app>[^\s:\[%][^\s:\[]*)(?:\[\d+\])?: )?(?P<msg>.*)$", re.S)
+
+INTERFACE_RE = re.compile(
+    r"\b((?:Ethernet|GigabitEthernet|TenGigabitEthernet|FastEthernet|Port-Channel|"
+    r"Vlan|Loopback|Management|Tunnel|Et|Gi|Te|Fa|Po|Ma)\d+(?:[/.:]\d+)*)\b")
+
+# (event, regex with `subject` and `state` groups)
+_STATE_PATTERNS = (
+    ("link", re.compile(r"%LINEPROTO-\d-UPDOWN: Line protocol on Interface (?P<subject>\S+), "
+                        r"changed state to (?P<state>\w+)")),
+    ("link", re.compile(r"%LINK-\d-UPDOWN: Interface (?P<subject>\S+), changed state to (?P<state>\w+)")),
+    ("ospf", re.compile(r"%OSPF-\d-ADJCHG: Process \d+, Nbr (?P<subject>\S+) on \S+ from \S+ "
+                        r"to (?P<state>\w+)")),
+    ("ospf", re.compile(r"%OSPF-\d-OSPF_ADJACENCY_(?P<state>\w+): NGB (?P<subject>[^\s,]+)")),
+    ("bgp",  re.compile(r"%BGP-\d-ADJCHANGE: peer (?P<subject>\S+) .*new state (?P<state>\w+)")),
+    ("bgp",  re.compile(r"%BGP-\d-ADJCHANGE: neighbor (?P<subject>\S+)(?: vpn vrf \S+)? "
+                        r"(?P<state>Up|Down)")),
+)
+_UP_STATES = {"up", "full", "established"}
+_DOWN_STATES = {"down", "teardown", "idle", "administratively"}
+
+
+def normalise_state(state: str) -> str:
+    s = state.lower()
+    if s in _UP_STATES:
+        return "up"
+    if s in _DOWN_STATES:
+        return "down"
+    return s
+
+
+def classify(msg: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(event, subject, state) for link/OSPF/BGP messages, else Nones."""
+    if "%" not in msg:
+        return None, None, None
+    for event, pattern in _STATE_PATTERNS:
+        m = pattern.search(msg)
+        if m:
+            return event, m.group("subject"), normalise_state(m.group("state"))
+    return None, None, None
+
+
+def parse_syslog(data: bytes) -> Dict:
+    """
+    Parse one datagram. Never raises: anything unparseable is kept whole as
+    the message with severity 'notice' (RFC 3164 section 4.3.3).
+    """
+    m = _PRI_RE.match(data)
+    if m and int(m.group(1)) <= 191:
+        pri = int(m.group(1))
+        body = data[m.end():]
+    else:
+        pri, body = 13, data    # user.notice
+    text = body.decode("utf-8", "replace").lstrip("\ufeff").rstrip("\r\n\x00")
+    out = {"facility": pri >> 3, "severity": pri & 7, "host": None, "app": None, "msg": text}
+
+    r = _RFC5424_RE.match(text)
+    if r:
+        host, app = r.group("host"), r.group("app")
+        out.update(host=None if host == "-" else host, app=None if app == "-" else app,
+                   msg=(r.group("msg") or "").lstrip("\ufeff"))
+        return out
+    r = _RFC3164_RE.match(text)
+    if r:
+        out.update(host=r.group("host"), app=r.group("app"), msg=r.group("msg"))
+    return out
+
+
+# ---------- SNMP v2c (BER) ----------
+
+SNMP_TRAP_OID = "1.3.6.1.6.3.1.1.4.1.0"
+SYS_UPTIME = "1.3.6.1.2.1.1.3.0"
+IF_INDEX = "1.3.6.1.2.1.2.2.1.1."
+IF_DESCR = "1.3.6.1.2.1.2.2.1.2."
+IF_NAME = "1.3.6.1.2.1.31.1.1.1.1."
+OSPF_NBR_STATE = "1.3.6.1.2.1.14.10.1.6."
+BGP_PEER_STATE = "1.3.6.1.2.1.15.3.1.2."
+
+TRAPS = {
+    "1.3.6.1.6.3.1.1.5.3": ("linkDown", "link"),
+    "1.3.6.1.6.3.1.1.5.4": ("linkUp", "link"),
+    "1.3.6.1.2.1.14.16.2.2": ("ospfNbrStateChange", "ospf"),
+    "1.3.6.1.2.1.15.0.1": ("bgpEstablishedNotification", "bgp"),
+    "1.3.6.1.2.1.15.0.2": ("bgpBackwardTransNotification", "bgp"),
+    "1.3.6.1.2.1.15.7.1": ("bgpEstablished", "bgp"),
+    "1.3.6.1.2.1.15.7.2": ("bgpBackwardTransition", "bgp"),
+}
+OSPF_NBR_STATES = {1: "down", 2: "attempt", 3: "init", 4: "twoWay", 5: "exchangeStart",
+                   6: "exchange", 7: "loading", 8: "full"}
+BGP_PEER_STATES = {1: "idle", 2: "connect", 3: "active", 4: "openSent", 5: "openConfirm",
+                   6: "established"}
+
+_SEQUENCE, _INTEGER, _OCTETS, _NULL, _OID = 0x30, 0x02, 0x04, 0x05, 0x06
+_IPADDRESS, _COUNTER32, _GAUGE32, _TIMETICKS, _COUNTER64 = 0x40, 0x41, 0x42, 0x43, 0x46
+_RESPONSE, _TRAP_V2, _INFORM = 0xA2, 0xA7, 0xA6
+
+
+def _ber_read(data: bytes, i: int) -> Tuple[int, bytes, int]:
+    """(tag, value, next offset) of the TLV at data[i]."""
+    tag = data[i]
+    length = data[i + 1]
+    i += 2
+    if length & 0x80:
+        n = length & 0x7F
+        length = int.from_bytes(data[i:i + n], "big")
+        i += n
+    if i + length > len(data):
+        raise ValueError("truncated BER value")
+    return tag, data[i:i + length], i + length
+
+
+def _ber_items(data: bytes) -> List[Tuple[int, bytes]]:
+    items, i = [], 0
+    while i < len(data):
+        tag, value, i = _ber_read(data, i)
+        items.append((tag, value))
+    return items
+
+
+def _decode_oid(v: bytes) -> str:
+    parts, n = [], 0
+    for b in v:
+        n = (n << 7) | (b & 0x7F)
+        if not b & 0x80:
+            parts.append(n)
+            n = 0
+    first = parts[0] if parts else 0
+    head = [min(first // 40, 2), first - 40 * min(first // 40, 2)]
+    return ".".join(map(str, head + parts[1:]))
+
+
+def _decode_value(tag: int, v: bytes):
+    if tag == _INTEGER:
+        return int.from_bytes(v, "big", signed=True)
+    if tag in (_COUNTER32, _GAUGE32, _TIMETICKS, _COUNTER64):
+        return int.from_bytes(v, "big")
+    if tag == _OID:
+        return _decode_oid(v)
+    if tag == _IPADDRESS:
+        return ".".join(map(str, v))
+    if tag == _OCTETS:
+        try:
+            return v.decode("ascii")
+        except UnicodeDecodeError:
+            return v.hex()
+    return None     # NULL, noSuchObject, ...
+
+
+def parse_trap(data: bytes) -> Tuple[str, List[Tuple[str, object]]]:
+    """(community, [(oid, value), ...]) of an SNMPv2-Trap/Inform; ValueError otherwise."""
+    tag, msg, _ = _ber_read(data, 0)
+    if tag != _SEQUENCE:
+        raise ValueError("not an SNMP message")
+    (_, version), (_, community), (pdu_type, pdu) = _ber_items(msg)[:3]
+    if int.from_bytes(version, "big") != 1:
+        raise ValueError("only SNMP v2c traps are supported")
+    if pdu_type not in (_TRAP_V2, _INFORM):
+        raise ValueError(f"unexpected PDU type 0x{pdu_type:02x}")
+    varbinds = []
+    for _, vb in _ber_items(_ber_items(pdu)[3][1]):
+        (_, oid), (vtag, value) = _ber_items(vb)
+        varbinds.append((_decode_oid(oid), _decode_value(vtag, value)))
+    return community.decode("latin-1"), varbinds
+
+
+def inform_response(data: bytes, community: Optional[str] = None) -> Optional[bytes]:
+    """
+    The Response acknowledging an SNMPv2 InformRequest (same request-id and
+    varbinds, RFC 3416 4.2.7); None for traps, other communities and garbage.
+    Reads only the message header, so it is cheap enough for the socket reader.
+    """
+    try:
+        tag, msg, _ = _ber_read(data, 0)
+        if tag != _SEQUENCE:
+            return None
+        _, version, i = _ber_read(msg, 0)
+        _, name, j = _ber_read(msg, i)
+        pdu_type, pdu, _ = _ber_read(msg, j)
+    except (ValueError, IndexError):
+        return None
+    if pdu_type != _INFORM or version != b"\x01":
+        return None
+    if community is not None and name.decode("latin-1") != community:
+        return None
+    return _ber(_SEQUENCE, msg[:j] + _ber(_RESPONSE, pdu))
+
+
+def _ber(tag: int, value: bytes) -> bytes:
+    n = len(value)
+    if n < 0x80:
+        return bytes((tag, n)) + value
+    size = n.to_bytes((n.bit_length() + 7) // 8, "big")
+    return bytes((tag, 0x80 | len(size))) + size + value
+
+
+def _encode_oid(oid: str) -> bytes:
+    parts = [int(p) for p in oid.split(".")]
+    out = bytearray([parts[0] * 40 + parts[1]])
+    for n in parts[2:]:
+        chunk = [n & 0x7F]
+        n >>= 7
+        while n:
+            chunk.append(0x80 | (n & 0x7F))
+            n >>= 7
+        out.extend(reversed(chunk))
+    return _ber(_OID, bytes(out))
+
+
+def _encode_int(tag: int, n: int) -> bytes:
+    size = max(1, (n.bit_length() + 8) // 8)
+    return _ber(tag, n.to_bytes(size, "big", signed=True))
+
+
+def encode_trap(trap_oid: str, varbinds=(), community: str = "public",
+                uptime: int = 0, request_id: int = 1, inform: bool = False) -> bytes:
+    """Build an SNMPv2-Trap (or InformRequest) datagram (used by replay_events.py and the tests)."""
+    def value(v):
+        if isinstance(v, bool) or v is None:
+            return _ber(_NULL, b"")
+        if isinstance(v, int):
+            return _encode_int(_INTEGER, v)
+        if isinstance(v, str) and re.fullmatch(r"\d+(\.\d+){2,}", v) and v.startswith("1.3."):
+            return _encode_oid(v)
+        return _ber(_OCTETS, str(v).encode())
+
+    binds = [(SYS_UPTIME, _encode_int(_TIMETICKS, uptime)),
+             (SNMP_TRAP_OID, _encode_oid(trap_oid))]
+    binds += [(oid, value(v)) for oid, v in varbinds]
+    vbl = b"".join(_ber(_SEQUENCE, _encode_oid(oid) + v) for oid, v in binds)
+    pdu = _ber(_INFORM if inform else _TRAP_V2, _encode_int(_INTEGER, request_id) + _encode_int(_INTEGER, 0)
+               + _encode_int(_INTEGER, 0) + _ber(_SEQUENCE, vbl))
+    return _ber(_SEQUENCE, _encode_int(_INTEGER, 1) + _ber(_OCTETS, community.encode()) + pdu)
+
+
+def _oid_suffix_ip(oid: str, prefix: str) -> str:
+    return ".".join(oid[len(prefix):].split(".")[:4])
+
+
+def describe_trap(varbinds: List[Tuple[str, object]]) -> Dict:
+    """Turn trap varbinds into the same fields parse_syslog() yields (+ event)."""
+    values = dict(varbinds)
+    trap_oid = str(values.get(SNMP_TRAP_OID, ""))
+    name, event = TRAPS.get(trap_oid, (trap_oid or "unknown", None))
+    interface = subject = state = None
+
+    for oid, v in varbinds:
+        if oid.startswith(IF_NAME) or (oid.startswith(IF_DESCR) and interface is None):
+            interface = str(v)
+        elif oid.startswith(IF_INDEX) and interface is None:
+            interface = f"ifIndex {v}"
+        elif oid.startswith(OSPF_NBR_STATE):
+            subject = _oid_suffix_ip(oid, OSPF_NBR_STATE)
+            state = normalise_state(OSPF_NBR_STATES.get(v, str(v)))
+        elif oid.startswith(BGP_PEER_STATE):
+            subject = _oid_suffix_ip(oid, BGP_PEER_STATE)
+            state = normalise_state(BGP_PEER_STATES.get(v, str(v)))
+
+    if event == "link":
+        subject, state = interface, ("down" if name == "linkDown" else "up")
+    elif event == "bgp" and state is None:
+        state = "up" if "stablished" in name else "down"
+
+    severity = 4 if state == "down" else 5 if event else 6
+    detail = " ".join(x for x in (subject or interface, state) if x)
+    return {"facility": None, "severity": severity, "app": name, "interface": interface,
+            "event": event if subject and state else None, "subject": subject, "state": state,
+            "msg": f"{name} {detail}".strip() if event else
+                   f"{name} " + " ".join(f"{o}={v}" for o, v in varbinds[2:])}
+
+
+# ---------- datagrams -> Event rows ----------
+
+def load_address_map(csv_path: str = CSV_PATH) -> Dict[str, str]:
+    """Sender IP -> device name from the inventory CSV (empty if unreadable)."""
+    try:
+        with open(csv_path, newline="") as f:
+            rows = list(csv.DictReader(f))
+    except OSError:
+        return {}
+    out = {}
+    for row in rows:
+        row = {(k or "").strip().lower(): (v or "").strip() for k, v in row.items()}
+        if row.get("ip") and row.get("device"):
+            out[row["ip"]] = row["device"]
+    return out
+
+
+def to_event(ts: float, kind: str, addr: str, data: bytes,
+             names: Dict[str, str], community: Optional[str] = None) -> Optional[Event]:
+    if kind == "trap":
+        try:
+            comm, varbinds = parse_trap(data)
+        except (ValueError, IndexError):
+            return Event(ts, names.get(addr, addr), addr, "trap", 3, None, "malformed", None,
+                         None, None, None, f"undecodable SNMP datagram ({len(data)} bytes)")
+        if community is not None and comm != community:
+            return None
+        d = describe_trap(varbinds)
+        return Event(ts, names.get(addr, addr), addr, "trap", d["severity"], None, d["app"],
+                     d["interface"], d["event"], d["subject"], d["state"], d["msg"])
+
+    d = parse_syslog(data)
+    msg = d["msg"]
+    event, subject, state = classify(msg)
+    m = INTERFACE_RE.search(msg) if event != "link" else None
+    interface = subject if event == "link" else (m.group(1) if m else None)
+    return Event(ts, names.get(addr) or d["host"] or addr, addr, "syslog", d["severity"],
+                 d["facility"], d["app"], interface, event, subject, state, msg)
+
+
+def parse_batch(batch, names: Dict[str, str], community: Optional[str] = None) -> List[Event]:
+    out = []
+    for ts, kind, addr, data in batch:
+        e = to_event(ts, kind, addr, data, names, community)
+        if e is not None:
+            out.append(e)
+    return out
+
+
+# ---------- asyncio receiver ----------
+
+# Writer-process state (set once by _init_writer in the child)
+_writer = {}
+
+
+def _init_writer(db_path: str, names: Dict[str, str], community: Optional[str]) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # the parent decides when to stop
+    _writer.update(store=EventStore(db_path), names=names, community=community)
+
+
+def _write_batch(batch) -> int:
+    return _writer["store"].add_batch(parse_batch(batch, _writer["names"], _writer["community"]))
+
+
+class Ingest:
+    """
+    Decouples the UDP sockets from the (slower) parse + store path, which runs
+    in a single writer process so it never competes with the socket reads for
+    the GIL. One process keeps batches in order and SQLite single-writer.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, names: Optional[Dict[str, str]] = None,
+                 community: Optional[str] = None, batch: int = 5000,
+                 flush_interval: float = 0.2, max_pending: int = 1_000_000):
+        self.db_path = db_path
+        self.names = names or {}
+        self.community = community
+        self.batch = batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.stats = {"received": 0, "stored": 0, "dropped": 0, "batches": 0}
+        self._pending: List[Tuple[float, str, str, bytes]] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._sockets: List[Tuple[socket.socket, str]] = []     # (socket, "syslog" | "trap")
+        self._closing = False
+
+    def _drain(self, sock: socket.socket, kind: str, limit: int = 4096) -> None:
+        """
+        Reader callback: read up to `limit` datagrams per wakeup rather than the
+        one a DatagramProtocol gets per event-loop pass.
+        """
+        pending = self._pending
+        now = time.time()
+        received = dropped = 0
+        for _ in range(limit):
+            try:
+                data, addr = sock.recvfrom(65535)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                log.warning("%s socket error: %s", kind, e)
+                break
+            if len(pending) >= self.max_pending:
+                dropped += 1            # an unacknowledged inform is retried by its sender
+                continue
+            pending.append((now, kind, addr[0], data))
+            received += 1
+            if kind == "trap":
+                ack = inform_response(data, self.community)
+                if ack is not None:
+                    try:
+                        sock.sendto(ack, addr)
+                    except OSError as e:
+                        log.warning("could not acknowledge inform from %s: %s", addr[0], e)
+        self.stats["received"] += received
+        self.stats["dropped"] += dropped
+        if len(pending) >= self.batch:
+            self._wake.set()
+
+    async def _flush_once(self) -> None:
+        batch, self._pending = self._pending, []
+        if batch:
+            loop = asyncio.get_running_loop()
+            try:
+                self.stats["stored"] += await loop.run_in_executor(self._executor, _write_batch, batch)
+            except Exception:
+                log.exception("could not store a batch of %d messages", len(batch))
+                self.stats["dropped"] += len(batch)
+            self.stats["batches"] += 1
+
+    async def _writer_loop(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self._flush_once()
+
+    def listen(self, host: str, port: int, kind: str, rcvbuf: int = 8 << 20) -> int:
+        """Bind a UDP socket for `kind` ("syslog" | "trap"); returns the bound port."""
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            # Linux silently caps this at net.core.rmem_max; raise that too for big storms
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        except OSError:
+            log.warning("could not raise SO_RCVBUF to %d", rcvbuf)
+        sock.bind((host, port))
+        sock.setblocking(False)
+        self._sockets.append((sock, kind))
+        return sock.getsockname()[1]
+
+    async def run(self, stop: Optional[asyncio.Event] = None, report_every: float = 10.0) -> None:
+        """Receive and write batches until `stop` is set, then drain what was received."""
+        loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._executor = ProcessPoolExecutor(max_workers=1, initializer=_init_writer,
+                                             initargs=(self.db_path, self.names, self.community))
+        # Start the writer process before the first storm arrives
+        await loop.run_in_executor(self._executor, _write_batch, [])
+        for sock, kind in self._sockets:
+            loop.add_reader(sock.fileno(), self._drain, sock, kind)
+        writer = asyncio.ensure_future(self._writer_loop())
+        stop = stop or asyncio.Event()
+        last = dict(self.stats)
+        try:
+            while not stop.is_set():
+                try:
+                    await asyncio.wait_for(stop.wait(), report_every)
+                except asyncio.TimeoutError:
+                    pass
+                if self.stats != last:
+                    log.info("received=%(received)d stored=%(stored)d dropped=%(dropped)d "
+                             "batches=%(batches)d", self.stats)
+                    last = dict(self.stats)
+        finally:
+            for sock, kind in self._sockets:
+                loop.remove_reader(sock.fileno())
+                self._drain(sock, kind)
+                sock.close()
+            self._closing = True
+            self._wake.set()
+            await writer
+            await self._flush_once()
+            self._executor.shutdown(wait=True)
+
+
+async def serve(args) -> Dict[str, int]:
+    ingest = Ingest(args.db, load_address_map(args.csv), community=args.community,
+                    batch=args.batch, flush_interval=args.flush_ms / 1000.0,
+                    max_pending=args.max_pending)
+    ports = []
+    if args.syslog_port:
+        ports.append(f"syslog udp/{ingest.listen(args.host, args.syslog_port, 'syslog', args.rcvbuf)}")
+    if args.trap_port:
+        ports.append(f"traps udp/{ingest.listen(args.host, args.trap_port, 'trap', args.rcvbuf)}")
+    log.info("listening on %s (%s), writing to %s", args.host, ", ".join(ports), args.db)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    try:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+    except (NotImplementedError, RuntimeError):
+        pass    # Windows: Ctrl+C raises KeyboardInterrupt instead
+    await ingest.run(stop)
+    return ingest.stats
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Receive syslog and SNMP v2c traps into the event store.")
+    ap.add_argument("--host", default="0.0.0.0", help="Bind address (default: all)")
+    ap.add_argument("--syslog-port", type=int, default=514, help="0 disables (default: 514)")
+    ap.add_argument("--trap-port", type=int, default=162, help="0 disables (default: 162)")
+    ap.add_argument("--db", default=DB_PATH, help="SQLite event store")
+    ap.add_argument("--csv", default=CSV_PATH, help="Inventory CSV used to name senders by IP")
+    ap.add_argument("--community", help="Only accept traps with this community")
+    ap.add_argument("--batch", type=int, default=5000, help="Flush as soon as this many are queued")
+    ap.add_argument("--flush-ms", type=int, default=200, help="Flush at least this often")
+    ap.add_argument("--max-pending", type=int, default=1_000_000,
+                    help="Drop (and count) datagrams beyond this many queued")
+    ap.add_argument("--rcvbuf", type=int, default=8 << 20, help="Socket receive buffer bytes")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    try:
+        stats = asyncio.run(serve(args))
+    except PermissionError as e:
+        print(f"Cannot bind: {e} (ports below 1024 need root; try --syslog-port 5514 --trap-port 10162)")
+        return 2
+    except KeyboardInterrupt:
+        return 0
+    print(f"received={stats['received']} stored={stats['stored']} dropped={stats['dropped']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
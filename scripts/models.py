@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Typed device model shared by the GUI (gui/app.py) and the generator
+(generate_config.py).
+
+  device = Device.from_yaml_file("data/devices/R1_access.yaml")   # validates
+  device = Device.from_dict(raw_from_form)                        # same path
+  text   = device.to_yaml()            # what data/devices/*.yaml contains
+  data   = {"device": device.to_dict()}  # what the Jinja templates render
+
+Every class declares FIELDS once: (attribute, key path in the YAML, converter,
+required). Those specs are the single validation/normalisation pass:
+
+  * blank strings become None, numbers/bools/IPs are parsed and checked;
+  * rows that are entirely empty (the GUI's placeholder rows such as
+    `vlans: [{id: ''}]` or `static: [{prefix: null}]`) are dropped, and so
+    are sub-configs left with nothing in them (an OSPF block with no process
+    id and no networks);
+  * a row with *some* data but a missing required field is an error, as is
+    an unknown key (typos in hand-edited YAML);
+  * all problems are reported together in one ValidationError.
+
+Objects use __slots__ and store parsed values, so a large inventory costs a
+few hundred bytes per interface/VLAN rather than a dict per row.
+"""
+
+import ipaddress
+import json
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+class ValidationError(ValueError):
+    """Raised with every problem found in one document."""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("; ".join(errors))
+
+
+# ---------- converters: raw value -> normalised value (ValueError if bad) ----------
+
+def _blank(v: Any) -> bool:
+    return v is None or (isinstance(v, str) and v.strip() == "")
+
+
+def text(v):
+    return None if _blank(v) else str(v).strip()
+
+
+def integer(lo: int, hi: int) -> Callable:
+    def conv(v):
+        if _blank(v):
+            return None
+        if isinstance(v, bool):
+            raise ValueError(f"expected an integer, got {v!r}")
+        n = int(str(v).strip())
+        if not lo <= n <= hi:
+            raise ValueError(f"{n} is outside {lo}-{hi}")
+        return n
+    return conv
+
+
+def boolean(v):
+    if _blank(v):
+        return False
+    if isinstance(v, bool):
+        return v
+    s = str(v).strip().lower()
+    if s in ("true", "yes", "on", "1"):
+        return True
+    if s in ("false", "no", "off", "0"):
+        return False
+    raise ValueError(f"expected true/false, got {v!r}")
+
+
+def ip_address(v):
+    return None if _blank(v) else str(ipaddress.ip_address(str(v).strip()))
+
+
+def ip_interface(v):
+    """Address with optional prefix length (10.0.0.1/24, or a bare 10.0.0.1)."""
+    if _blank(v):
+        return None
+    s = str(v).strip()
+    ipaddress.ip_interface(s)
+    return s
+
+
+def ip_network(v):
+    if _blank(v):
+        return None
+    s = str(v).strip()
+    ipaddress.ip_network(s, strict=False)
+    return s
+
+
+def ospf_prefix(v):
+    """CIDR (10.0.0.0/8) or 'network wildcard' (10.0.0.0 0.255.255.255)."""
+    if _blank(v):
+        return None
+    s = " ".join(str(v).split())
+    if " " in s:
+        net, wild = s.split(" ", 1)
+        ipaddress.IPv4Address(net)
+        ipaddress.IPv4Address(wild)
+        return s
+    return ip_network(s)
+
+
+def area(v):
+    """OSPF area as an integer or dotted quad; kept as written."""
+    if _blank(v):
+        return None
+    s = str(v).strip()
+    if s.isdigit():
+        integer(0, 4294967295)(s)
+    else:
+        ipaddress.IPv4Address(s)
+    return s
+
+
+class ListOf(NamedTuple):
+    """Converter marker: list of models (or of scalars when item is a function)."""
+    item: Any
+
+
+class One(NamedTuple):
+    """Converter marker: a nested model."""
+    model: Any
+
+
+class Field(NamedTuple):
+    attr: str
+    path: Tuple[str, ...]
+    conv: Any
+    required: bool = False
+
+
+def F(attr: str, conv, required: bool = False, path: Optional[str] = None) -> Field:
+    return Field(attr, tuple((path or attr).split(".")), conv, required)
+
+
+# ---------- base model ----------
+
+class Model:
+    __slots__ = ()
+    FIELDS: Tuple[Field, ...] = ()
+    _keys: frozenset = frozenset()
+
+    def __init_subclass__(cls, **kw):
+        super().__init_subclass__(**kw)
+        cls._keys = frozenset(f.path[0] for f in cls.FIELDS)
+
+    def __init__(self, **values):
+        for f in self.FIELDS:
+            default = [] if isinstance(f.conv, ListOf) else None
+            setattr(self, f.attr, values.pop(f.attr, default))
+        if values:
+            raise TypeError(f"{type(self).__name__}: unknown fields {sorted(values)}")
+
+    def __repr__(self):
+        body = ", ".join(f"{f.attr}={getattr(self, f.attr)!r}" for f in self.FIELDS
+                         if getattr(self, f.attr) not in (None, [], False))
+        return f"{type(self).__name__}({body})"
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, f.attr) == getattr(other, f.attr) for f in self.FIELDS)
+
+    def is_empty(self) -> bool:
+        return all(getattr(self, f.attr) in (None, [], False) for f in self.FIELDS)
+
+    @classmethod
+    def parse(cls, raw: Any, where: str, errors: List[str]):
+        """Convert one mapping; returns None for empty rows (appends to errors)."""
+        if raw is None:
+            return None
+        if not isinstance(raw, dict):
+            errors.append(f"{where}: expected a mapping, got {type(raw).__name__}")
+            return None
+        unknown = raw.keys() - cls._keys
+        if unknown:
+            errors.append(f"{where}: unknown field(s) {', '.join(sorted(map(str, unknown)))}")
+
+        obj = cls.__new__(cls)
+        n_errors = len(errors)
+        failed = set()
+        for f in cls.FIELDS:
+            v = raw
+            for key in f.path:
+                v = v.get(key) if isinstance(v, dict) else None
+            loc = f"{where}.{'.'.join(f.path)}"
+            conv = f.conv
+            if isinstance(conv, ListOf):
+                v = _parse_list(conv.item, v, loc, errors)
+            elif isinstance(conv, One):
+                v = conv.model.parse(v, loc, errors)
+            else:
+                try:
+                    v = conv(v)
+                except (TypeError, ValueError) as e:
+                    errors.append(f"{loc}: {e}")
+                    failed.add(f.attr)
+                    v = None
+            setattr(obj, f.attr, v)
+
+        if len(errors) == n_errors and obj.is_empty():
+            return None
+        for f in cls.FIELDS:
+            if f.required and f.attr not in failed and getattr(obj, f.attr) in (None, []):
+                errors.append(f"{where}.{'.'.join(f.path)}: required")
+        return obj
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Nested dict in the data/devices YAML layout (all keys present)."""
+        out: Dict[str, Any] = {}
+        for f in self.FIELDS:
+            v = getattr(self, f.attr)
+            if isinstance(v, Model):
+                v = v.to_dict()
+            elif isinstance(v, list):
+                v = [i.to_dict() if isinstance(i, Model) else i for i in v]
+            node = out
+            for key in f.path[:-1]:
+                node = node.setdefault(key, {})
+            node[f.path[-1]] = v
+        return out
+
+
+def _parse_list(item, raw, where: str, errors: List[str]) -> list:
+    if raw is None:
+        return []
+    if not isinstance(raw, list):
+        errors.append(f"{where}: expected a list, got {type(raw).__name__}")
+        return []
+    out = []
+    for i, row in enumerate(raw):
+        loc = f"{where}[{i}]"
+        if isinstance(item, type) and issubclass(item, Model):
+            v = item.parse(row, loc, errors)
+        else:
+            try:
+                v = item(row)
+            except (TypeError, ValueError) as e:
+                errors.append(f"{loc}: {e}")
+                v = None
+        if v is not None:
+            out.append(v)
+    return out
+
+
+# ---------- device schema ----------
+
+class Vlan(Model):
+    FIELDS = (
+        F("id", integer(1, 4094), required=True),
+        F("name", text),
+        F("ipv4_subnet", ip_interface),
+        F("ipv6_subnet", ip_interface),
+        F("ospfv3_area", area, path="ospfv3.area"),
+        F("mtu", integer(68, 9216)),
+        F("dhcp_enabled", boolean),
+        F("dhcp_range_start", ip_address),
+        F("dhcp_range_end", ip_address),
+        F("default_gateway", ip_address),
+        F("dhcpv6_range_start", ip_address),
+        F("dhcpv6_range_end", ip_address),
+        F("ipv4_virtual_router_address", ip_address),
+        F("ipv6_virtual_router_address", ip_address),
+    )
+    __slots__ = tuple(f.attr for f in FIELDS)
+
+
+class Interface(Model):
+    FIELDS = (
+        F("name", text, required=True),
+        F("ipv4", ip_interface),
+        F("ipv6", ip_interface),
+        F("mtu", integer(68, 9216)),
+        F("speed", text),
+        F("switchport_mode", text),
+        F("ospfv3_area", area),
+    )
+    __slots__ = tuple(f.attr for f in FIELDS)
+
+
+class StaticRoute(Model):
+    FIELDS = (
+        F("prefix", ip_network, required=True),
+        F("next_hop", text, required=True),    # address or egress interface
+    )
+    __slots__ = tuple(f.attr for f in FIELDS)
+
+
+class OspfNetwork(Model):
+    FIELDS = (
+        F("prefix", ospf_prefix, required=True),
+        F("area", area, required=True),
+    )
+    __slots__ = tuple(f.attr for f in FIELDS)
+
+
+class OspfConfig(Model):
+    FIELDS = (
+        F("id", integer(1, 65535), required=True),
+        F("router_id", ip_address),
+        F("networks", ListOf(OspfNetwork)),
+    )
+    __slots__ = tuple(f.attr for f in FIELDS)
+
+
+class Ospfv3Config(Model):
+    FIELDS = (
+        F("address_family", text),
+        F("redistribute_bgp", boolean),
+    )
+    __slots__ = tuple(f.attr for f in FIELDS)
+
+
+class RipNetwork(Model):
+    FIELDS = (F("prefix", ip_network, required=True),)
+    __slots__ = tuple(f.attr for f in FIELDS)
+
+
+class RipConfig(Model):
+    FIELDS = (F("networks", ListOf(RipNetwork)),)
+    __slots__ = tuple(f.attr for f in FIELDS)
+
+
+class BgpNeighbor(Model):
+    FIELDS = (
+        F("ip", ip_address, required=True),
+        F("remote_as", integer(1, 4294967295), required=True),
+        F("update_source", text),
+        F("password", text),
+        F("ebgp_multihop", integer(1, 255)),
+    )
+    __slots__ = tuple(f.attr for f in FIELDS)
+
+
+class BgpConfig(Model):
+    FIELDS = (
+        F("as_number", integer(1, 4294967295), required=True, path="as"),
+        F("router_id", ip_address),
+        F("neighbors", ListOf(BgpNeighbor)),
+        F("networks", ListOf(ip_network)),
+    )
+    __slots__ = tuple(f.attr for f in FIELDS)
+
+
+class Device(Model):
+    FIELDS = (
+        F("name", text, required=True),
+        F("vendor", text),
+        F("mgmt_ip", ip_interface),
+        F("site", text),
+        F("admin_secret", text),
+        F("snmp_host", ip_address),
+        F("vlans", ListOf(Vlan)),
+        F("interfaces", ListOf(Interface)),
+        F("static_routes", ListOf(StaticRoute), path="routes.static"),
+        F("ipv6_static_routes", ListOf(StaticRoute), path="routes.ipv6_static"),
+        F("ospf", One(OspfConfig), path="routing_protocols.ospf"),
+        F("ospfv3", One(Ospfv3Config), path="routing_protocols.ospfv3"),
+        F("rip", One(RipConfig), path="routing_protocols.rip"),
+        F("bgp", One(BgpConfig), path="routing_protocols.bgp"),
+    )
+    __slots__ = tuple(f.attr for f in FIELDS)
+
+    # Top-level keys that only group fields (routes:, routing_protocols:)
+    _GROUPS = {"routes": {"static", "ipv6_static"},
+               "routing_protocols": {"ospf", "ospfv3", "rip", "bgp"}}
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "Device":
+        """
+        Validate and normalise a device mapping. Accepts the bare device or
+        the on-disk {'device': {...}} wrapper.
+        """
+        if isinstance(raw, dict) and set(raw) == {"device"}:
+            raw = raw["device"]
+        errors: List[str] = []
+        if isinstance(raw, dict):
+            for group, keys in cls._GROUPS.items():
+                sub = raw.get(group)
+                if isinstance(sub, dict) and sub.keys() - keys:
+                    errors.append(f"device.{group}: unknown field(s) "
+                                  f"{', '.join(sorted(map(str, sub.keys() - keys)))}")
+        device = cls.parse(raw, "device", errors)
+        if device is None and not errors:
+            errors.append("device: empty")
+        if errors:
+            raise ValidationError(errors)
+        return device
+
+    # ----- YAML / JSON -----
+
+    @classmethod
+    def from_yaml(cls, text: str) -> "Device":
+        import yaml
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        return cls.from_dict(yaml.load(text, Loader=loader) or {})
+
+    @classmethod
+    def from_yaml_file(cls, path: str) -> "Device":
+        with open(path) as f:
+            return cls.from_yaml(f.read())
+
+    def to_yaml(self) -> str:
+        import yaml
+        dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+        return yaml.dump({"device": self.to_dict()}, Dumper=dumper, sort_keys=False)
+
+    @classmethod
+    def from_json(cls, text: str) -> "Device":
+        return cls.from_dict(json.loads(text))
+
+    def to_json(self) -> str:
+        return json.dumps({"device": self.to_dict()}, separators=(",", ":"))
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+netman - one entry point for the operational scripts.
+
+  python3 -m scripts.netman backup [--csv ...] [--outdir ...] [--only R1 R2]
+  python3 -m scripts.netman health [--csv ...] [--only [R1 ...]] [--backend ssh|gnmi]
+  python3 -m scripts.netman ping   --csv data/ssh/sshInfo.csv [--dst 1.1.1.2]
+  python3 -m scripts.netman render --config data/devices/R1_access.yaml
+  python3 -m scripts.netman compliance [--json out.json] [--junit out.xml]
+  python3 -m scripts.netman routes collect | trace R1 10.2.0.5 | lookup R1 10.2.0.5
+  python3 -m scripts.netman snapshot capture --name pre | diff pre post [--junit out.xml]
+  python3 -m scripts.netman ztp serve [--port 8080] | bench [--concurrency 300]
+  python3 -m scripts.netman telemetry [--once] [--json reports/telemetry.json]
+  python3 -m scripts.netman ingest [--syslog-port 514] [--trap-port 162]
+  python3 -m scripts.netman replay [--count 100000] [--rate 5000] [--file syslog.log]
+
+Everything after the subcommand is handed to that script's own argument
+parser (so `netman backup --help` shows the backup options).
+
+Only argparse/importlib are loaded up front; the module behind a subcommand
+(and with it netmiko, rich, jinja2, ...) is imported when that subcommand
+runs. Keep it that way -- scripts/test_netman.py checks it and
+scripts/importtime.py measures it.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+from typing import List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# subcommand -> (module providing main(argv), help text)
+COMMANDS = {
+    "backup": ("scripts.config",         "Save golden configs with timestamped filenames"),
+    "health": ("scripts.health_check",   "Health checks (interactive menu, or --only for cron)"),
+    "ping":   ("scripts.ping_webserver", "Ping a destination from every device; non-zero exit on failure"),
+    "render": ("generate_config",        "Render a device config from YAML + Jinja2"),
+    "compliance": ("scripts.compliance", "Check configs against data/compliance/rules.yaml"),
+    "routes": ("scripts.routes",         "Route index: collect tables, longest-prefix lookup, path trace"),
+    "snapshot": ("scripts.snapshot",     "Pre/post-change state snapshots; diff exits 1 on regressions"),
+    "ztp": ("scripts.ztp",               "Serve generated configs to ZTP clients by hostname/serial/MAC"),
+    "telemetry": ("scripts.telemetry",   "Stream EOS health metrics over gNMI (no SSH polling)"),
+    "ingest": ("scripts.ingest",         "Receive syslog + SNMP traps into the event store"),
+    "replay": ("scripts.replay_events",  "Replay syslog/traps at the ingest receiver over UDP"),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(
+        prog="netman",
+        description="advanced-netman operational CLI.",
+    )
+    sub = ap.add_subparsers(dest="command", metavar="COMMAND")
+    sub.required = True
+    for name, (_, help_text) in COMMANDS.items():
+        # add_help=False: let --help fall through to the target script's parser
+        sub.add_parser(name, help=help_text, add_help=False)
+    return ap
+
+
+def load_command(name: str):
+    """Import the module behind a subcommand and return its main()."""
+    module_name, _ = COMMANDS[name]
+    # generate_config.py lives at the repo root rather than in scripts/
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    return importlib.import_module(module_name).main
+
+
+def main(argv: Optional[List[str]] = None):
+    args, rest = build_parser().parse_known_args(argv)
+    return load_command(args.command)(rest)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,9 +2,11 @@
 import argparse
 import csv
 import os
-from loguru import logger
-from netmiko import ConnectHandler
-from netmiko import NetmikoTimeoutException, NetmikoAuthenticationException
+
+try:
+    from scripts import sessions, timing
+except ImportError:  # run directly as scripts/ping_webserver.py
+    import sessions, timing
 
 def read_devices(csv_path):
     devices = []
@@ -32,7 +34,11 @@ def send_eos_ping(conn, dst, vrf=None, count=3):
     last_out = ""
     for cmd in cmds:
         try:
-            out = conn.send_command(cmd, expect_string=r"#", strip_prompt=False, strip_command=False)
+            with timing.span("command", cmd=cmd):
+                # Session.send: reads to the calibrated prompt under the fast
+                # profile and falls back to safe (netmiko's own prompt
+                # detection) if that read times out
+                out = conn.send(cmd, read_timeout=30, strip_prompt=False, strip_command=False)
             last_out = out or ""
             # consider success if we see any echo replies or 0% packet loss or "bytes from"
             text = out.lower()
@@ -51,13 +57,19 @@ def send_eos_ping(conn, dst, vrf=None, count=3):
 
     return False, last_out
 
-def main():
+def main(argv=None):
     ap = argparse.ArgumentParser()
     ap.add_argument("--csv", required=True, help="Path to sshInfo.csv")
     ap.add_argument("--dst", default="1.1.1.2", help="Destination to ping")
     ap.add_argument("--count", type=int, default=3, help="Ping count")
     ap.add_argument("--vrf", default=os.environ.get("JENKINS_PING_VRF", ""), help="VRF name (e.g., mgmt)")
-    args = ap.parse_args()
+    ap.add_argument("--profile", choices=sorted(sessions.PROFILES), default=sessions.DEFAULT_PROFILE,
+                    help="Netmiko session profile (default: $NETMAN_PROFILE or safe)")
+    args = ap.parse_args(argv)
+
+    # Imported here so the CLI parses (and --help answers) without loading netmiko
+    from netmiko import ConnectHandler
+    from netmiko import NetmikoTimeoutException, NetmikoAuthenticationException
 
     devices = read_devices(args.csv)
     print(f"\nPing destination: {args.dst}")
@@ -76,16 +88,19 @@ def main():
             "password": d["password"],
         }
         try:
-            conn = ConnectHandler(**dev)
-            conn.enable()
-            ok, out = send_eos_ping(conn, args.dst, vrf=(args.vrf or None), count=args.count)
-            print(out.strip() if out else "(no output)")
-            if ok:
-                print("RESULT: PASS\n")
-            else:
-                print("RESULT: FAIL\n")
-                any_fail = True
-            conn.disconnect()
+            with timing.span("ping", device=name, vendor=d["device_type"]):
+                conn = sessions.open_session(ConnectHandler, dev, args.profile)
+                with timing.span("enable"):
+                    conn.enable()
+                ok, out = send_eos_ping(conn, args.dst, vrf=(args.vrf or None), count=args.count)
+                print(out.strip() if out else "(no output)")
+                if ok:
+                    print("RESULT: PASS\n")
+                else:
+                    print("RESULT: FAIL\n")
+                    any_fail = True
+                with timing.span("disconnect"):
+                    conn.disconnect()
         except (NetmikoTimeoutException, NetmikoAuthenticationException) as e:
             print(f"RESULT: FAIL (SSH error: {e})\n")
             any_fail = True
@@ -93,6 +108,8 @@ def main():
             print(f"RESULT: FAIL (Unexpected error: {e})\n")
             any_fail = True
 
+    timing.log_summary()
+
     # Non-zero exit if any device failed (so Jenkins marks build red)
     if any_fail:
         exit(1)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Replay syslog messages / SNMP traps at scripts/ingest.py over local UDP.
+
+  # synthetic storm: link flaps, OSPF/BGP drops and filler lines, flat out
+  python3 -m scripts.replay_events --count 100000
+
+  # a captured log (one syslog message per line), 5k msg/s
+  python3 -m scripts.replay_events --file /var/log/remote/R1.log --rate 5000
+
+Point it at the same ports the receiver listens on (defaults match
+`scripts.ingest --syslog-port 5514 --trap-port 10162`). Compare the
+"sent" count printed here with the receiver's received/stored/dropped line.
+"""
+
+import argparse
+import itertools
+import socket
+import sys
+import time
+from typing import Iterator, List, Optional, Tuple
+
+try:
+    from scripts.ingest import BGP_PEER_STATE, IF_INDEX, IF_NAME, OSPF_NBR_STATE, encode_trap
+except ImportError:  # run directly as scripts/replay_events.py
+    from ingest import BGP_PEER_STATE, IF_INDEX, IF_NAME, OSPF_NBR_STATE, encode_trap
+
+DEVICES = ("R1", "R2", "R3", "R4", "R5")
+
+
+def synthetic(traps: bool = True) -> Iterator[Tuple[str, bytes]]:
+    """Endless ("syslog" | "trap", datagram) mix resembling an event storm."""
+    for n in itertools.count():
+        dev = DEVICES[n % len(DEVICES)]
+        port = n % 48 + 1
+        state = "down" if n % 2 else "up"
+        stamp = time.strftime("%b %d %H:%M:%S")
+        kind = n % 10
+        if kind < 4:
+            msg = (f"<187>{stamp} {dev} Ebra: %LINEPROTO-5-UPDOWN: Line protocol on "
+                   f"Interface Ethernet{port}, changed state to {state}")
+        elif kind == 4:
+            verb = "DOWN" if n % 2 else "FULL"
+            msg = (f"<189>{stamp} {dev} %OSPF-5-ADJCHG: Process 1, Nbr 10.0.{port}.2 on "
+                   f"Ethernet{port} from LOADING to {verb}, Loading Done")
+        elif kind == 5:
+            new = "Idle" if n % 2 else "Established"
+            msg = (f"<189>{stamp} {dev} Bgp: %BGP-5-ADJCHANGE: peer 10.1.{port}.2 "
+                   f"(VRF default AS 6500{port % 10}) old state OpenConfirm event RecvKeepAlive "
+                   f"new state {new}")
+        elif kind == 6 and traps:
+            if n % 3 == 0:
+                yield "trap", encode_trap("1.3.6.1.2.1.14.16.2.2",
+                                          [(f"{OSPF_NBR_STATE}10.0.{port}.2.0", 1 if n % 2 else 8)],
+                                          uptime=n)
+            elif n % 3 == 1:
+                yield "trap", encode_trap("1.3.6.1.2.1.15.0.2",
+                                          [(f"{BGP_PEER_STATE}10.1.{port}.2", 1)], uptime=n)
+            else:
+                yield "trap", encode_trap("1.3.6.1.6.3.1.1.5.3" if n % 2 else "1.3.6.1.6.3.1.1.5.4",
+                                          [(f"{IF_INDEX}{port}", port), (f"{IF_NAME}{port}", f"Ethernet{port}")],
+                                          uptime=n)
+            continue
+        else:
+            msg = (f"<190>1 {time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())} {dev} "
+                   f"ConfigAgent - - - %SYS-6-LOGMSG_INFO: replay filler message {n}")
+        yield "syslog", msg.encode()
+
+
+def from_file(path: str) -> List[Tuple[str, bytes]]:
+    with open(path, "rb") as f:
+        return [("syslog", line.rstrip(b"\r\n")) for line in f if line.strip()]
+
+
+def replay(messages, host: str, syslog_port: int, trap_port: int,
+           count: Optional[int] = None, rate: float = 0.0) -> int:
+    """Send until `count` messages (or the input) run out; returns how many were sent."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_DGRAM)
+    ports = {"syslog": (host, syslog_port), "trap": (host, trap_port)}
+    interval = 1.0 / rate if rate > 0 else 0.0
+    start = time.perf_counter()
+    sent = 0
+    try:
+        for kind, data in itertools.islice(messages, count):
+            sock.sendto(data, ports[kind])
+            sent += 1
+            if interval:
+                # pace against the schedule, not per message, so the average holds
+                delay = start + sent * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+    finally:
+        sock.close()
+    return sent
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Replay syslog/SNMP traps at the ingest receiver.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--syslog-port", type=int, default=5514)
+    ap.add_argument("--trap-port", type=int, default=10162)
+    ap.add_argument("--file", help="Replay this syslog file (one message per line) instead")
+    ap.add_argument("--count", type=int, help="Stop after this many (default: 10000 synthetic, or the whole file)")
+    ap.add_argument("--rate", type=float, default=0.0, help="Messages per second (default: as fast as possible)")
+    ap.add_argument("--loop", action="store_true", help="Repeat --file until --count is reached")
+    ap.add_argument("--no-traps", action="store_true", help="Synthetic mode: syslog only")
+    args = ap.parse_args(argv)
+
+    if args.file:
+        lines = from_file(args.file)
+        messages = itertools.cycle(lines) if args.loop else iter(lines)
+        count = args.count
+    else:
+        messages = synthetic(traps=not args.no_traps)
+        count = args.count or 10000
+
+    start = time.perf_counter()
+    sent = replay(messages, args.host, args.syslog_port, args.trap_port, count, args.rate)
+    elapsed = time.perf_counter() - start
+    print(f"sent={sent} in {elapsed:.2f}s ({sent / elapsed if elapsed else 0:,.0f} msg/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,654 @@
+#!/usr/bin/env python3
+"""
+Fleet route index: every device's `show ip route` in a longest-prefix-match
+trie per (device, VRF), plus hop-by-hop path tracing across devices.
+
+  python3 -m scripts.routes collect [--only R1 R2]     # SSH, saves .cache/routes/<dev>.txt
+  python3 -m scripts.routes lookup R1 10.2.0.5 [--vrf default]
+  python3 -m scripts.routes trace R1 10.2.0.5          # follows next hops device to device
+  python3 -m scripts.routes bench --prefixes 900000    # lookup cost on a full-table-sized RIB
+
+Route tables come from `collect` or from every health check (health_check.py
+saves the full `show ip route` output). Both EOS (`VRF:` sections) and IOS
+(`Routing Table:` sections, classful "is subnetted" headers, ECMP
+continuation lines) formats are parsed.
+
+PatriciaTrie is a path-compressed binary trie over integer addresses: a
+lookup walks only branch points (a few dozen at most), compares each node
+with one XOR+shift and remembers the last node holding a route, so a
+lookup costs microseconds regardless of table size.
+
+RouteIndex.refresh() is incremental: files whose (mtime, size) and then
+content hash are unchanged are skipped, and for changed ones only the added,
+removed or modified prefixes are written to (or deleted from) the trie.
+
+Tracing needs to know which device owns a next-hop address; that map comes
+from the `interface` / `ip address` lines of the newest golden config per
+device (and IOS `L` local routes).
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import socket
+import sys
+import time
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROUTES_DIR = os.environ.get("NETMAN_ROUTES_DIR") or os.path.join(REPO_ROOT, ".cache", "routes")
+GOLDEN_DIR = os.path.join(REPO_ROOT, "golden-configs")
+CSV_PATH = os.environ.get("SSHINFO_CSV") or os.path.join(REPO_ROOT, "data", "ssh", "sshInfo.csv")
+
+ROUTE_CMDS = {"arista_eos": "show ip route vrf all", "cisco_ios": "show ip route"}
+
+
+def ip_to_int(ip: str) -> int:
+    """Dotted-quad IPv4 address as an int; ValueError for anything else."""
+    try:
+        # inet_pton, not inet_aton: the latter takes shorthand like "10.1" (= 10.0.0.1)
+        return int.from_bytes(socket.inet_pton(socket.AF_INET, ip), "big")
+    except OSError:
+        raise ValueError(f"not an IPv4 address: {ip!r}") from None
+
+
+def int_to_ip(n: int) -> str:
+    return socket.inet_ntoa(n.to_bytes(4, "big"))
+
+
+# ---------- Patricia trie ----------
+
+class _Node:
+    __slots__ = ("key", "length", "value", "children")
+
+    def __init__(self, key: int, length: int, value=None):
+        self.key = key
+        self.length = length
+        self.value = value
+        self.children = [None, None]
+
+
+class PatriciaTrie:
+    """Longest-prefix match over `width`-bit integer keys (32 for IPv4)."""
+
+    __slots__ = ("width", "root", "size")
+
+    def __init__(self, width: int = 32):
+        self.width = width
+        self.root = _Node(0, 0)
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _bit(self, key: int, pos: int) -> int:
+        return (key >> (self.width - 1 - pos)) & 1
+
+    def _mask(self, key: int, length: int) -> int:
+        shift = self.width - length
+        return (key >> shift) << shift
+
+    def insert(self, key: int, length: int, value) -> None:
+        key = self._mask(key, length)
+        node = self.root
+        while True:
+            if node.length == length:
+                if node.value is None:
+                    self.size += 1
+                node.value = value
+                return
+            bit = self._bit(key, node.length)
+            child = node.children[bit]
+            if child is None:
+                node.children[bit] = _Node(key, length, value)
+                self.size += 1
+                return
+            # length of the prefix shared by `key` and `child`
+            limit = min(child.length, length)
+            diff = (key ^ child.key) >> (self.width - limit) if limit else 0
+            common = limit - diff.bit_length()
+            if common == child.length:
+                node = child
+                continue
+            split = _Node(self._mask(key, common), common)
+            node.children[bit] = split
+            split.children[self._bit(child.key, common)] = child
+            if common == length:
+                split.value = value
+            else:
+                split.children[self._bit(key, common)] = _Node(key, length, value)
+            self.size += 1
+            return
+
+    def delete(self, key: int, length: int) -> bool:
+        key = self._mask(key, length)
+        node, parent, grand = self.root, None, None
+        while node is not None and node.length < length:
+            if (key ^ node.key) >> (self.width - node.length) if node.length else 0:
+                return False
+            parent, grand, node = node, parent, node.children[self._bit(key, node.length)]
+        if node is None or node.length != length or node.key != key or node.value is None:
+            return False
+        node.value = None
+        self.size -= 1
+        # keep the trie compressed: drop empty leaves, splice out one-child nodes
+        if node is not self.root:
+            self._compact(node, parent)
+            if parent is not self.root and parent.value is None and grand is not None:
+                self._compact(parent, grand)
+        return True
+
+    def _compact(self, node: _Node, parent: _Node) -> None:
+        kids = [c for c in node.children if c is not None]
+        if node.value is not None or len(kids) == 2:
+            return
+        slot = parent.children.index(node)
+        parent.children[slot] = kids[0] if kids else None
+
+    def lookup(self, key: int) -> Optional[Tuple[int, int, object]]:
+        """(prefix key, length, value) of the longest match, or None."""
+        width = self.width
+        node = self.root
+        best = None
+        while node is not None:
+            length = node.length
+            if length and (key ^ node.key) >> (width - length):
+                break
+            if node.value is not None:
+                best = node
+            if length == width:
+                break
+            node = node.children[(key >> (width - 1 - length)) & 1]
+        return (best.key, best.length, best.value) if best is not None else None
+
+    def items(self) -> Iterable[Tuple[int, int, object]]:
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.value is not None:
+                yield node.key, node.length, node.value
+            stack.extend(c for c in reversed(node.children) if c is not None)
+
+
+# ---------- parsing `show ip route` ----------
+
+class Route(NamedTuple):
+    prefix: str                                   # "10.1.0.0/24"
+    proto: str                                    # route code(s): "C", "O E2", "B E", ...
+    distance: Optional[int]
+    metric: Optional[int]
+    next_hops: Tuple[Tuple[Optional[str], Optional[str]], ...]   # (address, interface)
+
+
+_ADDR = r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}"
+_ROUTE_RE = re.compile(
+    rf"^\s?(?P<codes>[A-Za-z*][A-Za-z0-9*]{{0,3}}(?: [A-Za-z0-9*]{{1,3}})?)\s+"
+    rf"(?P<addr>{_ADDR})(?:/(?P<len>\d{{1,2}}))?\s*(?P<rest>.*)$")
+_CONT_RE = re.compile(rf"^\s+(?:\[(?P<ad>\d+)/(?P<metric>\d+)\]\s+)?via (?P<nh>{_ADDR})(?P<tail>.*)$")
+_AD_RE = re.compile(r"^\[(\d+)/(\d+)\]\s*")
+_VIA_RE = re.compile(rf"via (?P<nh>{_ADDR})(?P<tail>[^\n]*)")
+_SUBNETTED_RE = re.compile(rf"^\s+(?P<addr>{_ADDR})/(?P<len>\d+) is subnetted")
+_VRF_RE = re.compile(r"^(?:VRF|Routing Table):\s*(?P<vrf>\S+)")
+
+
+def _iface(tail: str) -> Optional[str]:
+    # ", Ethernet1" | ", 00:01:02, GigabitEthernet0/1" | "" (recursive)
+    fields = [f.strip() for f in tail.split(",") if f.strip()]
+    return fields[-1] if fields and not re.match(r"^[\d:]+[dhwmy\d]*$", fields[-1]) else None
+
+
+def _classful(addr: int) -> int:
+    first = addr >> 24
+    return 8 if first < 128 else 16 if first < 192 else 24
+
+
+def parse_routes(text: str) -> Dict[str, Dict[str, Route]]:
+    """{vrf: {prefix: Route}} from EOS or IOS `show ip route [vrf all]` output."""
+    vrfs: Dict[str, Dict[str, Route]] = {}
+    table = vrfs.setdefault("default", {})
+    current: Optional[Route] = None
+    subnetted: Tuple[int, int] = (-1, 0)     # IOS "10.0.0.0/24 is subnetted": (classful net, len)
+
+    def flush():
+        if current is not None:
+            table[current.prefix] = current
+
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        m = _VRF_RE.match(line)
+        if m:
+            flush()
+            current = None
+            table = vrfs.setdefault(m.group("vrf"), {})
+            continue
+        m = _SUBNETTED_RE.match(line)
+        if m:
+            subnetted = (ip_to_int(m.group("addr")), int(m.group("len")))
+            continue
+        m = _ROUTE_RE.match(line)
+        if m:
+            flush()
+            addr = m.group("addr")
+            if m.group("len") is not None:
+                length = int(m.group("len"))
+            else:
+                n = ip_to_int(addr)
+                classful = _classful(n)
+                net = n >> (32 - classful) << (32 - classful)
+                length = subnetted[1] if net == subnetted[0] else classful
+            rest = m.group("rest")
+            distance = metric = None
+            ad = _AD_RE.match(rest)
+            if ad:
+                distance, metric = int(ad.group(1)), int(ad.group(2))
+                rest = rest[ad.end():]
+            if "directly connected" in rest:
+                hops = ((None, _iface(rest.split("directly connected", 1)[1])),)
+            else:
+                via = _VIA_RE.search(rest)
+                hops = ((via.group("nh"), _iface(via.group("tail"))),) if via else ()
+            net = int_to_ip(ip_to_int(addr) >> (32 - length) << (32 - length)) if length else "0.0.0.0"
+            current = Route(f"{net}/{length}", " ".join(m.group("codes").split()), distance, metric, hops)
+            continue
+        m = _CONT_RE.match(line)
+        if m and current is not None:
+            current = current._replace(next_hops=current.next_hops + ((m.group("nh"), _iface(m.group("tail"))),))
+    flush()
+    return {vrf: routes for vrf, routes in vrfs.items() if routes or vrf != "default"}
+
+
+_INTERFACE_RE = re.compile(r"^interface (\S+)")
+_IP_ADDRESS_RE = re.compile(rf"^\s+ip address ({_ADDR})(?:/(\d+)| ({_ADDR}))")
+
+
+def interface_addresses(config: str) -> List[Tuple[str, str]]:
+    """[(interface, address)] from EOS/IOS running-config text."""
+    out, iface = [], None
+    for line in config.splitlines():
+        m = _INTERFACE_RE.match(line)
+        if m:
+            iface = m.group(1)
+            continue
+        if not line.startswith(" "):
+            iface = None
+            continue
+        m = _IP_ADDRESS_RE.match(line)
+        if m and iface:
+            out.append((iface, m.group(1)))
+    return out
+
+
+# ---------- the index ----------
+
+class RouteIndex:
+    """One PatriciaTrie per (device, vrf), refreshed incrementally from ROUTES_DIR."""
+
+    def __init__(self, routes_dir: str = ROUTES_DIR):
+        self.routes_dir = routes_dir
+        self.tries: Dict[Tuple[str, str], PatriciaTrie] = {}
+        self.routes: Dict[str, Dict[str, Dict[str, Route]]] = {}   # device -> vrf -> prefix -> Route
+        self.owners: Dict[str, Tuple[str, str]] = {}               # address -> (device, interface)
+        self._seen: Dict[str, Tuple[int, int, str]] = {}           # file -> (mtime_ns, size, sha1)
+        self._config_owners: Dict[str, Tuple[str, str]] = {}       # the part of owners from golden configs
+        self._owners_stamp: Optional[list] = None                  # [(path, mtime_ns, size)] they came from
+
+    def devices(self) -> List[str]:
+        return sorted(self.routes)
+
+    def vrfs(self, device: str) -> List[str]:
+        return sorted(self.routes.get(device, {}))
+
+    def load(self, device: str, text: str) -> Dict[str, int]:
+        """Apply one device's table, touching only prefixes that changed."""
+        new = parse_routes(text)
+        old = self.routes.get(device, {})
+        stats = {"added": 0, "removed": 0, "changed": 0}
+        for vrf in set(old) | set(new):
+            before, after = old.get(vrf, {}), new.get(vrf, {})
+            trie = self.tries.get((device, vrf))
+            if trie is None:
+                trie = self.tries[(device, vrf)] = PatriciaTrie()
+            for prefix in before.keys() - after.keys():
+                addr, length = prefix.split("/")
+                trie.delete(ip_to_int(addr), int(length))
+                stats["removed"] += 1
+            for prefix, route in after.items():
+                prev = before.get(prefix)
+                if prev == route:
+                    continue
+                addr, length = prefix.split("/")
+                trie.insert(ip_to_int(addr), int(length), route)
+                stats["changed" if prev else "added"] += 1
+            if not after:
+                del self.tries[(device, vrf)]
+        self.routes[device] = new
+        for vrf_routes in new.values():
+            for route in vrf_routes.values():
+                # IOS "L" routes are the device's own addresses
+                if route.proto == "L" and route.prefix.endswith("/32"):
+                    self.owners.setdefault(route.prefix[:-3], (device, route.next_hops[0][1] or ""))
+        return stats
+
+    def remove(self, device: str) -> None:
+        for vrf in self.routes.pop(device, {}):
+            self.tries.pop((device, vrf), None)
+
+    def refresh(self) -> Dict[str, Dict[str, int]]:
+        """Reload changed <device>.txt files from routes_dir; returns per-device stats."""
+        changes = {}
+        try:
+            names = sorted(f for f in os.listdir(self.routes_dir) if f.endswith(".txt"))
+        except FileNotFoundError:
+            names = []
+        for fname in names:
+            path = os.path.join(self.routes_dir, fname)
+            st = os.stat(path)
+            seen = self._seen.get(fname)
+            if seen and seen[:2] == (st.st_mtime_ns, st.st_size):
+                continue
+            with open(path, encoding="utf-8", errors="replace") as f:
+                text = f.read()
+            digest = hashlib.sha1(text.encode()).hexdigest()
+            self._seen[fname] = (st.st_mtime_ns, st.st_size, digest)
+            if seen and seen[2] == digest:
+                continue
+            changes[fname[:-4]] = self.load(fname[:-4], text)
+        for fname in set(self._seen) - set(names):
+            del self._seen[fname]
+            self.remove(fname[:-4])
+            changes[fname[:-4]] = {"removed_device": 1}
+        return changes
+
+    def load_owners_from_configs(self, golden_dir: str = GOLDEN_DIR) -> int:
+        """
+        Map interface addresses to devices from the newest golden config per
+        device. Cheap to call before every trace: configs are re-read only
+        when the set of newest goldens (or one of them) changed. Returns the
+        number of addresses mapped from configs.
+        """
+        try:
+            from scripts.compliance import GOLDEN_NAME_RE, latest_golden
+        except ImportError:  # run directly as scripts/routes.py
+            from compliance import GOLDEN_NAME_RE, latest_golden
+        stamp = []
+        for path in latest_golden(golden_dir):
+            st = os.stat(path)
+            stamp.append((path, st.st_mtime_ns, st.st_size))
+        if stamp == self._owners_stamp:
+            return len(self._config_owners)
+        owners = {}
+        for path, _, _ in stamp:
+            device = GOLDEN_NAME_RE.match(os.path.basename(path)).group("device")
+            with open(path, encoding="utf-8", errors="replace") as f:
+                for iface, addr in interface_addresses(f.read()):
+                    owners[addr] = (device, iface)
+        for addr, owner in self._config_owners.items():
+            if self.owners.get(addr) == owner:
+                del self.owners[addr]
+        self.owners.update(owners)
+        self._config_owners, self._owners_stamp = owners, stamp
+        return len(owners)
+
+    def lookup(self, device: str, address: str, vrf: str = "default") -> Optional[Route]:
+        trie = self.tries.get((device, vrf))
+        if trie is None:
+            return None
+        hit = trie.lookup(ip_to_int(address))
+        return hit[2] if hit else None
+
+    def trace(self, device: str, address: str, vrf: str = "default",
+              max_hops: int = 32, max_paths: int = 256) -> List[Dict]:
+        """
+        Follow next hops from `device` towards `address`. Returns one entry per
+        path (ECMP branches into several): {"hops": [...], "status": ...} where
+        status is delivered | no-route | discarded | leaves-fleet | unknown-device
+        | loop | max-hops | truncated.
+
+        The forwarding decision at a device doesn't depend on how the packet got
+        there, so each device is expanded once: a later branch reaching it stops
+        there (detail "joins an earlier path at <dev>") and takes the outcome of
+        the paths it joins, instead of re-walking the same subtree. That keeps a
+        leaf-spine fan-out linear in links rather than exponential in depth.
+        max_paths caps the result regardless.
+        """
+        ip_to_int(address)      # validate early (ValueError on garbage)
+        paths = []
+        merged = []
+        expanded = set()
+        todo = deque([(device, [])])
+        while todo:
+            dev, hops = todo.popleft()
+            if len(paths) >= max_paths:
+                paths.append({"hops": hops, "status": "truncated", "device": dev,
+                              "detail": f"{len(todo) + 1} more branches not followed"})
+                break
+            owner = self.owners.get(address)
+            if owner and owner[0] == dev:
+                paths.append({"hops": hops, "status": "delivered", "device": dev,
+                              "detail": f"{address} is {dev} {owner[1]}"})
+                continue
+            if any(h["device"] == dev for h in hops):
+                paths.append({"hops": hops, "status": "loop", "device": dev, "detail": f"back at {dev}"})
+                continue
+            if dev in expanded:
+                merged.append(len(paths))
+                paths.append({"hops": hops, "status": "merged", "device": dev,
+                              "detail": f"joins an earlier path at {dev}"})
+                continue
+            expanded.add(dev)
+            if len(hops) >= max_hops:
+                paths.append({"hops": hops, "status": "max-hops", "device": dev, "detail": ""})
+                continue
+            if dev not in self.routes:
+                paths.append({"hops": hops, "status": "unknown-device", "device": dev,
+                              "detail": f"no route table for {dev}"})
+                continue
+            route = self.lookup(dev, address, vrf)
+            if route is None:
+                paths.append({"hops": hops, "status": "no-route", "device": dev, "detail": ""})
+                continue
+            for nh, iface in route.next_hops or ((None, None),):
+                hop = {"device": dev, "vrf": vrf, "prefix": route.prefix, "proto": route.proto,
+                       "next_hop": nh, "interface": iface}
+                path = hops + [hop]
+                if iface and iface.lower().startswith("null"):
+                    paths.append({"hops": path, "status": "discarded", "device": dev, "detail": iface})
+                elif nh is None:
+                    # directly connected: either a fleet device owns it or it's a host on the segment
+                    if owner:
+                        todo.append((owner[0], path))
+                    else:
+                        paths.append({"hops": path, "status": "delivered", "device": dev,
+                                      "detail": f"{address} is on connected {route.prefix} via {iface}"})
+                else:
+                    nxt = self.owners.get(nh)
+                    if nxt is None:
+                        paths.append({"hops": path, "status": "leaves-fleet", "device": dev,
+                                      "detail": f"next hop {nh} is not a known device address"})
+                    else:
+                        todo.append((nxt[0], path))
+        _resolve_merged(paths, merged)
+        return paths
+
+
+def _resolve_merged(paths: List[Dict], merged: List[int]) -> None:
+    """
+    Give each branch that joined an earlier path at a device the outcome of
+    the paths through that device: delivered if they all are, otherwise the
+    first failure. Joined paths that are themselves joins resolve first; a
+    cycle of joins is a forwarding loop.
+    """
+    joins = {i: paths[i]["device"] for i in merged}
+    pending = dict(joins)
+    while pending:
+        progress = False
+        for i, dev in list(pending.items()):
+            # paths that went through dev, or ended at it (other than joins at dev)
+            joined = [j for j, p in enumerate(paths)
+                      if joins.get(j) != dev and (p["device"] == dev or any(h["device"] == dev for h in p["hops"]))]
+            if any(j in pending for j in joined):
+                continue
+            failures = [paths[j]["status"] for j in joined if paths[j]["status"] != "delivered"]
+            # nothing through dev yet means max_paths stopped the walk first
+            paths[i]["status"] = failures[0] if failures else "delivered" if joined else "truncated"
+            del pending[i]
+            progress = True
+        if not progress:
+            for i in pending:
+                paths[i]["status"] = "loop"
+            break
+
+
+def format_trace(device: str, address: str, paths: List[Dict]) -> str:
+    lines = [f"trace {device} -> {address}"]
+    for i, p in enumerate(paths, 1):
+        lines.append(f" path {i}: {p['status']}" + (f" ({p['detail']})" if p["detail"] else ""))
+        for n, h in enumerate(p["hops"], 1):
+            via = h["next_hop"] or "connected"
+            lines.append(f"  {n:>2}  {h['device']:<10} {h['prefix']:<18} {h['proto']:<5} "
+                         f"via {via} {h['interface'] or ''}".rstrip())
+    return "\n".join(lines)
+
+
+def save_table(device: str, text: str, routes_dir: str = ROUTES_DIR) -> str:
+    """Store a full `show ip route` capture for RouteIndex.refresh() (atomic replace)."""
+    os.makedirs(routes_dir, exist_ok=True)
+    path = os.path.join(routes_dir, f"{device}.txt")
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+    return path
+
+
+def summarize(tables: Dict[str, Dict[str, Route]]) -> str:
+    """'42 routes: B 30, C 4, O 8' (from parse_routes()) for display."""
+    counts: Dict[str, int] = {}
+    for routes in tables.values():
+        for r in routes.values():
+            code = r.proto.split()[0]
+            counts[code] = counts.get(code, 0) + 1
+    total = sum(counts.values())
+    return f"{total} routes: " + ", ".join(f"{k} {v}" for k, v in sorted(counts.items()))
+
+
+# ---------- CLI ----------
+
+def collect(devices: Dict[str, Dict[str, str]], routes_dir: str, profile: str, workers: int) -> int:
+    """Fetch route tables over SSH in parallel; returns the number of failures."""
+    from concurrent.futures import ThreadPoolExecutor
+    try:
+        from scripts import health_check, timing
+    except ImportError:  # run directly as scripts/routes.py
+        import health_check, timing
+
+    def one(name):
+        meta = devices[name]
+        dtype = meta["Device_Type"] or "arista_eos"
+        with timing.span("routes", device=name, vendor=dtype):
+            nc = health_check.connect(meta["IP"], meta["Username"], meta["Password"], dtype, profile)
+            try:
+                text = health_check.run_cmd(nc, ROUTE_CMDS.get(dtype, "show ip route"))
+            finally:
+                with timing.span("disconnect"):
+                    nc.disconnect()
+            tables = parse_routes(text)
+            if not tables:
+                raise RuntimeError(f"no routes parsed from {ROUTE_CMDS.get(dtype, 'show ip route')!r}")
+            save_table(name, text, routes_dir)
+            return summarize(tables)
+
+    failures = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {name: pool.submit(one, name) for name in devices}
+        for name, fut in futures.items():
+            try:
+                print(f"{name}: {fut.result()}")
+            except Exception as e:
+                failures += 1
+                print(f"{name}: FAILED {e}")
+    timing.log_summary()
+    return failures
+
+
+def bench(prefixes: int, lookups: int) -> None:
+    import random
+    rnd = random.Random(1)
+    trie = PatriciaTrie()
+    start = time.perf_counter()
+    for _ in range(prefixes):
+        length = rnd.choice((16, 19, 20, 21, 22, 22, 23, 24, 24, 24, 24))
+        trie.insert(rnd.getrandbits(32), length, True)
+    trie.insert(0, 0, True)
+    built = time.perf_counter() - start
+    keys = [rnd.getrandbits(32) for _ in range(lookups)]
+    start = time.perf_counter()
+    for k in keys:
+        trie.lookup(k)
+    per = (time.perf_counter() - start) / lookups
+    print(f"{len(trie)} prefixes built in {built:.1f}s; {per * 1e6:.2f} us per lookup")
+
+
+def main(argv: Optional[List[str]] = None):
+    try:
+        from scripts import sessions
+    except ImportError:  # run directly as scripts/routes.py
+        import sessions
+
+    ap = argparse.ArgumentParser(description="Route index: collect tables, look up and trace paths.")
+    ap.add_argument("--routes-dir", default=ROUTES_DIR, help="Where <device>.txt route tables live")
+    ap.add_argument("--golden-dir", default=GOLDEN_DIR, help="Golden configs that say which device owns an address")
+    sub = ap.add_subparsers(dest="action", required=True)
+    c = sub.add_parser("collect", help="Fetch `show ip route` from devices over SSH")
+    c.add_argument("--csv", default=CSV_PATH)
+    c.add_argument("--only", nargs="*", help="Only these devices")
+    c.add_argument("--profile", default=sessions.DEFAULT_PROFILE, choices=sorted(sessions.PROFILES))
+    c.add_argument("--workers", type=int, default=8)
+    for name in ("lookup", "trace"):
+        p = sub.add_parser(name, help="Longest-prefix match on one device" if name == "lookup"
+                           else "Follow next hops across devices")
+        p.add_argument("device")
+        p.add_argument("address")
+        p.add_argument("--vrf", default="default")
+    b = sub.add_parser("bench", help="Build a random table and time lookups")
+    b.add_argument("--prefixes", type=int, default=900_000)
+    b.add_argument("--lookups", type=int, default=200_000)
+    args = ap.parse_args(argv)
+
+    if args.action == "bench":
+        bench(args.prefixes, args.lookups)
+        return 0
+    if args.action == "collect":
+        try:
+            from scripts.health_check import load_ssh_info
+        except ImportError:  # run directly as scripts/routes.py
+            from health_check import load_ssh_info
+        devices = load_ssh_info(args.csv)
+        if args.only:
+            devices = {n: d for n, d in devices.items() if n in args.only}
+        return 1 if collect(devices, args.routes_dir, args.profile, args.workers) else 0
+
+    index = RouteIndex(args.routes_dir)
+    index.refresh()
+    index.load_owners_from_configs(args.golden_dir)
+    if args.device not in index.routes:
+        print(f"No route table for {args.device} in {args.routes_dir} (run `routes collect` first)")
+        return 2
+    try:
+        if args.action == "lookup":
+            route = index.lookup(args.device, args.address, args.vrf)
+            print(route if route else "no route")
+            return 0 if route else 1
+        paths = index.trace(args.device, args.address, args.vrf)
+    except ValueError:
+        print(f"Not an IPv4 address: {args.address}")
+        return 2
+    print(format_trace(args.device, args.address, paths))
+    return 0 if all(p["status"] == "delivered" for p in paths) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Netmiko session profiles: "safe" (fixed delays, the historical behaviour) and
+"fast" (prompt-driven reads with delays calibrated from the device RTT).
+
+  safe  fast_cli=False, global_delay_factor=1. Prep commands use
+        send_command_timing (waits for the channel to go quiet, ~2 s each) and
+        every send_command re-discovers the prompt first.
+  fast  fast_cli=True. After login the session measures the prompt round trip
+        (RTT) and scales netmiko's 0.1 s sleep unit to it. Every command is
+        read up to the calibrated prompt pattern (expect_string), so there is
+        no per-command find_prompt() and no quiet-period wait. enable() runs
+        once per session.
+
+On a timeout the fast profile falls back to safe: a connect that times out is
+retried with the safe settings, and a command read that times out drains the
+channel, switches the session to safe and re-runs the command.
+
+Pick the profile with --profile on backup/health/ping, or NETMAN_PROFILE.
+Compare both on real or lab devices with scripts/bench_profiles.py.
+"""
+
+import logging
+import os
+import re
+import time
+from typing import Any, Callable, Dict, Optional
+
+try:
+    from scripts import timing
+except ImportError:  # run directly from scripts/
+    import timing
+
+log = logging.getLogger("netman.sessions")
+
+DEFAULT_PROFILE = os.environ.get("NETMAN_PROFILE", "safe")
+
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "safe": {"fast_cli": False, "global_delay_factor": 1},
+    "fast": {"fast_cli": True, "global_delay_factor": 0.1},
+}
+
+# What follows the hostname in the prompt, per netmiko device_type.
+# EOS/IOS: "R1>", "R1#", "R1(config-if-Et1)#"; Junos: "admin@R1>", "admin@R1#"
+PROMPT_TERMINATORS = {
+    "arista_eos":    r"(?:\([^)\n]*\))?[>#]",
+    "cisco_ios":     r"(?:\([^)\n]*\))?[>#]",
+    "juniper":       r"[>#%]",
+    "juniper_junos": r"[>#%]",
+}
+DEFAULT_TERMINATOR = r"(?:\([^)\n]*\))?[>#$%]"
+
+# Calibration knobs
+CALIBRATION_SAMPLES = 3
+CALIBRATION_TIMEOUT = 5.0       # s, per prompt round trip
+MIN_DELAY_FACTOR = 0.1          # netmiko's own fast_cli floor
+PREP_TIMEOUT_MIN = 2.0          # s, lower bound for prep command reads
+PREP_TIMEOUT_RTTS = 20          # ... or this many RTTs, whichever is larger
+
+
+def prompt_pattern(base_prompt: str, device_type: str) -> str:
+    """Regex matching this device's prompt in any CLI mode."""
+    term = PROMPT_TERMINATORS.get(device_type, DEFAULT_TERMINATOR)
+    return re.escape(base_prompt.strip()) + term
+
+
+def delay_factor_for(rtt: float) -> float:
+    """
+    Netmiko sleeps in units of 0.1 s * global_delay_factor; scale that unit to
+    one measured round trip, between the fast_cli floor and the safe value.
+    """
+    return round(min(1.0, max(MIN_DELAY_FACTOR, rtt / 0.1)), 3)
+
+
+def timeout_errors() -> tuple:
+    from netmiko.exceptions import NetmikoTimeoutException, ReadTimeout
+    return (ReadTimeout, NetmikoTimeoutException, TimeoutError)
+
+
+class Session:
+    """
+    A netmiko connection plus the profile it runs under. Unknown attributes
+    are passed through to the connection, so callers can keep using it like
+    the ConnectHandler object.
+    """
+
+    def __init__(self, conn, device_type: str, profile: str = "safe"):
+        self.conn = conn
+        self.device_type = device_type
+        self.profile = profile
+        self.rtt: Optional[float] = None
+        self.prompt: Optional[str] = None
+        self.prep_timeout = PREP_TIMEOUT_MIN
+        self._enabled = False
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.disconnect()
+        return False
+
+    @property
+    def expect_string(self) -> Optional[str]:
+        """Pattern that ends a command read, or None to let netmiko find the prompt."""
+        return self.prompt if self.profile == "fast" else None
+
+    def calibrate(self, samples: int = CALIBRATION_SAMPLES) -> float:
+        """Measure the prompt round trip and tune delays/timeouts from it."""
+        with timing.span("calibrate") as sp:
+            self.prompt = prompt_pattern(self.conn.base_prompt, self.device_type)
+            rtts = []
+            for _ in range(samples):
+                t0 = time.perf_counter()
+                self.conn.write_channel(self.conn.RETURN)
+                self.conn.read_until_pattern(self.prompt, read_timeout=CALIBRATION_TIMEOUT)
+                rtts.append(time.perf_counter() - t0)
+            self.rtt = sorted(rtts)[len(rtts) // 2]
+            self.conn.global_delay_factor = delay_factor_for(self.rtt)
+            self.prep_timeout = max(PREP_TIMEOUT_MIN, PREP_TIMEOUT_RTTS * self.rtt)
+            sp.set(rtt_ms=round(self.rtt * 1000, 3), delay_factor=self.conn.global_delay_factor)
+        return self.rtt
+
+    def fallback_to_safe(self, reason: str) -> None:
+        log.warning(f"{self.conn.host}: fast profile timed out ({reason}); using safe profile")
+        with timing.span("fallback"):
+            self.profile = "safe"
+            self.conn.fast_cli = False
+            self.conn.global_delay_factor = PROFILES["safe"]["global_delay_factor"]
+            # Whatever the timed-out command still prints must not leak into the retry
+            self.conn.clear_buffer(backoff=True)
+
+    def enable(self) -> None:
+        if self.profile == "fast" and self._enabled:
+            return
+        self.conn.enable()
+        self._enabled = True
+
+    def send(self, cmd: str, read_timeout: float = 10.0, **kwargs) -> str:
+        """send_command(), read up to the calibrated prompt in the fast profile."""
+        if self.profile == "fast":
+            try:
+                return self.conn.send_command(cmd, expect_string=self.prompt,
+                                              read_timeout=read_timeout, **kwargs)
+            except timeout_errors() as e:
+                self.fallback_to_safe(f"{cmd!r}: {e}")
+        return self.conn.send_command(cmd, read_timeout=read_timeout, **kwargs)
+
+    def prep(self, cmd: str) -> str:
+        """Session setup commands (terminal length etc.)."""
+        if self.profile == "fast":
+            return self.send(cmd, read_timeout=self.prep_timeout)
+        return self.conn.send_command_timing(cmd)
+
+    def disconnect(self) -> None:
+        self.conn.disconnect()
+
+
+def open_session(connect: Callable[..., Any], params: Dict[str, Any],
+                 profile: str = DEFAULT_PROFILE) -> Session:
+    """
+    Connect with `connect` (netmiko's ConnectHandler) using `params` plus the
+    profile's settings. A fast connect that times out is retried as safe.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"unknown session profile '{profile}' (choose from {', '.join(PROFILES)})")
+    device_type = params["device_type"]
+
+    if profile == "fast":
+        conn = None
+        try:
+            with timing.span("connect", vendor=device_type, profile="fast"):
+                conn = connect(**{**params, **PROFILES["fast"]})
+            session = Session(conn, device_type, "fast")
+            session.calibrate()
+            return session
+        except timeout_errors() as e:
+            log.warning(f"{params.get('host') or params.get('ip')}: fast connect timed out ({e}); "
+                        f"retrying with safe profile")
+            if conn is not None:
+                try:
+                    conn.disconnect()
+                except Exception:
+                    pass
+
+    with timing.span("connect", vendor=device_type, profile="safe"):
+        conn = connect(**{**params, **PROFILES["safe"]})
+    return Session(conn, device_type, "safe")
@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+"""
+Pre/post-change operational snapshots and a structured diff to gate on.
+
+  python3 -m scripts.snapshot capture --name pre-CHG1234 [--only R1 R2] [--ping 1.1.1.2]
+  ... maintenance ...
+  python3 -m scripts.snapshot capture --name post-CHG1234
+  python3 -m scripts.snapshot diff pre-CHG1234 post-CHG1234 [--junit reports/snapshot.xml]
+  python3 -m scripts.snapshot list
+  python3 -m scripts.snapshot bench --devices 1000 --routes 2000
+
+A snapshot holds, per device, the parsed state rather than raw CLI output:
+
+  ospf        "<neighbor-id>@<interface>" -> FULL | 2WAY | INIT | ...
+  bgp         "[<vrf>/]<peer>" -> [state, prefixes received]
+  routes      vrf -> prefix -> "<proto>|<next hop>@<interface>,..."
+  interfaces  name -> "<status>/<protocol>" (show ip interface brief)
+  ping        destination -> % packet loss
+
+Every section carries a short hash of its canonical JSON, computed at
+capture time. The diff compares those hashes first and only walks the
+sections (and route VRFs) that differ, so two 1,000-device snapshots of an
+unchanged fleet compare in the time it takes to load them. Snapshots are
+gzip-compressed JSON under .cache/snapshots (NETMAN_SNAPSHOT_DIR), one file
+each; `diff` also takes file paths.
+
+Each change is graded info / warn / fail. Lost OSPF neighbours or BGP
+sessions, routes that disappeared, interfaces that went down, new ping
+loss and unreachable devices are failures; routes that moved to other
+next hops and prefix-count drops are warnings. `diff` exits 1 if anything
+at or above --fail-on (default: fail) changed, so a Jenkins stage can run
+it after the change window and gate on the exit code (--junit for the
+test report).
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+try:
+    from scripts import routes as route_index, sessions
+except ImportError:  # run directly as scripts/snapshot.py
+    import routes as route_index, sessions
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOT_DIR = os.environ.get("NETMAN_SNAPSHOT_DIR") or os.path.join(REPO_ROOT, ".cache", "snapshots")
+CSV_PATH = os.environ.get("SSHINFO_CSV") or os.path.join(REPO_ROOT, "data", "ssh", "sshInfo.csv")
+
+FORMAT_VERSION = 1
+SECTIONS = ("ospf", "bgp", "routes", "interfaces", "ping")
+LEVELS = ("info", "warn", "fail")
+
+# section -> command; per device_type, EOS shows every VRF
+SHOW_CMDS = {
+    "arista_eos": {
+        "ospf": "show ip ospf neighbor vrf all",
+        "bgp": "show ip bgp summary vrf all",
+        "interfaces": "show ip interface brief",
+    },
+    "cisco_ios": {
+        "ospf": "show ip ospf neighbor",
+        "bgp": "show ip bgp summary",
+        "interfaces": "show ip interface brief",
+    },
+}
+
+
+# ---------- parsers ----------
+
+_ADDR = r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}"
+_OSPF_RE = re.compile(
+    rf"^(?P<rid>{_ADDR})\s+.*?\b(?P<state>FULL|2WAY|INIT|DOWN|ATTEMPT|EXSTART|EXCHANGE|LOADING)"
+    rf"(?:/\s*\S+)?\s+.*?(?P<addr>{_ADDR})\s+(?P<iface>\S+)\s*$")     # IOS p2p: "FULL/  -"
+_BGP_VRF_RE = re.compile(r"BGP summary information for VRF (?P<vrf>\S+)")
+_BGP_PEER_RE = re.compile(rf"^\s*(?P<peer>{_ADDR})\s+4\s+(?P<asn>\d+(?:\.\d+)?)\s+(?P<rest>.+)$")
+_IF_RE = re.compile(
+    r"^(?P<iface>[A-Za-z][\w/.:-]*\d)\s+.*?\b"
+    r"(?P<status>administratively down|up|down|lowerlayerdown|notpresent|dormant|testing)\s+"
+    r"(?P<proto>up|down|lowerlayerdown|notpresent|dormant|testing)\b")
+_LOSS_RE = re.compile(r"(\d+(?:\.\d+)?)% packet loss")
+_IOS_SUCCESS_RE = re.compile(r"Success rate is (\d+) percent")
+
+
+def parse_ospf(text: str) -> Dict[str, str]:
+    """'2.2.2.2@Ethernet1' -> 'FULL' (DR/BDR role dropped: a role change is not a loss)."""
+    out = {}
+    for line in text.splitlines():
+        m = _OSPF_RE.match(line.strip())
+        if m:
+            out[f"{m['rid']}@{m['iface']}"] = m["state"]
+    return out
+
+
+def parse_bgp(text: str) -> Dict[str, List]:
+    """
+    '[vrf/]peer' -> [state, prefixes received or None] from EOS or IOS
+    `show ip bgp summary`. EOS ends an established row with "Estab <rcvd> <acc>",
+    IOS puts the prefix count in the State/PfxRcd column.
+    """
+    out: Dict[str, List] = {}
+    vrf = "default"
+    for line in text.splitlines():
+        m = _BGP_VRF_RE.search(line)
+        if m:
+            vrf = m["vrf"]
+            continue
+        m = _BGP_PEER_RE.match(line)
+        if not m:
+            continue
+        # counters (4 on EOS, 5 on IOS), Up/Down, then state and/or prefix count
+        tokens = m["rest"].split()
+        i = 0
+        while i < len(tokens) and tokens[i].isdigit():
+            i += 1
+        tail = tokens[i + 1:]
+        if tail and tail[0].startswith("Estab"):
+            state, pfx = "Established", int(tail[1]) if len(tail) > 1 and tail[1].isdigit() else None
+        elif len(tail) == 1 and tail[0].isdigit():
+            state, pfx = "Established", int(tail[0])
+        else:
+            state, pfx = " ".join(tail) or "unknown", None
+        key = m["peer"] if vrf == "default" else f"{vrf}/{m['peer']}"
+        out[key] = [state, pfx]
+    return out
+
+
+def parse_interfaces(text: str) -> Dict[str, str]:
+    """'Ethernet1' -> 'up/up' from EOS or IOS `show ip interface brief`."""
+    out = {}
+    for line in text.splitlines():
+        m = _IF_RE.match(line.strip())
+        if m:
+            out[m["iface"]] = f"{m['status']}/{m['proto']}"
+    return out
+
+
+def parse_ping(text: str) -> float:
+    """Packet loss in percent; 100 when the output has no loss figure at all."""
+    m = _LOSS_RE.search(text)
+    if m:
+        return float(m.group(1))
+    m = _IOS_SUCCESS_RE.search(text)
+    if m:
+        return 100.0 - float(m.group(1))
+    return 100.0
+
+
+def compact_routes(tables: Dict[str, Dict[str, "route_index.Route"]]) -> Dict[str, Dict[str, str]]:
+    """parse_routes() output as vrf -> prefix -> 'proto|nh@iface,...' strings."""
+    return {vrf: {prefix: r.proto + "|" + ",".join(f"{nh or ''}@{iface or ''}" for nh, iface in r.next_hops)
+                  for prefix, r in routes.items()}
+            for vrf, routes in tables.items()}
+
+
+def digest(section: Any) -> str:
+    blob = json.dumps(section, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha1(blob).hexdigest()[:16]
+
+
+def device_entry(sections: Dict[str, Any]) -> Dict[str, Any]:
+    entry = {name: sections.get(name, {}) for name in SECTIONS}
+    entry["digest"] = {name: digest(entry[name]) for name in SECTIONS}
+    return entry
+
+
+# ---------- storage ----------
+
+def snapshot_path(name: str, snapshot_dir: str = SNAPSHOT_DIR) -> str:
+    """A path as given if it exists, else <snapshot_dir>/<name>.json.gz."""
+    if os.path.exists(name):
+        return name
+    return os.path.join(snapshot_dir, name if name.endswith(".json.gz") else f"{name}.json.gz")
+
+
+def save(snapshot: Dict, path: str) -> str:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    blob = json.dumps(snapshot, separators=(",", ":")).encode()
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(gzip.compress(blob, compresslevel=6))
+    os.replace(tmp, path)
+    return path
+
+
+def load(path: str) -> Dict:
+    with gzip.open(path, "rb") as f:
+        snapshot = json.loads(f.read())
+    if snapshot.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported snapshot version {snapshot.get('version')!r}")
+    return snapshot
+
+
+# ---------- capture ----------
+
+def capture_one(name: str, meta: Dict[str, str], ping: List[str], profile: str) -> Dict[str, Any]:
+    """Log in once and run every show command; returns a device entry."""
+    try:
+        from scripts import health_check, timing
+    except ImportError:  # run directly as scripts/snapshot.py
+        import health_check, timing
+
+    dtype = meta["Device_Type"] or "arista_eos"
+    cmds = SHOW_CMDS.get(dtype, SHOW_CMDS["cisco_ios"])
+    with timing.span("snapshot", device=name, vendor=dtype):
+        nc = health_check.connect(meta["IP"], meta["Username"], meta["Password"], dtype, profile)
+        try:
+            sections = {
+                "ospf": parse_ospf(health_check.run_cmd(nc, cmds["ospf"])),
+                "bgp": parse_bgp(health_check.run_cmd(nc, cmds["bgp"])),
+                "interfaces": parse_interfaces(health_check.run_cmd(nc, cmds["interfaces"])),
+                "routes": compact_routes(route_index.parse_routes(
+                    health_check.run_cmd(nc, route_index.ROUTE_CMDS.get(dtype, "show ip route")))),
+                "ping": {dst: parse_ping(health_check.run_cmd(nc, f"ping {dst}")) for dst in ping},
+            }
+        finally:
+            with timing.span("disconnect"):
+                nc.disconnect()
+    return device_entry(sections)
+
+
+def capture(devices: Dict[str, Dict[str, str]], name: str, ping: List[str],
+            profile: str = sessions.DEFAULT_PROFILE, workers: int = 32) -> Dict:
+    """Snapshot every device in parallel (one SSH session per device)."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    snapshot = {"version": FORMAT_VERSION, "name": name,
+                "taken": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "ping": ping, "devices": {}}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {dev: pool.submit(capture_one, dev, meta, ping, profile) for dev, meta in devices.items()}
+        for dev, fut in futures.items():
+            try:
+                snapshot["devices"][dev] = fut.result()
+                s = snapshot["devices"][dev]
+                print(f"{dev}: {len(s['ospf'])} OSPF, {len(s['bgp'])} BGP, "
+                      f"{sum(len(r) for r in s['routes'].values())} routes, {len(s['interfaces'])} interfaces")
+            except Exception as e:
+                snapshot["devices"][dev] = {"error": str(e)}
+                print(f"{dev}: FAILED {e}")
+    return snapshot
+
+
+# ---------- diff ----------
+
+class Change(NamedTuple):
+    device: str
+    section: str        # device | ospf | bgp | routes | interfaces | ping
+    key: str
+    level: str          # info | warn | fail
+    change: str
+    before: Any
+    after: Any
+
+
+def _keyed(before: Dict, after: Dict) -> Iterable[Tuple[str, Any, Any]]:
+    """(key, before, after) for every key whose value differs (None = absent)."""
+    for key in before.keys() - after.keys():
+        yield key, before[key], None
+    for key in after.keys() - before.keys():
+        yield key, None, after[key]
+    for key in before.keys() & after.keys():
+        if before[key] != after[key]:
+            yield key, before[key], after[key]
+
+
+def diff_ospf(before: Dict, after: Dict):
+    for key, b, a in _keyed(before, after):
+        if a is None:
+            yield key, "fail" if b == "FULL" else "warn", "neighbor lost"
+        elif b is None:
+            yield key, "info", "new neighbor"
+        elif b == "FULL":
+            yield key, "fail", "neighbor no longer FULL"
+        else:
+            yield key, "info" if a == "FULL" else "warn", "state changed"
+
+
+def diff_bgp(before: Dict, after: Dict):
+    for key, b, a in _keyed(before, after):
+        if a is None:
+            yield key, "fail" if b[0] == "Established" else "warn", "peer removed"
+        elif b is None:
+            yield key, "info", "new peer"
+        elif b[0] != a[0]:
+            if b[0] == "Established":
+                yield key, "fail", "session down"
+            else:
+                yield key, "info" if a[0] == "Established" else "warn", "state changed"
+        elif (a[1] or 0) < (b[1] or 0):
+            yield key, "fail" if not a[1] else "warn", "fewer prefixes received"
+        else:
+            yield key, "info", "more prefixes received"
+
+
+def diff_routes(before: Dict, after: Dict):
+    for vrf in before.keys() | after.keys():
+        b_vrf, a_vrf = before.get(vrf, {}), after.get(vrf, {})
+        if b_vrf == a_vrf:
+            continue
+        for prefix, b, a in _keyed(b_vrf, a_vrf):
+            key = f"{vrf} {prefix}"
+            if a is None:
+                yield key, "fail", "route disappeared"
+            elif b is None:
+                yield key, "info", "new route"
+            elif b.split("|", 1)[0] != a.split("|", 1)[0]:
+                yield key, "warn", "protocol changed"
+            else:
+                yield key, "warn", "next hops moved"
+
+
+def diff_interfaces(before: Dict, after: Dict):
+    for key, b, a in _keyed(before, after):
+        if b == "up/up":
+            if a is None:
+                yield key, "fail", "interface removed"
+            elif a.startswith("administratively down"):
+                yield key, "warn", "shut down"
+            else:
+                yield key, "fail", "interface down"
+        else:
+            yield key, "info", "new interface" if b is None else "state changed"
+
+
+def diff_ping(before: Dict, after: Dict):
+    for key, b, a in _keyed(before, after):
+        if a is None:
+            yield key, "warn", "no longer pinged"
+        elif b is None:
+            yield key, "fail" if a else "info", "new destination"
+        elif a > b:
+            yield key, "fail", "new packet loss"
+        else:
+            yield key, "info", "less packet loss"
+
+
+DIFFERS = {"ospf": diff_ospf, "bgp": diff_bgp, "routes": diff_routes,
+           "interfaces": diff_interfaces, "ping": diff_ping}
+
+
+def diff(before: Dict, after: Dict) -> List[Change]:
+    """Every change between two snapshots; unchanged sections are skipped by hash."""
+    changes: List[Change] = []
+    old, new = before["devices"], after["devices"]
+    for dev in sorted(old.keys() | new.keys()):
+        b, a = old.get(dev), new.get(dev)
+        if a is None:
+            changes.append(Change(dev, "device", dev, "fail", "missing from snapshot", "present", None))
+            continue
+        if b is None:
+            changes.append(Change(dev, "device", dev, "info", "new device", None, "present"))
+            continue
+        if "error" in a:
+            level = "warn" if "error" in b else "fail"
+            changes.append(Change(dev, "device", dev, level, "capture failed", b.get("error"), a["error"]))
+            continue
+        if "error" in b:
+            changes.append(Change(dev, "device", dev, "info", "no baseline (capture failed before)",
+                                  b["error"], None))
+            continue
+        if b["digest"] == a["digest"]:
+            continue
+        for section in SECTIONS:
+            if b["digest"][section] == a["digest"][section]:
+                continue
+            vb, va = b[section], a[section]
+            if section == "routes":
+                lookup = lambda d, k: d.get(k.split(" ", 1)[0], {}).get(k.split(" ", 1)[1])
+            else:
+                lookup = lambda d, k: d.get(k)
+            for key, level, what in DIFFERS[section](vb, va):
+                changes.append(Change(dev, section, key, level, what, lookup(vb, key), lookup(va, key)))
+    changes.sort(key=lambda c: (c.device, SECTIONS.index(c.section) if c.section in SECTIONS else -1,
+                                -LEVELS.index(c.level), c.key))
+    return changes
+
+
+def gating(changes: List[Change], fail_on: str) -> List[Change]:
+    """The changes that make the diff fail at this --fail-on level."""
+    if fail_on == "never":
+        return []
+    threshold = LEVELS.index(fail_on)
+    return [c for c in changes if LEVELS.index(c.level) >= threshold]
+
+
+# ---------- reports ----------
+
+def _value(v: Any) -> str:
+    if v is None:
+        return "-"
+    if isinstance(v, list):
+        return " ".join("-" if x is None else str(x) for x in v)
+    return str(v)
+
+
+def print_changes(changes: List[Change], verbose: bool = False) -> None:
+    device = None
+    for c in changes:
+        if c.level == "info" and not verbose:
+            continue
+        if c.device != device:
+            device = c.device
+            print(device)
+        print(f"  {c.level.upper():4}  {c.section:10} {c.key}  {c.change}: "
+              f"{_value(c.before)} -> {_value(c.after)}")
+
+
+def write_json(changes: List[Change], path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump([c._asdict() for c in changes], f, indent=2)
+
+
+def write_junit(before: Dict, after: Dict, changes: List[Change], fail_on: str, path: str) -> None:
+    """One <testcase> per device in either snapshot; failed if it has a gating change."""
+    import xml.etree.ElementTree as ET
+
+    failing = {id(c) for c in gating(changes, fail_on)}
+    devices = sorted(before["devices"].keys() | after["devices"].keys())
+    by_device: Dict[str, List[Change]] = {}
+    for c in changes:
+        by_device.setdefault(c.device, []).append(c)
+    failed = [d for d in devices if any(id(c) in failing for c in by_device.get(d, []))]
+
+    suite = ET.Element("testsuite", name=f"snapshot.{before.get('name')}..{after.get('name')}",
+                       tests=str(len(devices)), failures=str(len(failed)))
+    for dev in devices:
+        case = ET.SubElement(suite, "testcase", classname="snapshot", name=dev)
+        mine = by_device.get(dev, [])
+        if dev in failed:
+            bad = [c for c in mine if id(c) in failing]
+            failure = ET.SubElement(case, "failure", type=bad[0].level,
+                                    message=f"{len(bad)} change(s): {bad[0].section} {bad[0].key} {bad[0].change}")
+            failure.text = "\n".join(f"{c.level} {c.section} {c.key} {c.change}: "
+                                     f"{_value(c.before)} -> {_value(c.after)}" for c in mine)
+        elif mine:
+            ET.SubElement(case, "system-out").text = "\n".join(
+                f"{c.level} {c.section} {c.key} {c.change}" for c in mine)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    ET.ElementTree(suite).write(path, encoding="utf-8", xml_declaration=True)
+
+
+# ---------- bench ----------
+
+def synthetic(devices: int, routes: int, seed: int = 1) -> Dict:
+    """A fleet-sized snapshot with plausible section sizes (for `bench` and tests)."""
+    import random
+    rnd = random.Random(seed)
+    snap = {"version": FORMAT_VERSION, "name": f"synthetic-{seed}", "taken": "", "ping": ["1.1.1.2"],
+            "devices": {}}
+    for d in range(devices):
+        table = {}
+        for _ in range(routes):
+            prefix = f"10.{rnd.randrange(256)}.{rnd.randrange(256)}.0/24"
+            table[prefix] = f"O|10.{d % 256}.{rnd.randrange(4)}.2@Ethernet{rnd.randrange(1, 5)}"
+        snap["devices"][f"R{d}"] = device_entry({
+            "ospf": {f"10.255.{d % 256}.{n}@Ethernet{n}": "FULL" for n in range(1, 5)},
+            "bgp": {f"10.1.{d % 256}.{n}": ["Established", rnd.randrange(1000)] for n in range(1, 3)},
+            "routes": {"default": table},
+            "interfaces": {f"Ethernet{n}": "up/up" for n in range(1, 49)},
+            "ping": {"1.1.1.2": 0.0},
+        })
+    return snap
+
+
+def bench(devices: int, routes: int, changed: int, snapshot_dir: str) -> None:
+    import copy
+    import random
+    rnd = random.Random(2)
+    start = time.perf_counter()
+    pre = synthetic(devices, routes)
+    post = copy.deepcopy(pre)
+    for dev in rnd.sample(sorted(post["devices"]), min(changed, devices)):
+        entry = post["devices"][dev]
+        table = entry["routes"]["default"]
+        for prefix in rnd.sample(sorted(table), min(10, len(table))):
+            del table[prefix]
+        entry["ospf"][next(iter(entry["ospf"]))] = "INIT"
+        post["devices"][dev] = device_entry({s: entry[s] for s in SECTIONS})
+    built = time.perf_counter() - start
+
+    paths = [os.path.join(snapshot_dir, f"bench-{n}.json.gz") for n in ("pre", "post")]
+    start = time.perf_counter()
+    save(pre, paths[0])
+    save(post, paths[1])
+    saved = time.perf_counter() - start
+    size = os.path.getsize(paths[0])
+    start = time.perf_counter()
+    pre, post = load(paths[0]), load(paths[1])
+    loaded = time.perf_counter() - start
+    start = time.perf_counter()
+    changes = diff(pre, post)
+    diffed = time.perf_counter() - start
+    for p in paths:
+        os.remove(p)
+    print(f"{devices} devices x {routes} routes (built in {built:.1f}s): "
+          f"{size / 1e6:.1f} MB per snapshot; save {saved / 2:.2f}s, load {loaded / 2:.2f}s, "
+          f"diff {diffed:.3f}s -> {len(changes)} changes on {changed} devices")
+
+
+# ---------- CLI ----------
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Pre/post-change state snapshots and diff.")
+    ap.add_argument("--snapshot-dir", default=SNAPSHOT_DIR, help="Where <name>.json.gz snapshots live")
+    sub = ap.add_subparsers(dest="action", required=True)
+    c = sub.add_parser("capture", help="Snapshot OSPF/BGP/routes/interfaces/ping over SSH")
+    c.add_argument("--name", help="Snapshot name (default: UTC timestamp)")
+    c.add_argument("--csv", default=CSV_PATH)
+    c.add_argument("--only", nargs="*", help="Only these devices")
+    c.add_argument("--ping", nargs="*", default=["1.1.1.2"], help="Destinations to ping from every device")
+    c.add_argument("--profile", default=sessions.DEFAULT_PROFILE, choices=sorted(sessions.PROFILES))
+    c.add_argument("--workers", type=int, default=32, help="Devices captured in parallel")
+    d = sub.add_parser("diff", help="Compare two snapshots; exit 1 on changes at/above --fail-on")
+    d.add_argument("before")
+    d.add_argument("after")
+    d.add_argument("--fail-on", choices=LEVELS[1:] + ("never",), default="fail",
+                   help="Exit 1 if a change of at least this level is found (default: fail)")
+    d.add_argument("--json", help="Write every change as JSON here")
+    d.add_argument("--junit", help="Write a JUnit XML report here (one testcase per device)")
+    d.add_argument("-v", "--verbose", action="store_true", help="Also print info-level changes")
+    sub.add_parser("list", help="List stored snapshots")
+    b = sub.add_parser("bench", help="Time save/load/diff on synthetic fleet-sized snapshots")
+    b.add_argument("--devices", type=int, default=1000)
+    b.add_argument("--routes", type=int, default=2000, help="Routes per device")
+    b.add_argument("--changed", type=int, default=10, help="Devices that differ in the second snapshot")
+    args = ap.parse_args(argv)
+
+    if args.action == "bench":
+        bench(args.devices, args.routes, args.changed, args.snapshot_dir)
+        return 0
+
+    if args.action == "list":
+        names = sorted(n for n in os.listdir(args.snapshot_dir) if n.endswith(".json.gz")) \
+            if os.path.isdir(args.snapshot_dir) else []
+        for n in names:
+            st = os.stat(os.path.join(args.snapshot_dir, n))
+            print(f"{n[:-len('.json.gz')]:40} {st.st_size / 1e3:10.1f} kB  "
+                  f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(st.st_mtime))}")
+        return 0
+
+    if args.action == "capture":
+        try:
+            from scripts import timing
+            from scripts.health_check import load_ssh_info
+        except ImportError:  # run directly as scripts/snapshot.py
+            import timing
+            from health_check import load_ssh_info
+        devices = load_ssh_info(args.csv)
+        if args.only:
+            devices = {n: m for n, m in devices.items() if n in args.only}
+        name = args.name or time.strftime("%Y%m%d-%H%M%SZ", time.gmtime())
+        snap = capture(devices, name, args.ping, args.profile, args.workers)
+        path = save(snap, snapshot_path(name, args.snapshot_dir))
+        timing.log_summary()
+        failed = sum(1 for e in snap["devices"].values() if "error" in e)
+        print(f"saved {path} ({len(snap['devices'])} devices, {failed} failed)")
+        return 1 if failed else 0
+
+    try:
+        before = load(snapshot_path(args.before, args.snapshot_dir))
+        after = load(snapshot_path(args.after, args.snapshot_dir))
+    except (OSError, ValueError) as e:
+        print(f"Cannot load snapshot: {e}")
+        return 2
+    start = time.perf_counter()
+    changes = diff(before, after)
+    elapsed = time.perf_counter() - start
+    print_changes(changes, args.verbose)
+    if args.json:
+        write_json(changes, args.json)
+    if args.junit:
+        write_junit(before, after, changes, args.fail_on, args.junit)
+    bad = gating(changes, args.fail_on)
+    counts = {lvl: sum(1 for c in changes if c.level == lvl) for lvl in LEVELS}
+    print(f"\n{len(after['devices'])} devices, {len({c.device for c in changes})} changed: "
+          f"{counts['fail']} fail, {counts['warn']} warn, {counts['info']} info "
+          f"(diffed in {elapsed:.2f}s) -> {'FAIL' if bad else 'PASS'}")
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
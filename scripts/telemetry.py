@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+gNMI streaming-telemetry collector (alternative to SSH polling for EOS).
+
+The EOS configs run `management api gnmi` / `transport grpc default`
+(port 6030), so instead of logging in and scraping `show ...` every poll we
+keep one subscription per device open and read the latest values from memory:
+
+  python3 -m scripts.telemetry --once                  # table after initial sync
+  python3 -m scripts.telemetry --json reports/telemetry.json --every 10
+  python3 -m scripts.health_check --backend gnmi --only R1 R2
+
+Subscriptions (OpenConfig paths, see subscriptions()):
+  sample     CPU utilisation, interface counters   (--sample seconds)
+  on_change  interface oper-status, OSPF adjacency state, BGP session state
+
+Each device gets a DeviceStream thread: connect -> subscribe -> apply every
+notification to a LatestCache. If the stream errors or ends it reconnects
+and resubscribes with exponential backoff plus jitter (1 s .. 60 s); the
+first notification after a reconnect resets the backoff.
+
+LatestCache is bounded (--max-paths), keyed by (device, leaf path), and
+thread-safe. When full it evicts the least recently updated sampled leaf;
+on_change leaves (neighbour and oper state) go only once no sampled leaf is
+left, since the device does not resend them until they change. The views below
+(cpu/interfaces/ospf_neighbors/bgp_neighbors) are plain functions over it.
+
+The gNMI client is pygnmi (pip install pygnmi), imported only when a real
+stream is opened. Anything with open(target, subscribe) -> iterable with
+close() can stand in for it (the tests use an in-process fake server).
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from scripts import timing
+except ImportError:  # run directly as scripts/telemetry.py
+    import timing
+
+log = logging.getLogger("netman.telemetry")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CSV_PATH = os.environ.get("SSHINFO_CSV") or os.path.join(REPO_ROOT, "data", "ssh", "sshInfo.csv")
+GNMI_PORT = int(os.environ.get("NETMAN_GNMI_PORT", "6030"))
+
+BACKOFF_MIN = 1.0
+BACKOFF_MAX = 60.0
+
+CPU_PATH = "/components/component/cpu/utilization/state/instant"
+IF_COUNTERS_PATH = "/interfaces/interface/state/counters"
+IF_OPER_PATH = "/interfaces/interface/state/oper-status"
+OSPF_PATH = ("/network-instances/network-instance/protocols/protocol/ospfv2/areas/area/"
+             "interfaces/interface/neighbors/neighbor/state/adjacency-state")
+BGP_PATH = ("/network-instances/network-instance/protocols/protocol/bgp/neighbors/"
+            "neighbor/state/session-state")
+
+
+def subscriptions(sample_interval: float = 10.0) -> Dict[str, Any]:
+    """gNMI SubscriptionList in pygnmi's dict form."""
+    ns = int(sample_interval * 1e9)
+    return {
+        "mode": "stream",
+        "encoding": "json",
+        "subscription": [
+            {"path": CPU_PATH, "mode": "sample", "sample_interval": ns},
+            {"path": IF_COUNTERS_PATH, "mode": "sample", "sample_interval": ns},
+            {"path": IF_OPER_PATH, "mode": "on_change"},
+            {"path": OSPF_PATH, "mode": "on_change"},
+            {"path": BGP_PATH, "mode": "on_change"},
+        ],
+    }
+
+
+# ---------- bounded latest-value cache ----------
+
+_KEYS_RE = re.compile(r"\[[^\]]*\]")
+_ON_CHANGE_PATHS = frozenset(p.strip("/") for p in (IF_OPER_PATH, OSPF_PATH, BGP_PATH))
+
+
+def is_on_change(path: str) -> bool:
+    """True for leaves of an on_change subscription (list keys ignored)."""
+    return _KEYS_RE.sub("", path) in _ON_CHANGE_PATHS
+
+
+def _join(prefix: Optional[str], path: str) -> str:
+    prefix = (prefix or "").strip("/")
+    path = (path or "").strip("/")
+    return f"{prefix}/{path}" if prefix and path else prefix or path
+
+
+def _leaves(path: str, value: Any) -> Iterable[Tuple[str, Any]]:
+    """JSON-encoded containers arrive as dicts; store them leaf by leaf."""
+    if isinstance(value, dict):
+        for k, v in value.items():
+            # openconfig-interfaces:counters -> counters
+            yield from _leaves(f"{path}/{k.split(':')[-1]}", v)
+    else:
+        yield path, value
+
+
+class LatestCache:
+    """
+    (device, leaf path) -> (value, timestamp), bounded. Sampled leaves are
+    evicted least recently updated first; on_change leaves only when there
+    are no sampled ones left.
+    """
+
+    def __init__(self, max_paths: int = 100_000):
+        self.max_paths = max_paths
+        self.evicted = 0
+        self._sampled: "OrderedDict[Tuple[str, str], Tuple[Any, float]]" = OrderedDict()
+        self._on_change: "OrderedDict[Tuple[str, str], Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sampled) + len(self._on_change)
+
+    def put(self, device: str, path: str, value: Any, ts: Optional[float] = None) -> None:
+        key = (device, path)
+        data = self._on_change if is_on_change(path) else self._sampled
+        with self._lock:
+            data[key] = (value, ts if ts is not None else time.time())
+            data.move_to_end(key)
+            while len(self._sampled) + len(self._on_change) > self.max_paths:
+                (self._sampled or self._on_change).popitem(last=False)
+                self.evicted += 1
+
+    def delete(self, device: str, path: str) -> None:
+        """Drop a path and everything under it (gNMI deletes may name a subtree)."""
+        with self._lock:
+            for data in (self._sampled, self._on_change):
+                for key in [k for k in data
+                            if k[0] == device and (k[1] == path or k[1].startswith(path + "/"))]:
+                    del data[key]
+
+    def apply(self, device: str, notification: Dict) -> int:
+        """Apply one pygnmi-style notification; returns the number of leaves written."""
+        update = notification.get("update")
+        if not update:
+            return 0
+        ts = update.get("timestamp")
+        ts = ts / 1e9 if ts else None
+        prefix = update.get("prefix")
+        for path in update.get("delete") or []:
+            self.delete(device, _join(prefix, path))
+        n = 0
+        for u in update.get("update") or []:
+            for leaf, value in _leaves(_join(prefix, u.get("path", "")), u.get("val")):
+                self.put(device, leaf, value, ts)
+                n += 1
+        return n
+
+    def items(self, device: str, prefix: str = "") -> List[Tuple[str, Any, float]]:
+        with self._lock:
+            return [(k[1], v, ts) for data in (self._sampled, self._on_change) for k, (v, ts) in data.items()
+                    if k[0] == device and k[1].startswith(prefix)]
+
+    def devices(self) -> List[str]:
+        with self._lock:
+            return sorted({k[0] for data in (self._sampled, self._on_change) for k in data})
+
+
+# ---------- views over the cache ----------
+
+_IF_RE = re.compile(r"^interfaces/interface\[name=([^\]]+)\]/state/(?:counters/)?([\w-]+)$")
+_CPU_RE = re.compile(r"^components/component\[name=([^\]]+)\]/cpu/utilization/state/instant$")
+_OSPF_RE = re.compile(r"/neighbors/neighbor\[neighbor-id=([^\]]+)\]/state/adjacency-state$")
+_BGP_RE = re.compile(r"/neighbors/neighbor\[neighbor-address=([^\]]+)\]/state/session-state$")
+
+
+def _strip_identity(v: Any) -> Any:
+    # "openconfig-ospf-types:FULL" -> "FULL"
+    return v.split(":")[-1] if isinstance(v, str) else v
+
+
+def cpu(cache: LatestCache, device: str) -> Optional[float]:
+    """Highest instantaneous CPU utilisation (%) across CPU components."""
+    values = [float(v) for p, v, _ in cache.items(device, "components/") if _CPU_RE.match(p)]
+    return max(values) if values else None
+
+
+def interfaces(cache: LatestCache, device: str) -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    for path, v, _ in cache.items(device, "interfaces/"):
+        m = _IF_RE.match(path)
+        if m:
+            out.setdefault(m.group(1), {})[m.group(2)] = _strip_identity(v)
+    return out
+
+
+def ospf_neighbors(cache: LatestCache, device: str) -> Dict[str, str]:
+    out = {}
+    for path, v, _ in cache.items(device, "network-instances/"):
+        m = _OSPF_RE.search(path)
+        if m:
+            out[m.group(1)] = _strip_identity(v)
+    return out
+
+
+def bgp_neighbors(cache: LatestCache, device: str) -> Dict[str, str]:
+    out = {}
+    for path, v, _ in cache.items(device, "network-instances/"):
+        m = _BGP_RE.search(path)
+        if m:
+            out[m.group(1)] = _strip_identity(v)
+    return out
+
+
+def device_view(cache: LatestCache, device: str) -> Dict[str, Any]:
+    return {"cpu": cpu(cache, device), "interfaces": interfaces(cache, device),
+            "ospf_neighbors": ospf_neighbors(cache, device), "bgp_neighbors": bgp_neighbors(cache, device)}
+
+
+# ---------- transport ----------
+
+class PygnmiTransport:
+    """open(target, subscribe) -> stream, backed by pygnmi (imported on first use)."""
+
+    def __init__(self, port: int = GNMI_PORT, insecure: bool = True, skip_verify: bool = False):
+        self.port = port
+        self.insecure = insecure
+        self.skip_verify = skip_verify
+
+    def open(self, target: Dict[str, str], subscribe: Dict[str, Any]):
+        try:
+            from pygnmi.client import gNMIclient
+        except Exception as e:
+            raise SystemExit(
+                "pygnmi is not installed in this Python environment.\n"
+                "Activate your venv and install it:\n"
+                "  pip install pygnmi\n"
+            ) from e
+        client = gNMIclient(target=(target["IP"], self.port), username=target["Username"],
+                            password=target["Password"], insecure=self.insecure,
+                            skip_verify=self.skip_verify)
+        client.connect()
+        try:
+            stream = client.subscribe2(subscribe=subscribe)
+        except Exception:
+            client.close()
+            raise
+        return _PygnmiStream(client, stream)
+
+
+class _PygnmiStream:
+    def __init__(self, client, stream):
+        self._client = client
+        self._stream = stream
+
+    def __iter__(self):
+        return iter(self._stream)
+
+    def close(self) -> None:
+        for obj in (self._stream, self._client):
+            try:
+                obj.close()
+            except Exception:
+                pass
+
+
+# ---------- per-device subscription with reconnect ----------
+
+class DeviceStream(threading.Thread):
+    def __init__(self, name: str, target: Dict[str, str], cache: LatestCache, transport,
+                 subscribe: Dict[str, Any], backoff_min: float = BACKOFF_MIN,
+                 backoff_max: float = BACKOFF_MAX):
+        super().__init__(name=f"gnmi-{name}", daemon=True)
+        self.device = name
+        self.target = target
+        self.cache = cache
+        self.transport = transport
+        self.subscribe = subscribe
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.stop_event = threading.Event()
+        self.synced = threading.Event()
+        self.status = {"connected": False, "connects": 0, "reconnects": 0, "updates": 0,
+                       "last_update": None, "last_error": None}
+        self._stream = None
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        stream = self._stream
+        if stream is not None:
+            stream.close()      # unblocks the iterator in run()
+
+    def _consume(self) -> bool:
+        """One connect/subscribe/read cycle; True if any notification arrived."""
+        got_data = False
+        with timing.span("connect", device=self.device,
+                         vendor=self.target.get("Device_Type", ""), transport="gnmi"):
+            self._stream = self.transport.open(self.target, self.subscribe)
+        self.status.update(connected=True, connects=self.status["connects"] + 1, last_error=None)
+        try:
+            if self.stop_event.is_set():
+                return False
+            for notification in self._stream:
+                if self.stop_event.is_set():
+                    break
+                got_data = True
+                if notification.get("sync_response"):
+                    self.synced.set()
+                    continue
+                self.status["updates"] += self.cache.apply(self.device, notification)
+                self.status["last_update"] = time.time()
+        finally:
+            stream, self._stream = self._stream, None
+            stream.close()
+            self.status["connected"] = False
+        return got_data
+
+    def run(self) -> None:
+        backoff = self.backoff_min
+        while not self.stop_event.is_set():
+            try:
+                if self._consume():
+                    backoff = self.backoff_min
+                if not self.stop_event.is_set():
+                    self.status["last_error"] = "stream ended"
+            except SystemExit as e:         # client library missing: no point retrying
+                self.status["last_error"] = str(e)
+                log.error("%s: %s", self.device, e)
+                return
+            except Exception as e:
+                self.status["last_error"] = f"{type(e).__name__}: {e}"
+            if self.stop_event.is_set():
+                break
+            self.status["reconnects"] += 1
+            delay = backoff * random.uniform(0.8, 1.2)
+            log.warning("%s: %s; resubscribing in %.1fs", self.device, self.status["last_error"], delay)
+            self.stop_event.wait(delay)
+            backoff = min(backoff * 2, self.backoff_max)
+
+
+class Collector:
+    """One DeviceStream per device sharing a LatestCache."""
+
+    def __init__(self, targets: Dict[str, Dict[str, str]], transport=None,
+                 cache: Optional[LatestCache] = None, sample_interval: float = 10.0,
+                 **stream_kwargs):
+        self.cache = cache or LatestCache()
+        self.transport = transport or PygnmiTransport()
+        self._subscribe = subscriptions(sample_interval)
+        self._stream_kwargs = stream_kwargs
+        self._started = False
+        self.streams: Dict[str, DeviceStream] = {}
+        self.add(targets)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def add(self, targets: Dict[str, Dict[str, str]]) -> None:
+        """Subscribe to more devices (started right away if the collector is running)."""
+        for name, t in targets.items():
+            if name in self.streams:
+                continue
+            stream = DeviceStream(name, t, self.cache, self.transport, self._subscribe,
+                                  **self._stream_kwargs)
+            self.streams[name] = stream
+            if self._started:
+                stream.start()
+
+    def start(self) -> None:
+        self._started = True
+        for s in self.streams.values():
+            s.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        for s in self.streams.values():
+            s.stop()
+        for s in self.streams.values():
+            if s.is_alive():
+                s.join(timeout)
+
+    def wait_synced(self, timeout: float = 10.0, names: Optional[List[str]] = None) -> List[str]:
+        """Wait for the initial sync of `names` (default: all); returns those that did sync."""
+        streams = {n: s for n, s in self.streams.items() if names is None or n in names}
+        deadline = time.monotonic() + timeout
+        for s in streams.values():
+            s.synced.wait(max(0.0, deadline - time.monotonic()))
+        return [n for n, s in streams.items() if s.synced.is_set()]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "generated_at": time.time(),
+            "cache": {"paths": len(self.cache), "evicted": self.cache.evicted},
+            "devices": {n: {"status": dict(s.status), **device_view(self.cache, n)}
+                        for n, s in self.streams.items()},
+        }
+
+
+def load_targets(csv_path: str = CSV_PATH, only: Optional[List[str]] = None) -> Dict[str, Dict[str, str]]:
+    """EOS rows of the inventory CSV (gNMI is only configured on EOS)."""
+    import csv
+    with open(csv_path, newline="") as f:
+        rows = [{k.strip(): (v or "").strip() for k, v in r.items() if k} for r in csv.DictReader(f)]
+    targets = {r["Device"]: r for r in rows
+               if r.get("Device") and (r.get("Device_Type") or "arista_eos") == "arista_eos"}
+    if only:
+        targets = {n: t for n, t in targets.items() if n in only}
+    return targets
+
+
+def print_snapshot(snap: Dict[str, Any]) -> None:
+    for name, d in sorted(snap["devices"].items()):
+        st = d["status"]
+        state = "connected" if st["connected"] else f"down ({st['last_error']})"
+        cpu_txt = "N/A" if d["cpu"] is None else f"{d['cpu']:.1f}%"
+        up = sum(1 for i in d["interfaces"].values() if i.get("oper-status") == "UP")
+        print(f"{name:10} {state:30} cpu={cpu_txt:7} if_up={up}/{len(d['interfaces'])} "
+              f"ospf={d['ospf_neighbors'] or '-'} bgp={d['bgp_neighbors'] or '-'}")
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Collect EOS health metrics over gNMI subscriptions.")
+    ap.add_argument("--csv", default=CSV_PATH, help="Path to sshInfo.csv")
+    ap.add_argument("--only", nargs="*", help="Subscribe to these devices only")
+    ap.add_argument("--port", type=int, default=GNMI_PORT, help="gNMI port (default: 6030)")
+    ap.add_argument("--tls", action="store_true", help="Use TLS (default: insecure, as configured)")
+    ap.add_argument("--sample", type=float, default=10.0, help="Sample interval in seconds")
+    ap.add_argument("--max-paths", type=int, default=100_000, help="Latest-value cache bound")
+    ap.add_argument("--once", action="store_true", help="Print after the initial sync and exit")
+    ap.add_argument("--sync-timeout", type=float, default=15.0)
+    ap.add_argument("--json", help="Write the latest values here (every --every seconds)")
+    ap.add_argument("--every", type=float, default=10.0)
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    targets = load_targets(args.csv, args.only)
+    if not targets:
+        print("No EOS devices selected.")
+        return 2
+
+    transport = PygnmiTransport(port=args.port, insecure=not args.tls)
+    with Collector(targets, transport, LatestCache(args.max_paths), args.sample) as collector:
+        synced = collector.wait_synced(args.sync_timeout)
+        log.info("synced %d/%d devices", len(synced), len(targets))
+        while True:
+            snap = collector.snapshot()
+            if args.json:
+                os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+                tmp = args.json + ".tmp"
+                with open(tmp, "w") as f:
+                    json.dump(snap, f, indent=2, default=str)
+                os.replace(tmp, args.json)
+            if args.once:
+                print_snapshot(snap)
+                return 0 if len(synced) == len(targets) else 1
+            try:
+                time.sleep(args.every)
+            except KeyboardInterrupt:
+                return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+import os, tempfile, unittest
+import xml.etree.ElementTree as ET
+from scripts import compliance
+
+RULES = compliance.parse_rules({"rules": [
+    {"id": "no-public", "severity": "high", "forbid": r"^snmp-server community public\b"},
+    {"id": "logging-host", "require": r"^logging host \S+"},
+    {"id": "ospf-max-lsa", "section": r"^router ospf\b", "require": r"^\s+max-lsa\b"},
+    {"id": "no-http", "section": r"^management api http-commands", "forbid": r"^\s+protocol http\b"},
+    {"id": "golden-only", "sources": ["golden"], "forbid": r"^no aaa root$"},
+]})
+
+GOOD = """\
+logging host 10.100.0.5
+snmp-server community NMAS ro
+management api http-commands
+   no shutdown
+router ospf 1
+   network 10.0.0.0/8 area 0
+   max-lsa 12000
+"""
+
+BAD = """\
+no aaa root
+snmp-server community public ro
+management api http-commands
+   protocol http
+router ospf 1
+   network 10.0.0.0/8 area 0
+!
+router ospf 2
+   max-lsa 12000
+"""
+
+def by_rule(results):
+    return {r["rule"]: r for r in results}
+
+class TestRuleEngine(unittest.TestCase):
+    def test_good_config_passes_and_source_filter_applies(self):
+        results = by_rule(compliance.RuleSet(RULES).evaluate(GOOD, "startup"))
+        self.assertNotIn("golden-only", results)
+        self.assertEqual({r["status"] for r in results.values()}, {"pass"})
+
+    def test_bad_config_findings(self):
+        rs = compliance.RuleSet(RULES)
+        results = by_rule(rs.evaluate(BAD, "golden"))
+        self.assertEqual(results["no-public"]["matches"], [{"line": 2, "text": "snmp-server community public ro"}])
+        self.assertEqual(results["logging-host"]["status"], "fail")
+        # only the first OSPF section lacks max-lsa
+        self.assertEqual(results["ospf-max-lsa"]["matches"], [{"line": 5, "text": "router ospf 1"}])
+        self.assertEqual(results["no-http"]["matches"][0]["line"], 4)
+        self.assertEqual(results["golden-only"]["status"], "fail")
+
+    def test_section_rule_not_applicable_without_section(self):
+        results = by_rule(compliance.RuleSet(RULES).evaluate("logging host 1.1.1.1\n", "startup"))
+        self.assertEqual(results["ospf-max-lsa"]["status"], "n/a")
+
+    def test_invalid_rules_rejected(self):
+        for bad in ({"id": "x"}, {"id": "x", "forbid": "a", "require": "b"},
+                    {"id": "x", "forbid": "("}, {"id": "x", "forbid": "a", "sources": ["lab"]}):
+            with self.assertRaises(ValueError):
+                compliance.parse_rules({"rules": [bad]})
+
+    def test_inline_flags_stay_with_their_rule(self):
+        rules = compliance.parse_rules({"rules": [
+            {"id": "no-telnet", "forbid": r"^transport input telnet$"},
+            {"id": "no-public-any-case", "forbid": r"(?i)^snmp-server community public\b"},
+            {"id": "ntp", "section": r"(?i)^ntp", "forbid": r"(?m)^\s+key 0\b"},
+        ]})
+        rs = compliance.RuleSet(rules)          # combined prefilters used to raise re.error
+        results = by_rule(rs.evaluate("SNMP-SERVER COMMUNITY PUBLIC ro\nTRANSPORT INPUT TELNET\n"
+                                      "NTP server 1.1.1.1\n   key 0 abc\n", "startup"))
+        self.assertEqual(results["no-public-any-case"]["status"], "fail")
+        self.assertEqual(results["no-telnet"]["status"], "pass")     # (?i) must not leak
+        self.assertEqual(results["ntp"]["status"], "fail")
+
+    def test_shared_group_names_stay_with_their_rule(self):
+        rules = compliance.parse_rules({"rules": [
+            {"id": "no-v1", "forbid": r"^snmp-server community (?P<name>\S+) ro$"},
+            {"id": "no-public", "forbid": r"^snmp-server community (?P<name>public)\b"},
+        ]})
+        rs = compliance.RuleSet(rules)          # a combined prefilter used to raise re.error
+        results = by_rule(rs.evaluate("snmp-server community public rw\n", "startup"))
+        self.assertEqual(results["no-public"]["status"], "fail")
+        self.assertEqual(results["no-v1"]["status"], "pass")
+
+    def test_backreferences_stay_with_their_rule(self):
+        rules = compliance.parse_rules({"rules": [
+            {"id": "no-telnet", "forbid": r"^transport input (telnet)$"},
+            {"id": "no-self-alias", "forbid": r"^alias (\w+) \1$"},
+        ]})
+        rs = compliance.RuleSet(rules)          # joined, \1 would point at no-telnet's group
+        results = by_rule(rs.evaluate("alias sh sh\n", "startup"))
+        self.assertEqual(results["no-self-alias"]["status"], "fail")
+        self.assertEqual(results["no-telnet"]["status"], "pass")
+
+    def test_shipped_rules_load(self):
+        self.assertTrue(compliance.load_rules())
+
+class TestRunAndReports(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        for day, name in (("2025-09-23", "R1_20250923-000149Z.cfg"),
+                          ("2025-09-30", "R1_20250930-204644Z.cfg"),
+                          ("2025-09-23", "R2_20250923-000154Z.cfg")):
+            os.makedirs(os.path.join(root, "golden", day), exist_ok=True)
+            with open(os.path.join(root, "golden", day, name), "w") as f:
+                f.write(BAD if name.startswith("R1_2025093") else GOOD)
+        os.makedirs(os.path.join(root, "startup"))
+        with open(os.path.join(root, "startup", "r1.cfg"), "w") as f:
+            f.write(GOOD)
+        self.roots = {"golden": os.path.join(root, "golden"), "startup": os.path.join(root, "startup"),
+                      "generated": os.path.join(root, "missing")}
+        self.cache = os.path.join(root, "cache.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_latest_golden_per_device(self):
+        names = [os.path.basename(p) for p in compliance.latest_golden(self.roots["golden"])]
+        self.assertEqual(names, ["R1_20250930-204644Z.cfg", "R2_20250923-000154Z.cfg"])
+
+    def test_run_pool_cache_and_junit(self):
+        files = compliance.discover(roots=self.roots)
+        self.assertEqual(len(files), 3)
+        first = compliance.run(files, RULES, jobs=2, cache_path=self.cache)
+        self.assertEqual(first["summary"]["failed_files"], 1)
+        self.assertEqual(first["summary"]["cached_files"], 0)
+
+        second = compliance.run(files, RULES, jobs=2, cache_path=self.cache)
+        self.assertEqual(second["summary"]["cached_files"], 3)
+        self.assertEqual(second["summary"]["failures"], first["summary"]["failures"])
+
+        junit = os.path.join(self.tmp.name, "out.xml")
+        compliance.write_junit(second, junit)
+        suites = ET.parse(junit).getroot()
+        self.assertEqual(suites.get("failures"), str(first["summary"]["failures"]))
+        self.assertEqual(len(suites.findall("testsuite")), 3)
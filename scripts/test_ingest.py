@@ -0,0 +1,141 @@
+import asyncio, os, socket, tempfile, time, unittest
+from scripts import ingest, replay_events
+from scripts.eventstore import Event, EventStore
+
+EOS_LINK = (b"<187>Sep 30 20:46:44 R1 Ebra: %LINEPROTO-5-UPDOWN: Line protocol on "
+            b"Interface Ethernet1, changed state to down")
+IOS_OSPF = (b"<189>Sep  3 20:46:44 R2 %OSPF-5-ADJCHG: Process 1, Nbr 10.0.0.2 on "
+            b"GigabitEthernet0/1 from LOADING to FULL, Loading Done")
+RFC5424_BGP = (b'<189>1 2025-09-30T20:46:44.123Z R3 Bgp - - [meta sequenceId="7"] '
+               b"%BGP-5-ADJCHANGE: peer 10.1.0.2 (VRF default AS 65002) old state Established "
+               b"event Stop new state Idle")
+
+class TestSyslogParsing(unittest.TestCase):
+    def test_rfc3164_eos(self):
+        d = ingest.parse_syslog(EOS_LINK)
+        self.assertEqual((d["facility"], d["severity"], d["host"], d["app"]), (23, 3, "R1", "Ebra"))
+        self.assertEqual(ingest.classify(d["msg"]), ("link", "Ethernet1", "down"))
+
+    def test_rfc3164_without_tag(self):
+        d = ingest.parse_syslog(IOS_OSPF)
+        self.assertEqual((d["host"], d["app"]), ("R2", None))
+        self.assertEqual(ingest.classify(d["msg"]), ("ospf", "10.0.0.2", "up"))
+
+    def test_rfc5424_structured_data(self):
+        d = ingest.parse_syslog(RFC5424_BGP)
+        self.assertEqual((d["host"], d["app"]), ("R3", "Bgp"))
+        self.assertTrue(d["msg"].startswith("%BGP-5-ADJCHANGE"))
+        self.assertEqual(ingest.classify(d["msg"]), ("bgp", "10.1.0.2", "down"))
+
+    def test_garbage_never_raises(self):
+        d = ingest.parse_syslog(b"\xff\xfe not syslog")
+        self.assertEqual(d["severity"], 5)
+
+    def test_sender_ip_names_device(self):
+        e = ingest.to_event(1.0, "syslog", "10.100.0.7", IOS_OSPF, {"10.100.0.7": "R1"})
+        self.assertEqual((e.device, e.interface, e.event), ("R1", "GigabitEthernet0/1", "ospf"))
+
+class TestTraps(unittest.TestCase):
+    def test_link_down_round_trip(self):
+        data = ingest.encode_trap("1.3.6.1.6.3.1.1.5.3",
+                                  [(ingest.IF_INDEX + "5", 5), (ingest.IF_NAME + "5", "Ethernet5")],
+                                  community="NMAS", uptime=1 << 20)
+        community, varbinds = ingest.parse_trap(data)
+        self.assertEqual(community, "NMAS")
+        self.assertEqual(varbinds[0], (ingest.SYS_UPTIME, 1 << 20))
+        e = ingest.to_event(1.0, "trap", "10.100.0.6", data, {"10.100.0.6": "R2"})
+        self.assertEqual((e.device, e.event, e.subject, e.state, e.severity),
+                         ("R2", "link", "Ethernet5", "down", 4))
+
+    def test_ospf_and_bgp_state_from_varbinds(self):
+        ospf = ingest.encode_trap("1.3.6.1.2.1.14.16.2.2", [(ingest.OSPF_NBR_STATE + "10.0.0.2.0", 1)])
+        bgp = ingest.encode_trap("1.3.6.1.2.1.15.0.1", [(ingest.BGP_PEER_STATE + "10.1.0.2", 6)])
+        self.assertEqual(ingest.to_event(1.0, "trap", "a", ospf, {})[8:11], ("ospf", "10.0.0.2", "down"))
+        self.assertEqual(ingest.to_event(1.0, "trap", "a", bgp, {})[8:11], ("bgp", "10.1.0.2", "up"))
+
+    def test_community_filter_and_malformed(self):
+        data = ingest.encode_trap("1.3.6.1.6.3.1.1.5.4", community="public")
+        self.assertIsNone(ingest.to_event(1.0, "trap", "a", data, {}, community="NMAS"))
+        self.assertEqual(ingest.to_event(1.0, "trap", "a", data[:-3], {}).app, "malformed")
+
+    def test_inform_response(self):
+        inform = ingest.encode_trap("1.3.6.1.6.3.1.1.5.3", [(ingest.IF_NAME + "1", "Ethernet1")],
+                                    request_id=4242, inform=True)
+        ack = ingest.inform_response(inform)
+        tag, msg, _ = ingest._ber_read(ack, 0)
+        items = ingest._ber_items(msg)
+        self.assertEqual(items[2][0], 0xA2)                             # Response PDU
+        self.assertEqual(items[2][1], ingest._ber_items(ingest._ber_read(inform, 0)[1])[2][1])
+        self.assertEqual(ingest.to_event(1.0, "trap", "a", inform, {}).interface, "Ethernet1")
+        self.assertIsNone(ingest.inform_response(ingest.encode_trap("1.3.6.1.6.3.1.1.5.3")))
+        self.assertIsNone(ingest.inform_response(inform, community="NMAS"))
+        self.assertIsNone(ingest.inform_response(inform[:-3] + b"\xff"))
+
+class TestEventStore(unittest.TestCase):
+    def test_state_keeps_newest_and_indexes_query(self):
+        with EventStore(":memory:") as store:
+            def ev(ts, state):
+                return Event(ts, "R1", "10.100.0.7", "syslog", 3, 23, "Ebra", "Ethernet1",
+                             "link", "Ethernet1", state, f"Ethernet1 {state}")
+            store.add_batch([ev(2.0, "down"), ev(3.0, "up")])
+            store.add_batch([ev(1.0, "down")])          # late arrival
+            self.assertEqual([s["state"] for s in store.current_state()], ["up"])
+            self.assertEqual(len(store.query(device="R1", interface="Ethernet1", since=1.5)), 2)
+            self.assertEqual([c["ts"] for c in store.changes(0)], [2.0, 3.0, 1.0])
+            plan = " ".join(r[-1] for r in store._db.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM events WHERE device = 'R1' AND interface = 'Et1'"))
+            self.assertIn("events_iface_ts", plan)
+
+class TestReceiver(unittest.TestCase):
+    def test_replay_is_fully_stored(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = os.path.join(tmp, "events.db")
+            rx = ingest.Ingest(db, {"127.0.0.1": "lab"}, batch=500, flush_interval=0.05)
+            syslog_port = rx.listen("127.0.0.1", 0, "syslog")
+            trap_port = rx.listen("127.0.0.1", 0, "trap")
+            count = 2000
+
+            async def scenario():
+                stop = asyncio.Event()
+                task = asyncio.ensure_future(rx.run(stop, report_every=0.05))
+                await asyncio.sleep(0.2)
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, replay_events.replay, replay_events.synthetic(),
+                                           "127.0.0.1", syslog_port, trap_port, count, 20000)
+                deadline = time.time() + 5
+                while rx.stats["received"] < count and time.time() < deadline:
+                    await asyncio.sleep(0.05)
+                stop.set()
+                await task
+
+            asyncio.run(scenario())
+            self.assertEqual(rx.stats["dropped"], 0)
+            self.assertEqual(rx.stats["stored"], count)
+            with EventStore(db) as store:
+                self.assertEqual(store.count(), count)
+                self.assertTrue(store.current_state("lab"))
+
+    def test_informs_are_acknowledged(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            rx = ingest.Ingest(os.path.join(tmp, "events.db"), flush_interval=0.05)
+            trap_port = rx.listen("127.0.0.1", 0, "trap")
+            sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sender.settimeout(5)
+            self.addCleanup(sender.close)
+            inform = ingest.encode_trap("1.3.6.1.6.3.1.1.5.4", request_id=7, inform=True)
+
+            async def scenario():
+                stop = asyncio.Event()
+                task = asyncio.ensure_future(rx.run(stop, report_every=0.05))
+                await asyncio.sleep(0.2)
+                sender.sendto(inform, ("127.0.0.1", trap_port))
+                reply = await asyncio.get_running_loop().run_in_executor(None, sender.recv, 65535)
+                stop.set()
+                await task
+                return reply
+
+            self.assertEqual(asyncio.run(scenario()), ingest.inform_response(inform))
+            self.assertEqual(rx.stats["stored"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
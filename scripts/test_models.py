@@ -0,0 +1,65 @@
+import os, unittest
+from scripts.models import Device, Interface, ValidationError
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CORE = {
+    "device": {
+        "name": "R20",
+        "vendor": "arista_eos",
+        "mgmt_ip": "100.10.0.20/24",
+        "vlans": [{"id": "10", "name": "users", "ipv4_subnet": "10.10.0.1/24",
+                   "ospfv3": {"area": "0"}, "dhcp_enabled": "true"}],
+        "interfaces": [{"name": "et1", "ipv4": "10.0.1.1/30", "mtu": "9000"}],
+        "routes": {"static": [{"prefix": "0.0.0.0/0", "next_hop": "10.0.1.2"}]},
+        "routing_protocols": {
+            "ospf": {"id": "1", "networks": [{"prefix": "10.0.0.0 0.255.255.255", "area": "0"}]},
+            "bgp": {"as": "65001", "neighbors": [{"ip": "10.0.1.2", "remote_as": "65002"}],
+                    "networks": ["10.10.0.0/24", ""]},
+        },
+    }
+}
+
+
+class TestDeviceModel(unittest.TestCase):
+    def test_values_are_parsed(self):
+        d = Device.from_dict(CORE)
+        self.assertEqual(d.vlans[0].id, 10)
+        self.assertIs(d.vlans[0].dhcp_enabled, True)
+        self.assertEqual(d.vlans[0].ospfv3_area, "0")
+        self.assertEqual(d.interfaces[0].mtu, 9000)
+        self.assertEqual(d.bgp.as_number, 65001)
+        self.assertEqual(d.bgp.networks, ["10.10.0.0/24"])
+        self.assertIsNone(d.rip)
+
+    def test_gui_placeholder_rows_dropped(self):
+        d = Device.from_yaml_file(os.path.join(REPO_ROOT, "data", "devices", "R10_access.yaml"))
+        self.assertEqual(d.vlans, [])
+        self.assertEqual(d.static_routes, [])
+        self.assertEqual([i.name for i in d.interfaces], ["et6"])
+
+    def test_all_errors_reported_with_yaml_paths(self):
+        bad = {"name": "", "vlans": [{"id": "5000"}], "bogus": 1,
+               "routes": {"static": [{"prefix": "10.0.0.0/8"}]},
+               "routing_protocols": {"bgp": {"as": "x"}}}
+        with self.assertRaises(ValidationError) as cm:
+            Device.from_dict(bad)
+        errors = cm.exception.errors
+        self.assertIn("device.name: required", errors)
+        self.assertIn("device: unknown field(s) bogus", errors)
+        self.assertIn("device.routes.static[0].next_hop: required", errors)
+        self.assertTrue(any(e.startswith("device.vlans[0].id:") for e in errors))
+        # a failed conversion is not reported a second time as "required"
+        self.assertEqual(sum(e.startswith("device.routing_protocols.bgp.as:") for e in errors), 1)
+
+    def test_yaml_and_json_round_trip(self):
+        d = Device.from_dict(CORE)
+        self.assertEqual(Device.from_yaml(d.to_yaml()), d)
+        self.assertEqual(Device.from_json(d.to_json()), d)
+
+    def test_slots(self):
+        self.assertFalse(hasattr(Interface(name="et1"), "__dict__"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import subprocess, sys, unittest
+from unittest.mock import patch, MagicMock
+from scripts import netman
+from scripts.importtime import parse_importtime, heavy_imports, total_us, REPO_ROOT, HEAVY
+
+SAMPLE_IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       228 |        228 |   _io
+import time:      1300 |      10500 |   argparse
+import time:       900 |      16800 | scripts.netman
+import time:       262 |     187755 | netmiko
+"""
+
+class TestNetmanCli(unittest.TestCase):
+    def test_subcommand_forwards_remaining_args(self):
+        target = MagicMock(return_value=0)
+        with patch.object(netman, "load_command", return_value=target) as load:
+            rc = netman.main(["backup", "--only", "R1", "R2", "--outdir", "/tmp/x"])
+        load.assert_called_once_with("backup")
+        target.assert_called_once_with(["--only", "R1", "R2", "--outdir", "/tmp/x"])
+        self.assertEqual(rc, 0)
+
+    def test_unknown_subcommand_exits(self):
+        with self.assertRaises(SystemExit), patch("sys.stderr"):
+            netman.main(["frobnicate"])
+
+    def test_import_does_not_load_heavy_dependencies(self):
+        # Fresh interpreter: the test runner itself may already have them loaded
+        code = ("import sys, scripts.netman, scripts.health_check, scripts.config, "
+                "scripts.ping_webserver; "
+                f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))")
+        out = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT,
+                             capture_output=True, text=True, check=True).stdout
+        self.assertEqual(out.strip(), "")
+
+class TestImportTimeParser(unittest.TestCase):
+    def test_parse_records_and_depth(self):
+        records = parse_importtime(SAMPLE_IMPORTTIME)
+        self.assertEqual([r.module for r in records], ["_io", "argparse", "scripts.netman", "netmiko"])
+        self.assertEqual(records[1].depth, 1)
+        self.assertEqual(records[2].depth, 0)
+        self.assertEqual(total_us(records, "scripts.netman"), 16800)
+
+    def test_heavy_imports_flagged(self):
+        self.assertEqual(heavy_imports(parse_importtime(SAMPLE_IMPORTTIME)), {"netmiko": 187755})
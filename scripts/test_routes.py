@@ -0,0 +1,220 @@
+import contextlib, io, ipaddress, os, random, tempfile, unittest
+from scripts import routes
+from scripts.routes import PatriciaTrie, RouteIndex, ip_to_int, parse_routes
+
+EOS = """\
+VRF: default
+Codes: C - connected, S - static, K - kernel,
+       O - OSPF, IA - OSPF inter area, E1 - OSPF external type 1,
+
+Gateway of last resort:
+ S        0.0.0.0/0 [1/0] via 10.100.0.1, Management1
+
+ C        10.0.12.0/30 is directly connected, Ethernet1
+ O        10.2.0.0/24 [110/20] via 10.0.12.2, Ethernet1
+ B E      172.16.0.0/16 [200/0] via 10.0.12.2, Ethernet1
+                                via 10.0.13.2, Ethernet2
+ S        192.0.2.0/24 is directly connected, Null0
+
+VRF: mgmt
+ C        10.100.0.0/24 is directly connected, Management1
+"""
+
+IOS = """\
+Gateway of last resort is 10.0.12.1 to network 0.0.0.0
+
+S*    0.0.0.0/0 [1/0] via 10.0.12.1
+      10.0.0.0/8 is variably subnetted, 4 subnets, 2 masks
+C        10.0.12.0/30 is directly connected, GigabitEthernet0/1
+L        10.0.12.2/32 is directly connected, GigabitEthernet0/1
+O        10.2.0.0/24 [110/20] via 10.0.23.3, 00:01:02, GigabitEthernet0/2
+                     [110/20] via 10.0.24.4, 00:01:02, GigabitEthernet0/3
+      172.16.0.0/24 is subnetted, 2 subnets
+B        172.16.1.0 [20/0] via 10.0.23.3, 1d02h
+"""
+
+class TestPatriciaTrie(unittest.TestCase):
+    def test_matches_brute_force_through_inserts_and_deletes(self):
+        rnd = random.Random(7)
+        trie, table = PatriciaTrie(), {}
+        for _ in range(3000):
+            length = rnd.randint(0, 32)
+            net = ipaddress.ip_network((rnd.getrandbits(32), length), strict=False)
+            trie.insert(int(net.network_address), length, str(net))
+            table[net] = str(net)
+        for net in rnd.sample(sorted(table), 1500):
+            self.assertTrue(trie.delete(int(net.network_address), net.prefixlen))
+            del table[net]
+        self.assertFalse(trie.delete(ip_to_int("203.0.113.0"), 31) and
+                         ipaddress.ip_network("203.0.113.0/31") not in table)
+        self.assertEqual(len(trie), len(table))
+        for _ in range(3000):
+            addr = ipaddress.ip_address(rnd.getrandbits(32))
+            matches = [n for n in table if addr in n]
+            expected = table[max(matches, key=lambda n: n.prefixlen)] if matches else None
+            hit = trie.lookup(int(addr))
+            self.assertEqual(hit[2] if hit else None, expected)
+
+class TestParsing(unittest.TestCase):
+    def test_eos_vrfs_ecmp_and_connected(self):
+        tables = parse_routes(EOS)
+        self.assertEqual(sorted(tables), ["default", "mgmt"])
+        bgp = tables["default"]["172.16.0.0/16"]
+        self.assertEqual((bgp.proto, bgp.distance), ("B E", 200))
+        self.assertEqual(bgp.next_hops, (("10.0.12.2", "Ethernet1"), ("10.0.13.2", "Ethernet2")))
+        self.assertEqual(tables["default"]["10.0.12.0/30"].next_hops, ((None, "Ethernet1"),))
+        self.assertEqual(routes.summarize(tables), "6 routes: B 1, C 2, O 1, S 2")
+
+    def test_ios_subnetted_and_continuations(self):
+        tables = parse_routes(IOS)["default"]
+        self.assertIn("172.16.1.0/24", tables)
+        self.assertEqual(tables["172.16.1.0/24"].next_hops, (("10.0.23.3", None),))
+        self.assertEqual(len(tables["10.2.0.0/24"].next_hops), 2)
+        self.assertEqual(tables["0.0.0.0/0"].proto, "S*")
+
+    def test_interface_addresses(self):
+        cfg = "interface Ethernet1\n   no switchport\n   ip address 10.0.12.1/30\n!\n" \
+              "interface Gi0/1\n ip address 10.0.23.2 255.255.255.0\n"
+        self.assertEqual(routes.interface_addresses(cfg),
+                         [("Ethernet1", "10.0.12.1"), ("Gi0/1", "10.0.23.2")])
+
+def table(*lines):
+    return "VRF: default\n" + "\n".join(f" {l}" for l in lines) + "\n"
+
+class TestIndexAndTrace(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.write("R1", table("C        10.0.12.0/30 is directly connected, Ethernet1",
+                               "C        10.0.13.0/30 is directly connected, Ethernet2",
+                               "O        10.9.0.0/24 [110/30] via 10.0.12.2, Ethernet1",
+                               "                             via 10.0.13.2, Ethernet2",
+                               "S        0.0.0.0/0 [1/0] via 10.0.12.9, Ethernet1"))
+        self.write("R2", table("C        10.0.12.0/30 is directly connected, Ethernet1",
+                               "C        10.0.24.0/30 is directly connected, Ethernet2",
+                               "O        10.9.0.0/24 [110/20] via 10.0.24.2, Ethernet2"))
+        self.write("R3", table("C        10.0.13.0/30 is directly connected, Ethernet1",
+                               "O        10.9.0.0/24 [110/20] via 10.0.13.1, Ethernet1"))
+        self.write("R4", table("C        10.0.24.0/30 is directly connected, Ethernet1",
+                               "C        10.9.0.0/24 is directly connected, Vlan10"))
+        self.index = RouteIndex(self.dir)
+        self.index.refresh()
+        self.index.owners.update({
+            "10.0.12.1": ("R1", "Ethernet1"), "10.0.13.1": ("R1", "Ethernet2"),
+            "10.0.12.2": ("R2", "Ethernet1"), "10.0.24.1": ("R2", "Ethernet2"),
+            "10.0.13.2": ("R3", "Ethernet1"), "10.0.24.2": ("R4", "Ethernet1"),
+            "10.9.0.1": ("R4", "Vlan10"),
+        })
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, device, text):
+        routes.save_table(device, text, self.dir)
+        # refresh() keys on (mtime, size); make each rewrite visible even within one clock tick
+        path = os.path.join(self.dir, f"{device}.txt")
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    def test_ecmp_trace_delivered_and_loop(self):
+        paths = self.index.trace("R1", "10.9.0.50")
+        self.assertEqual([p["status"] for p in paths], ["delivered", "loop"])
+        self.assertEqual([h["device"] for h in paths[0]["hops"]], ["R1", "R2", "R4"])
+        self.assertEqual(paths[0]["hops"][-1]["interface"], "Vlan10")
+        self.assertEqual([h["device"] for h in paths[1]["hops"]], ["R1", "R3"])
+
+    def test_shorthand_addresses_are_rejected(self):
+        with self.assertRaises(ValueError):
+            ip_to_int("10.1")              # inet_aton would read this as 10.0.0.1
+        with self.assertRaises(ValueError):
+            self.index.trace("R1", "10.9")
+
+    def test_fabric_fan_out_stays_linear(self):
+        # 6 tiers of 4 devices, each with 4-way ECMP into the next tier:
+        # 4**6 distinct paths if every branch were walked on its own
+        tiers, width = 6, 4
+        owners = {}
+        for t in range(tiers):
+            for i in range(width):
+                owners[f"10.{t}.{i}.1"] = (f"T{t}-{i}", "Ethernet1")
+                nxt = ([f"O        10.200.0.0/24 [110/20] via 10.{t + 1}.0.1, Ethernet1"]
+                       + [f"                              via 10.{t + 1}.{j}.1, Ethernet{j + 1}"
+                          for j in range(1, width)]) if t + 1 < tiers else \
+                    ["O        10.200.0.0/24 [110/20] via 10.99.0.1, Ethernet1"]
+                self.write(f"T{t}-{i}", table(*nxt))
+        self.write("EDGE", table("C        10.200.0.0/24 is directly connected, Vlan200"))
+        owners["10.99.0.1"] = ("EDGE", "Ethernet1")
+        self.index.refresh()
+        self.index.owners.update(owners)
+
+        paths = self.index.trace("T0-0", "10.200.0.9")
+        self.assertEqual({p["status"] for p in paths}, {"delivered"})
+        self.assertLessEqual(len(paths), tiers * width * width)
+        walked = [p for p in paths if not p["detail"].startswith("joins")]
+        self.assertEqual(len(walked), 1)
+        delivered = walked[0]
+        self.assertEqual(delivered["device"], "EDGE")
+        self.assertEqual([h["device"] for h in delivered["hops"]], [f"T{t}-0" for t in range(tiers)] + ["EDGE"])
+
+        capped = self.index.trace("T0-0", "10.200.0.9", max_paths=5)
+        self.assertEqual(len(capped), 6)
+        self.assertEqual(capped[-1]["status"], "truncated")
+
+    def test_diamond_trace_exits_zero(self):
+        # R1 -> R2/R3 -> R4, where 10.9.0.0/24 is connected: both branches deliver
+        self.write("R3", table("C        10.0.13.0/30 is directly connected, Ethernet1",
+                               "C        10.0.34.0/30 is directly connected, Ethernet2",
+                               "O        10.9.0.0/24 [110/20] via 10.0.34.2, Ethernet2"))
+        golden = os.path.join(self.dir, "golden", "2025-01-01")
+        os.makedirs(golden)
+        for dev, ifaces in {"R1": ["10.0.12.1", "10.0.13.1"], "R2": ["10.0.12.2", "10.0.24.1"],
+                            "R3": ["10.0.13.2", "10.0.34.1"], "R4": ["10.0.24.2", "10.0.34.2"]}.items():
+            with open(os.path.join(golden, f"{dev}_20250101-000000Z.cfg"), "w") as f:
+                for n, addr in enumerate(ifaces, 1):
+                    f.write(f"interface Ethernet{n}\n   ip address {addr}/30\n")
+        argv = ["--routes-dir", self.dir, "--golden-dir", os.path.dirname(golden), "trace", "R1", "10.9.0.50"]
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(routes.main(argv), 0)
+        self.assertEqual(out.getvalue().count(": delivered"), 2, out.getvalue())
+        self.assertIn("joins an earlier path at R4", out.getvalue())
+
+        # a broken downstream device fails every branch that joins it
+        self.write("R4", table("C        10.0.24.0/30 is directly connected, Ethernet1"))
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(routes.main(argv), 1)
+        self.assertEqual(out.getvalue().count(": no-route"), 2, out.getvalue())
+
+    def test_owners_follow_newer_golden_configs(self):
+        golden = os.path.join(self.dir, "golden")
+        os.makedirs(os.path.join(golden, "2025-01-01"))
+        os.makedirs(os.path.join(golden, "2025-01-02"))
+        with open(os.path.join(golden, "2025-01-01", "R9_20250101-000000Z.cfg"), "w") as f:
+            f.write("interface Ethernet1\n   ip address 10.0.99.1/30\n")
+        index = RouteIndex(self.dir)
+        self.assertEqual(index.load_owners_from_configs(golden), 1)
+        self.assertEqual(index.owners["10.0.99.1"], ("R9", "Ethernet1"))
+        with open(os.path.join(golden, "2025-01-02", "R9_20250102-000000Z.cfg"), "w") as f:
+            f.write("interface Ethernet2\n   ip address 10.0.99.5/30\n")
+        index.load_owners_from_configs(golden)
+        self.assertNotIn("10.0.99.1", index.owners)
+        self.assertEqual(index.owners["10.0.99.5"], ("R9", "Ethernet2"))
+
+    def test_leaves_fleet_and_no_route(self):
+        self.assertEqual([p["status"] for p in self.index.trace("R1", "8.8.8.8")], ["leaves-fleet"])
+        self.assertEqual([p["status"] for p in self.index.trace("R3", "8.8.8.8")], ["no-route"])
+        self.assertEqual(self.index.trace("R3", "10.0.24.2")[0]["status"], "no-route")
+
+    def test_incremental_refresh(self):
+        self.assertEqual(self.index.refresh(), {})          # nothing changed on disk
+        self.write("R3", table("C        10.0.13.0/30 is directly connected, Ethernet1",
+                               "O        10.9.0.0/24 [110/20] via 10.0.13.9, Ethernet1",
+                               "S        0.0.0.0/0 [1/0] via 10.0.13.1, Ethernet1"))
+        os.remove(os.path.join(self.dir, "R4.txt"))
+        changes = self.index.refresh()
+        self.assertEqual(changes["R3"], {"added": 1, "removed": 0, "changed": 1})
+        self.assertEqual(changes["R4"], {"removed_device": 1})
+        self.assertEqual(self.index.lookup("R3", "10.9.0.7").next_hops[0][0], "10.0.13.9")
+        self.assertEqual(self.index.devices(), ["R1", "R2", "R3"])
+
+if __name__ == "__main__":
+    unittest.main()
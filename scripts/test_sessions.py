@@ -0,0 +1,112 @@
+import re, unittest
+from unittest.mock import MagicMock
+from netmiko.exceptions import ReadTimeout, NetmikoTimeoutException
+from scripts import bench_profiles, ping_webserver, sessions
+
+def fake_conn(base_prompt="R1"):
+    conn = MagicMock()
+    conn.base_prompt = base_prompt
+    conn.RETURN = "\n"
+    conn.host = "10.0.0.1"
+    conn.send_command.return_value = "ok"
+    return conn
+
+class TestPromptCalibration(unittest.TestCase):
+    def test_prompt_pattern_per_platform(self):
+        eos = sessions.prompt_pattern("R1", "arista_eos")
+        self.assertTrue(re.search(eos, "R1#"))
+        self.assertTrue(re.search(eos, "R1(config-if-Et1)#"))
+        self.assertFalse(re.search(eos, "R10#"))
+        junos = sessions.prompt_pattern("admin@vmx1", "juniper_junos")
+        self.assertTrue(re.search(junos, "admin@vmx1>"))
+
+    def test_delay_factor_scales_with_rtt_and_is_clamped(self):
+        self.assertEqual(sessions.delay_factor_for(0.001), 0.1)
+        self.assertEqual(sessions.delay_factor_for(0.05), 0.5)
+        self.assertEqual(sessions.delay_factor_for(2.0), 1.0)
+
+    def test_fast_session_calibrates_and_uses_expect_string(self):
+        conn = fake_conn()
+        connect = MagicMock(return_value=conn)
+        s = sessions.open_session(connect, {"device_type": "arista_eos", "host": "h"}, "fast")
+        self.assertEqual(connect.call_args.kwargs["fast_cli"], True)
+        self.assertEqual(conn.read_until_pattern.call_count, sessions.CALIBRATION_SAMPLES)
+        self.assertEqual(conn.global_delay_factor, sessions.MIN_DELAY_FACTOR)
+        s.prep("terminal length 0")
+        s.send("show ip route")
+        conn.send_command_timing.assert_not_called()
+        for call in conn.send_command.call_args_list:
+            self.assertEqual(call.kwargs["expect_string"], s.prompt)
+        s.enable(); s.enable()
+        self.assertEqual(conn.enable.call_count, 1)
+
+    def test_safe_session_keeps_timing_reads(self):
+        conn = fake_conn()
+        s = sessions.open_session(MagicMock(return_value=conn), {"device_type": "arista_eos"}, "safe")
+        s.prep("terminal length 0")
+        s.send("show version")
+        conn.send_command_timing.assert_called_once_with("terminal length 0")
+        self.assertNotIn("expect_string", conn.send_command.call_args.kwargs)
+        conn.read_until_pattern.assert_not_called()
+
+class TestFallback(unittest.TestCase):
+    def test_read_timeout_falls_back_to_safe_and_retries(self):
+        conn = fake_conn()
+        conn.send_command.side_effect = [ReadTimeout("no prompt"), "full output"]
+        s = sessions.open_session(MagicMock(return_value=conn), {"device_type": "arista_eos"}, "fast")
+        self.assertEqual(s.send("show running-config"), "full output")
+        self.assertEqual(s.profile, "safe")
+        self.assertEqual(conn.global_delay_factor, 1)
+        conn.clear_buffer.assert_called_once()
+        self.assertNotIn("expect_string", conn.send_command.call_args.kwargs)
+
+    def test_ping_goes_through_session_fallback(self):
+        conn = fake_conn()
+        conn.send_command.side_effect = [ReadTimeout("no prompt"),
+                                         "5 packets transmitted, 5 received, 0% packet loss"]
+        s = sessions.open_session(MagicMock(return_value=conn), {"device_type": "arista_eos"}, "fast")
+        ok, _ = ping_webserver.send_eos_ping(s, "1.1.1.2")
+        self.assertTrue(ok)
+        self.assertEqual(s.profile, "safe")
+        first, retry = conn.send_command.call_args_list
+        self.assertEqual(first.kwargs["expect_string"], s.prompt)
+        self.assertNotIn("expect_string", retry.kwargs)
+
+    def test_connect_timeout_reconnects_with_safe_profile(self):
+        conn = fake_conn()
+        connect = MagicMock(side_effect=[NetmikoTimeoutException("slow"), conn])
+        s = sessions.open_session(connect, {"device_type": "arista_eos"}, "fast")
+        self.assertEqual(s.profile, "safe")
+        self.assertEqual(connect.call_args.kwargs["fast_cli"], False)
+
+    def test_unknown_profile_rejected(self):
+        with self.assertRaises(ValueError):
+            sessions.open_session(MagicMock(), {"device_type": "arista_eos"}, "turbo")
+
+SESSION_LOG = """\
+R1>enable
+R1#terminal length 0
+Pagination disabled.
+R1#show ip ospf neighbor
+Neighbor ID     Instance VRF      Pri State     Dead Time   Address         Interface
+2.2.2.2         1        default  1   FULL/DR   00:00:35    10.0.12.2       Ethernet1
+R1#
+"""
+
+class TestReplay(unittest.TestCase):
+    def test_session_log_recording(self):
+        rec = bench_profiles.parse_session_log(SESSION_LOG)
+        self.assertEqual(rec["prompt"], "R1")
+        self.assertEqual(rec["outputs"]["terminal length 0"], "Pagination disabled.")
+        self.assertIn("FULL/DR", rec["outputs"]["show ip ospf neighbor"])
+
+    def test_fast_session_over_replay_channel(self):
+        rec = {"prompt": "R1", "device_type": "arista_eos",
+               "outputs": bench_profiles.parse_session_log(SESSION_LOG)["outputs"]}
+        connect = bench_profiles.replay_connect(rec, rtt=0.001, bandwidth=1e9)
+        s = sessions.open_session(connect, {"device_type": "arista_eos", "host": "replay",
+                                            "username": "u", "password": "p"}, "fast")
+        self.assertEqual(s.profile, "fast")
+        self.assertIn("FULL/DR", s.send("show ip ospf neighbor"))
+        s.disconnect()
+
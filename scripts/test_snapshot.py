@@ -0,0 +1,138 @@
+import copy, os, tempfile, unittest
+import unittest.mock
+import xml.etree.ElementTree as ET
+from scripts import snapshot
+from scripts.snapshot import device_entry, diff, parse_bgp, parse_interfaces, parse_ospf, parse_ping
+
+EOS_OSPF = """\
+Neighbor ID     Instance VRF      Pri State                  Dead Time   Address         Interface
+2.2.2.2         1        default  1   FULL/DR                00:00:35    10.0.12.2       Ethernet1
+3.3.3.3         1        default  0   FULL                   00:00:31    10.0.13.2       Ethernet2
+4.4.4.4         2        blue     1   INIT/DROTHER           00:00:39    10.4.0.2        Ethernet3
+"""
+IOS_OSPF = """\
+Neighbor ID     Pri   State           Dead Time   Address         Interface
+2.2.2.2           1   FULL/BDR        00:00:35    10.0.12.2       GigabitEthernet0/1
+5.5.5.5           0   FULL/  -        00:00:38    10.0.15.2       GigabitEthernet0/2
+"""
+EOS_BGP = """\
+BGP summary information for VRF default
+Router identifier 1.1.1.1, local AS number 65001
+  Neighbor         V  AS           MsgRcvd   MsgSent  InQ OutQ  Up/Down State   PfxRcd PfxAcc
+  10.0.12.2        4  65002             10        12    0    0 00:05:01 Estab   3      3
+  10.0.13.2        4  65003              0         0    0    0 00:05:01 Active
+BGP summary information for VRF blue
+  10.4.0.2         4  65004             10        12    0    0 00:05:01 Estab   7      7
+"""
+IOS_BGP = """\
+Neighbor        V           AS MsgRcvd MsgSent   TblVer  InQ OutQ Up/Down  State/PfxRcd
+10.0.12.2       4        65002      10      12        5    0    0 00:05:01        3
+10.0.13.2       4        65003       0       0        1    0    0 never    Idle (Admin)
+"""
+EOS_IF = """\
+                                                                           Address
+Interface         IP Address           Status       Protocol            MTU    Owner
+----------------- -------------------- ------------ -------------- ---------- -------
+Ethernet1         10.0.12.1/30         up           up                 1500
+Ethernet2         10.0.13.1/30         down         lowerlayerdown     1500
+Management1       10.100.0.7/24        up           up                 1500
+"""
+IOS_IF = """\
+Interface              IP-Address      OK? Method Status                Protocol
+GigabitEthernet0/0     10.0.0.1        YES NVRAM  up                    up
+GigabitEthernet0/1     unassigned      YES NVRAM  administratively down down
+"""
+
+def fleet(**overrides):
+    base = {
+        "ospf": {"2.2.2.2@Ethernet1": "FULL", "3.3.3.3@Ethernet2": "FULL"},
+        "bgp": {"10.0.12.2": ["Established", 3]},
+        "routes": {"default": {"10.2.0.0/24": "O|10.0.12.2@Ethernet1",
+                               "10.3.0.0/24": "O|10.0.13.2@Ethernet2"}},
+        "interfaces": {"Ethernet1": "up/up", "Ethernet2": "up/up"},
+        "ping": {"1.1.1.2": 0.0},
+    }
+    snap = {"version": snapshot.FORMAT_VERSION, "name": "pre", "ping": ["1.1.1.2"],
+            "devices": {"R1": device_entry(base), "R2": device_entry(copy.deepcopy(base))}}
+    for dev, sections in overrides.items():
+        entry = copy.deepcopy(base)
+        entry.update(sections)
+        snap["devices"][dev] = device_entry(entry)
+    return snap
+
+class TestParsers(unittest.TestCase):
+    def test_ospf(self):
+        self.assertEqual(parse_ospf(EOS_OSPF), {"2.2.2.2@Ethernet1": "FULL", "3.3.3.3@Ethernet2": "FULL",
+                                                "4.4.4.4@Ethernet3": "INIT"})
+        self.assertEqual(parse_ospf(IOS_OSPF), {"2.2.2.2@GigabitEthernet0/1": "FULL",
+                                                "5.5.5.5@GigabitEthernet0/2": "FULL"})
+        # a lost point-to-point adjacency must show up as lost, not vanish from both sides
+        after = parse_ospf(IOS_OSPF.replace("5.5.5.5", "#"))
+        self.assertIn(("5.5.5.5@GigabitEthernet0/2", "fail", "neighbor lost"),
+                      list(snapshot.diff_ospf(parse_ospf(IOS_OSPF), after)))
+
+    def test_bgp(self):
+        self.assertEqual(parse_bgp(EOS_BGP), {"10.0.12.2": ["Established", 3], "10.0.13.2": ["Active", None],
+                                              "blue/10.4.0.2": ["Established", 7]})
+        self.assertEqual(parse_bgp(IOS_BGP), {"10.0.12.2": ["Established", 3],
+                                              "10.0.13.2": ["Idle (Admin)", None]})
+
+    def test_interfaces_and_ping(self):
+        self.assertEqual(parse_interfaces(EOS_IF), {"Ethernet1": "up/up", "Ethernet2": "down/lowerlayerdown",
+                                                    "Management1": "up/up"})
+        self.assertEqual(parse_interfaces(IOS_IF)["GigabitEthernet0/1"], "administratively down/down")
+        self.assertEqual(parse_ping("5 packets transmitted, 3 received, 40% packet loss"), 40.0)
+        self.assertEqual(parse_ping("Success rate is 80 percent (4/5)"), 20.0)
+        self.assertEqual(parse_ping("% Network is unreachable"), 100.0)
+
+class TestDiff(unittest.TestCase):
+    def test_identical_snapshots_pass(self):
+        self.assertEqual(diff(fleet(), fleet()), [])
+
+    def test_regressions_are_graded(self):
+        post = fleet(R2={
+            "ospf": {"2.2.2.2@Ethernet1": "FULL", "3.3.3.3@Ethernet2": "INIT"},
+            "bgp": {"10.0.12.2": ["Established", 1]},
+            "routes": {"default": {"10.2.0.0/24": "O|10.0.13.2@Ethernet2", "10.9.0.0/24": "S|@Null0"}},
+            "interfaces": {"Ethernet1": "up/up", "Ethernet2": "administratively down/down"},
+            "ping": {"1.1.1.2": 20.0},
+        })
+        got = {(c.section, c.key): (c.level, c.change) for c in diff(fleet(), post)}
+        self.assertEqual(got, {
+            ("ospf", "3.3.3.3@Ethernet2"): ("fail", "neighbor no longer FULL"),
+            ("bgp", "10.0.12.2"): ("warn", "fewer prefixes received"),
+            ("routes", "default 10.2.0.0/24"): ("warn", "next hops moved"),
+            ("routes", "default 10.3.0.0/24"): ("fail", "route disappeared"),
+            ("routes", "default 10.9.0.0/24"): ("info", "new route"),
+            ("interfaces", "Ethernet2"): ("warn", "shut down"),
+            ("ping", "1.1.1.2"): ("fail", "new packet loss"),
+        })
+        self.assertTrue(all(c.device == "R2" for c in diff(fleet(), post)))
+
+    def test_device_level_changes(self):
+        post = fleet()
+        post["devices"]["R1"] = {"error": "timed out"}
+        del post["devices"]["R2"]
+        post["devices"]["R3"] = post["devices"]["R1"]
+        changes = {(c.device, c.change): c.level for c in diff(fleet(), post)}
+        self.assertEqual(changes, {("R1", "capture failed"): "fail", ("R2", "missing from snapshot"): "fail",
+                                   ("R3", "new device"): "info"})
+
+    def test_cli_exit_code_and_junit(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            snapshot.save(fleet(), os.path.join(tmp, "pre.json.gz"))
+            snapshot.save(fleet(R1={"bgp": {}}), os.path.join(tmp, "post.json.gz"))
+            junit = os.path.join(tmp, "snapshot.xml")
+            with unittest.mock.patch("builtins.print"):
+                self.assertEqual(snapshot.main(["--snapshot-dir", tmp, "diff", "pre", "pre"]), 0)
+                self.assertEqual(snapshot.main(["--snapshot-dir", tmp, "diff", "pre", "post",
+                                                "--junit", junit]), 1)
+                self.assertEqual(snapshot.main(["--snapshot-dir", tmp, "diff", "pre", "post",
+                                                "--fail-on", "never"]), 0)
+                self.assertEqual(snapshot.main(["--snapshot-dir", tmp, "diff", "pre", "nope"]), 2)
+            suite = ET.parse(junit).getroot()
+            self.assertEqual((suite.get("tests"), suite.get("failures")), ("2", "1"))
+            self.assertIsNotNone(suite.find("testcase[@name='R1']/failure"))
+
+if __name__ == "__main__":
+    unittest.main()
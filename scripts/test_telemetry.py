@@ -0,0 +1,165 @@
+import queue, time, unittest
+from unittest.mock import patch
+from scripts import telemetry, health_check
+
+IF = "interfaces/interface[name=Ethernet1]/state"
+OSPF = ("network-instances/network-instance[name=default]/protocols/protocol[identifier=OSPF][name=1]/"
+        "ospfv2/areas/area[identifier=0.0.0.0]/interfaces/interface[id=Ethernet1]/neighbors/"
+        "neighbor[neighbor-id=10.0.0.2]/state/adjacency-state")
+BGP = ("network-instances/network-instance[name=default]/protocols/protocol[identifier=BGP][name=BGP]/"
+       "bgp/neighbors/neighbor[neighbor-address=10.1.0.2]/state/session-state")
+
+def update(path, val, prefix=None, ts=None):
+    u = {"update": [{"path": path, "val": val}], "timestamp": ts or time.time_ns()}
+    if prefix:
+        u["prefix"] = prefix
+    return {"update": u}
+
+INITIAL = [
+    update("components/component[name=CPU0]/cpu/utilization/state/instant", 7),
+    update(IF, {"openconfig-interfaces:counters": {"in-octets": 100, "in-errors": 0}}),
+    update("oper-status", "UP", prefix=IF),
+    update(OSPF, "openconfig-ospf-types:FULL"),
+    update(BGP, "ESTABLISHED"),
+    {"sync_response": True},
+]
+
+class FakeGnmiServer:
+    """
+    In-process stand-in for a device's gNMI service: every open() is a new
+    subscription that replays INITIAL, then streams whatever the test pushes.
+    fail_opens makes the first N connects fail; drop() ends the live stream.
+    """
+    def __init__(self, fail_opens=0):
+        self.fail_opens = fail_opens
+        self.opens = 0
+        self.subscribe = None
+        self.live = None
+
+    def open(self, target, subscribe):
+        self.opens += 1
+        self.subscribe = subscribe
+        if self.opens <= self.fail_opens:
+            raise ConnectionError("connection refused")
+        stream = FakeStream(INITIAL)
+        self.live = stream
+        return stream
+
+    def push(self, notification):
+        self.live.q.put(notification)
+
+    def drop(self):
+        self.live.q.put(ConnectionResetError("stream reset"))
+
+class FakeStream:
+    def __init__(self, initial):
+        self.q = queue.Queue()
+        for n in initial:
+            self.q.put(n)
+
+    def __iter__(self):
+        while True:
+            item = self.q.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def close(self):
+        self.q.put(None)
+
+def wait_for(cond, timeout=3.0):
+    deadline = time.time() + timeout
+    while not cond() and time.time() < deadline:
+        time.sleep(0.01)
+    return cond()
+
+TARGET = {"R1": {"IP": "10.100.0.7", "Username": "admin", "Password": "x", "Device_Type": "arista_eos"}}
+
+class TestLatestCache(unittest.TestCase):
+    def test_bounded_lru_and_subtree_delete(self):
+        cache = telemetry.LatestCache(max_paths=3)
+        for i in range(4):
+            cache.put("R1", f"a/{i}", i)
+        self.assertEqual((len(cache), cache.evicted), (3, 1))
+        cache.put("R1", "a/1", 10)           # refresh: a/2 is now the oldest
+        cache.put("R1", "b", 0)
+        self.assertEqual([p for p, _, _ in cache.items("R1")], ["a/3", "a/1", "b"])
+        cache.apply("R1", {"update": {"prefix": "a", "delete": [""]}})
+        self.assertEqual([p for p, _, _ in cache.items("R1")], ["b"])
+
+    def test_sampled_counters_evicted_before_on_change_state(self):
+        cache = telemetry.LatestCache(max_paths=50)
+        cache.apply("R1", INITIAL[2])                       # oper-status
+        cache.apply("R1", INITIAL[3])                       # OSPF adjacency
+        cache.apply("R1", INITIAL[4])                       # BGP session
+        for rnd in range(3):                                # counters keep refreshing past the bound
+            for port in range(10):
+                cache.apply("R1", update(f"interfaces/interface[name=Ethernet{port}]/state",
+                                         {"counters": {f"c{i}": rnd for i in range(6)}}))
+        self.assertEqual(len(cache), 50)
+        self.assertGreater(cache.evicted, 0)
+        view = telemetry.device_view(cache, "R1")
+        self.assertEqual(view["ospf_neighbors"], {"10.0.0.2": "FULL"})
+        self.assertEqual(view["bgp_neighbors"], {"10.1.0.2": "ESTABLISHED"})
+        self.assertEqual(view["interfaces"]["Ethernet1"]["oper-status"], "UP")
+
+    def test_views(self):
+        cache = telemetry.LatestCache()
+        for n in INITIAL:
+            cache.apply("R1", n)
+        view = telemetry.device_view(cache, "R1")
+        self.assertEqual(view["cpu"], 7.0)
+        self.assertEqual(view["interfaces"], {"Ethernet1": {"in-octets": 100, "in-errors": 0, "oper-status": "UP"}})
+        self.assertEqual(view["ospf_neighbors"], {"10.0.0.2": "FULL"})
+        self.assertEqual(view["bgp_neighbors"], {"10.1.0.2": "ESTABLISHED"})
+
+class TestCollector(unittest.TestCase):
+    def test_subscribe_stream_and_resubscribe(self):
+        server = FakeGnmiServer(fail_opens=1)
+        with telemetry.Collector(TARGET, server, backoff_min=0.01, backoff_max=0.05) as c:
+            self.assertEqual(c.wait_synced(3), ["R1"])
+            modes = {s["path"]: s["mode"] for s in server.subscribe["subscription"]}
+            self.assertEqual(modes[telemetry.CPU_PATH], "sample")
+            self.assertEqual(modes[telemetry.BGP_PATH], "on_change")
+
+            server.push(update(BGP, "IDLE"))
+            self.assertTrue(wait_for(lambda: telemetry.bgp_neighbors(c.cache, "R1") == {"10.1.0.2": "IDLE"}))
+
+            server.drop()
+            self.assertTrue(wait_for(lambda: server.opens == 3 and c.streams["R1"].status["connected"]))
+            server.push(update(BGP, "ESTABLISHED"))
+            self.assertTrue(wait_for(lambda: telemetry.bgp_neighbors(c.cache, "R1") == {"10.1.0.2": "ESTABLISHED"}))
+            status = c.snapshot()["devices"]["R1"]["status"]
+            self.assertEqual(status["reconnects"], 2)
+        self.assertFalse(c.streams["R1"].is_alive())
+
+class TestHealthBackend(unittest.TestCase):
+    def test_gnmi_backend_does_not_log_in(self):
+        server = FakeGnmiServer()
+        with patch.object(telemetry, "PygnmiTransport", return_value=server), \
+             patch.object(health_check, "connect") as ssh_connect, \
+             patch.object(health_check, "get_console") as console:
+            health_check.main(["--csv", "data/ssh/sshInfo.csv", "--only", "R1", "--backend", "gnmi"])
+        ssh_connect.assert_not_called()
+        self.assertEqual(server.opens, 1)
+        self.assertTrue(console.return_value.print.called)
+        self.assertIsNone(health_check._collector)      # stopped when main() returns
+
+    def test_gnmi_collector_is_reused_across_checks(self):
+        server = FakeGnmiServer()
+        ssh = {"R1": {"IP": "10.0.0.1", "Username": "u", "Password": "p", "Device_Type": "arista_eos"},
+               "R2": {"IP": "10.0.0.2", "Username": "u", "Password": "p", "Device_Type": "arista_eos"},
+               "C1": {"IP": "10.0.0.3", "Username": "u", "Password": "p", "Device_Type": "cisco_ios"}}
+        self.addCleanup(health_check.stop_gnmi_collector)
+        with patch.object(telemetry, "PygnmiTransport", return_value=server), \
+             patch.object(health_check, "health_check_one") as ssh_check, \
+             patch.object(health_check, "get_console"):
+            for names in (["R1"], ["R2"], ["R1", "C1"]):
+                health_check.health_check_gnmi(names, ssh, sync_timeout=5, profile="fast")
+        self.assertEqual(server.opens, 2)               # one subscription per EOS device, ever
+        ssh_check.assert_called_once_with("C1", ssh["C1"], "fast")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import json, os, tempfile, unittest
+from unittest.mock import patch, MagicMock
+from scripts import timing
+
+class TestTiming(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.trace = os.path.join(self.tmp.name, "trace.jsonl")
+        timing.configure(enabled=True, trace_file=self.trace)
+        timing.reset()
+        self.log_patch = patch.object(timing.log, "info")
+        self.log_info = self.log_patch.start()
+
+    def tearDown(self):
+        self.log_patch.stop()
+        timing.configure(enabled=False, trace_file="")
+        timing.reset()
+        self.tmp.cleanup()
+
+    def read_trace(self):
+        with open(self.trace) as f:
+            return [json.loads(line) for line in f]
+
+    def test_disabled_span_is_shared_noop(self):
+        timing.configure(enabled=False, trace_file="")
+        with timing.span("connect", device="R1") as sp:
+            sp.set(bytes=1)
+        self.assertIs(timing.span("x"), timing._NOOP)
+        self.assertEqual(timing.summary(), [])
+
+    def test_children_inherit_device_and_share_trace(self):
+        with timing.span("backup", device="R1", vendor="arista_eos"):
+            with timing.span("command", cmd="show run") as sp:
+                sp.set(bytes=42)
+        child, root = self.read_trace()
+        self.assertEqual(child["attributes"], {"device": "R1", "vendor": "arista_eos",
+                                               "cmd": "show run", "bytes": 42})
+        self.assertEqual(child["traceId"], root["traceId"])
+        self.assertEqual(child["parentSpanId"], root["spanId"])
+        self.assertEqual(root["parentSpanId"], "")
+        self.assertEqual(json.loads(self.log_info.call_args_list[0][0][0])["span"], "command")
+
+    def test_error_status_recorded(self):
+        with self.assertRaises(RuntimeError):
+            with timing.span("connect", device="R1"):
+                raise RuntimeError("auth failed")
+        (rec,) = self.read_trace()
+        self.assertEqual(rec["status"], {"code": "ERROR", "message": "auth failed"})
+
+    def test_summary_percentiles_per_phase_and_vendor(self):
+        for ms in range(1, 101):
+            timing.record_duration("command", "arista_eos", ms / 1000)
+        timing.record_duration("command", "cisco_ios", 0.5)
+        rows = {(r["phase"], r["vendor"]): r for r in timing.summary()}
+        eos = rows[("command", "arista_eos")]
+        for key, want in (("p50_ms", 50.0), ("p95_ms", 95.0), ("p99_ms", 99.0)):
+            self.assertGreaterEqual(eos[key], want - 1e-6)
+            self.assertLessEqual(eos[key], want * timing.Histogram.GROWTH)     # bucket edge, <= 2% high
+        self.assertEqual(eos["total_ms"], 5050.0)
+        self.assertEqual(rows[("command", "all")]["count"], 101)
+        self.assertEqual(rows[("command", "all")]["max_ms"], 500.0)
+
+    def test_histogram_memory_is_bounded(self):
+        hist = timing.Histogram()
+        for i in range(200_000):
+            hist.add((i % 5000 + 1) * 1e-4)     # 0.1 ms .. 500 ms
+        self.assertLessEqual(len(hist.counts), timing.Histogram.BUCKETS)
+        self.assertLess(len(hist.counts), 700)
+        self.assertEqual(hist.count, 200_000)
+        self.assertEqual(hist.percentile(100), 0.5)
+        timing.Histogram().add(10 * 3600)       # beyond the last bucket: clamped, not an error
+
+    @patch("scripts.health_check.ConnectHandler")
+    def test_health_check_emits_phase_spans(self, mock_ch):
+        from scripts.health_check import health_check_one
+        conn = MagicMock()
+        conn.send_command.return_value = ""
+        mock_ch.return_value = conn
+        with patch("scripts.health_check.get_console"):
+            health_check_one("R1", {"IP": "10.0.0.1", "Username": "u", "Password": "p",
+                                    "Device_Type": "arista_eos"})
+        names = [r["name"] for r in self.read_trace()]
+        self.assertEqual(names.count("command"), 5)
+        self.assertEqual(names[-1], "health")
+        self.assertIn("connect", names)
+        self.assertIn("disconnect", names)
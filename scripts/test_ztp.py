@@ -0,0 +1,163 @@
+import http.client, os, shutil, tempfile, threading, unittest
+from scripts import ztp
+from scripts.ztp import ConfigStore, etag_matches, normalise_key
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+INVENTORY = """\
+devices:
+  R1:
+    serial: JPE17191234
+    mac: [00:1c:73:aa:bb:01, 00:1c:73:aa:bb:02]
+"""
+
+class TestKeys(unittest.TestCase):
+    def test_mac_notations_normalise_alike(self):
+        for mac in ("00:1C:73:AA:BB:01", "00-1c-73-aa-bb-01", "001c.73aa.bb01", "001c73aabb01"):
+            self.assertEqual(normalise_key(mac), "001c73aabb01")
+        self.assertEqual(normalise_key(" R1 "), "r1")
+
+    def test_etag_matches(self):
+        self.assertTrue(etag_matches('"abc"', "abc"))
+        self.assertTrue(etag_matches('W/"x", "abc"', "abc"))
+        self.assertTrue(etag_matches("*", "abc"))
+        self.assertFalse(etag_matches('"abd"', "abc"))
+        self.assertFalse(etag_matches(None, "abc"))
+
+class TestConfigStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.configs = os.path.join(self.tmp.name, "configs")
+        self.devices = os.path.join(self.tmp.name, "devices")
+        os.makedirs(self.configs)
+        os.makedirs(self.devices)
+        self.inventory = os.path.join(self.tmp.name, "inventory.yaml")
+        with open(self.inventory, "w") as f:
+            f.write(INVENTORY)
+        self.write("R1", "hostname R1\n")
+        self.store = ConfigStore(self.configs, self.devices, self.inventory)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text, bump=0):
+        path = os.path.join(self.configs, f"{name}.cfg")
+        with open(path, "w") as f:
+            f.write(text)
+        if bump:
+            st = os.stat(path)
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump))
+
+    def test_resolve_hostname_serial_mac(self):
+        for key in ("R1", "r1", "JPE17191234", "jpe17191234", "001c.73aa.bb02"):
+            self.assertEqual(self.store.resolve(key), "R1", key)
+        self.assertIsNone(self.store.resolve("R9"))
+        self.assertIsNone(self.store.resolve("../configs/R1"))
+
+    def test_cache_invalidated_when_file_changes(self):
+        first = self.store.get("R1")
+        self.assertIs(self.store.get("R1"), first)
+        self.write("R1", "hostname R1\nntp server 10.0.0.1\n", bump=1_000_000)
+        second = self.store.get("R1")
+        self.assertNotEqual(second.etag, first.etag)
+        self.assertIn(b"ntp server", second.body)
+        self.assertEqual(self.store.stats["loads"], 2)
+
+    def test_renders_on_demand_when_yaml_is_newer(self):
+        shutil.copy(os.path.join(REPO_ROOT, "data", "devices", "R6_access.yaml"), self.devices)
+        entry = self.store.get(self.store.resolve("R6"))
+        self.assertIn(b"hostname R6", entry.body)
+        self.assertEqual(self.store.stats["renders"], 1)
+        self.assertIs(self.store.get("R6"), entry)          # up to date now: no re-render
+        no_render = ConfigStore(self.configs, self.devices, self.inventory, render=False)
+        os.remove(os.path.join(self.configs, "R6.cfg"))
+        self.assertIsNone(no_render.get("R6"))
+
+    def test_output_keyed_by_device_name_not_file_prefix(self):
+        src = os.path.join(REPO_ROOT, "data", "devices", "R6_access.yaml")
+        for fn in ("edge6_access.yaml", "r6_access.yaml"):      # device.name is R6 in both
+            with self.subTest(fn):
+                for d in (self.devices, self.configs):
+                    for old in os.listdir(d):
+                        os.remove(os.path.join(d, old))
+                shutil.copy(src, os.path.join(self.devices, fn))
+                store = ConfigStore(self.configs, self.devices, self.inventory)
+                self.assertEqual(store.resolve("r6"), "R6")
+                entry = store.get("R6")
+                self.assertEqual(os.listdir(self.configs), ["R6.cfg"])
+                self.assertIs(store.get("R6"), entry)
+                self.assertEqual(store.stats["renders"], 1)
+
+    def test_device_renamed_in_place(self):
+        path = os.path.join(self.devices, "R6_access.yaml")
+        shutil.copy(os.path.join(REPO_ROOT, "data", "devices", "R6_access.yaml"), path)
+        self.assertIn(b"hostname R6", self.store.get(self.store.resolve("R6")).body)
+        with open(path) as f:
+            text = f.read()
+        with open(path, "w") as f:                          # same file, so the directory mtime stays put
+            f.write(text.replace("name: R6", "name: R16", 1))
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        self.assertEqual(self.store.resolve("R16"), "R16")
+        self.assertIn(b"hostname R16", self.store.get("R16").body)
+        self.assertEqual(self.store.stats["renders"], 2)
+        self.assertIn(b"hostname R6", self.store.get("R6").body)     # the old config is left alone
+
+    def test_open_entry_matches_etag_after_rerender(self):
+        entry = self.store.get("R1")
+        with ztp.open_entry(entry) as f:
+            self.assertEqual(f.read(), b"hostname R1\n")
+        self.write("R1", "hostname R1\nntp server 10.0.0.1\n", bump=1_000_000)
+        with ztp.open_entry(entry) as f:                    # stale entry: its own bytes, not the new file
+            self.assertEqual(f.read(), entry.body)
+
+    def test_render_failure_is_a_500(self):
+        with open(os.path.join(self.devices, "R7_access.yaml"), "w") as f:
+            f.write("device: [unclosed\n")
+        server = ztp.make_server(self.store, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        def status(path):
+            conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+            conn.request("GET", path)
+            resp = conn.getresponse()
+            body = resp.read()
+            conn.close()
+            return resp.status, body
+
+        with self.assertLogs("netman.ztp", "ERROR"):
+            code, body = status("/ztp/R7")
+        self.assertEqual(code, 500)
+        self.assertEqual(body, b"render failed: ParserError\n")
+        self.assertEqual(status("/ztp/r7")[0], 500)
+        self.assertEqual(self.store.stats["render_errors"], 1)     # not retried until the YAML changes
+        self.assertEqual(status("/ztp/R1")[0], 200)
+
+    def test_standalone_server(self):
+        server = ztp.make_server(self.store, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        def get(path, **headers):
+            conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+            conn.close()
+            return resp, body
+
+        resp, body = get("/ztp/R1")
+        self.assertEqual((resp.status, body), (200, b"hostname R1\n"))
+        etag = resp.getheader("ETag")
+        resp, body = get("/ztp/00:1c:73:aa:bb:01", **{"If-None-Match": etag})
+        self.assertEqual((resp.status, body), (304, b""))
+        resp, body = get("/ztp", **{"X-Arista-Serial": "JPE17191234"})
+        self.assertEqual((resp.status, body), (200, b"hostname R1\n"))
+        self.assertEqual(get("/ztp?mac=001c73aabb02")[0].status, 200)
+        self.assertEqual(get("/ztp/R9")[0].status, 404)
+
+if __name__ == "__main__":
+    unittest.main()
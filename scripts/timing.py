@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Per-device, per-phase latency spans for device I/O.
+
+Off by default; turn on with environment variables (so cron/Jenkins jobs and
+every netman subcommand pick it up without new flags):
+
+  NETMAN_TIMING=1                 one JSON line per span on stderr
+  NETMAN_TRACE_FILE=trace.jsonl   also append OpenTelemetry-style span
+                                  records to this file (implies NETMAN_TIMING)
+
+Usage in the scripts:
+
+  with timing.span("health", device="R1", vendor="arista_eos"):
+      with timing.span("connect"):          # inherits device/vendor
+          nc = connect(...)
+      with timing.span("command", cmd="show ip route"):
+          ...
+  timing.log_summary()                      # p50/p95/p99 per phase & vendor
+
+Phases used across the repo: connect, enable, prep, command, write,
+disconnect (children) under one root span per device and run (backup,
+health, ping).
+
+When disabled, span() returns a shared no-op context manager, so the cost
+is one attribute check per call. When enabled, each (phase, vendor) keeps a
+fixed-bucket Histogram rather than every duration, so long-lived processes
+(ztp serve, the telemetry loop, the GUI) stay at constant memory.
+"""
+
+import contextvars
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Attributes a child span copies from its parent unless it sets them itself
+INHERITED = ("device", "vendor")
+
+log = logging.getLogger("netman.timing")
+
+
+class Histogram:
+    """
+    Log-bucketed durations: bucket i holds (BASE * GROWTH**(i-1), BASE * GROWTH**i]
+    seconds, 1 us .. 1 h in about 1100 buckets (stored sparsely). Percentiles
+    are a bucket's upper edge, so at most 2% high; count, total and max are exact.
+    """
+    BASE = 1e-6
+    GROWTH = 1.02
+    BUCKETS = math.ceil(math.log(3600 / BASE) / math.log(GROWTH)) + 1
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        i = 0 if seconds <= self.BASE else \
+            min(math.ceil(math.log(seconds / self.BASE) / math.log(self.GROWTH)), self.BUCKETS - 1)
+        self.counts[i] = self.counts.get(i, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "Histogram") -> None:
+        for i, n in other.counts.items():
+            self.counts[i] = self.counts.get(i, 0) + n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct: float) -> float:
+        """Nearest-rank percentile, as the upper edge of its bucket (never above max)."""
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(pct / 100.0 * self.count) - 1, 0)
+        seen = 0
+        for i in sorted(self.counts):
+            seen += self.counts[i]
+            if seen > rank:
+                return min(self.BASE * self.GROWTH ** i, self.max)
+        return self.max
+
+
+class _State:
+    __slots__ = ("enabled", "trace_file", "lock", "histograms")
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_file: Optional[str] = None
+        self.lock = threading.Lock()
+        # (phase, vendor) -> durations, for the end-of-run summary
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+
+
+_state = _State()
+_current: contextvars.ContextVar = contextvars.ContextVar("netman_span", default=None)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    __slots__ = ("name", "attrs", "trace_id", "span_id", "parent_id",
+                 "start_ns", "_t0", "duration", "_token")
+
+    def __init__(self, name: str, attrs: Dict[str, object]):
+        parent = _current.get()
+        if parent is not None:
+            attrs = {**{k: parent.attrs[k] for k in INHERITED if k in parent.attrs}, **attrs}
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+        else:
+            self.trace_id = os.urandom(16).hex()
+            self.parent_id = None
+        self.name = name
+        self.attrs = attrs
+        self.span_id = os.urandom(8).hex()
+        self.duration = 0.0
+
+    def set(self, **attrs):
+        """Add attributes after the span started (e.g. output size)."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        self.start_ns = time.time_ns()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._t0
+        _current.reset(self._token)
+        _finish(self, exc)
+        return False
+
+
+def span(name: str, **attrs):
+    """Time a block as phase `name`. No-op unless timing is enabled."""
+    if not _state.enabled:
+        return _NOOP
+    return Span(name, attrs)
+
+
+def enabled() -> bool:
+    return _state.enabled
+
+
+def configure(enabled: Optional[bool] = None, trace_file: Optional[str] = None) -> None:
+    """
+    Enable/disable timing programmatically. Defaults come from NETMAN_TIMING
+    and NETMAN_TRACE_FILE; a trace file implies enabled.
+    """
+    if trace_file is None:
+        trace_file = os.environ.get("NETMAN_TRACE_FILE") or None
+    if enabled is None:
+        enabled = bool(trace_file) or os.environ.get("NETMAN_TIMING", "").lower() in ("1", "true", "yes")
+
+    _state.enabled = enabled
+    _state.trace_file = trace_file
+
+    if enabled and not log.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(handler)
+        log.setLevel(logging.INFO)
+        log.propagate = False
+
+
+def reset() -> None:
+    """Forget collected durations (start of a new run)."""
+    with _state.lock:
+        _state.histograms.clear()
+
+
+def _finish(s: Span, exc: Optional[BaseException]) -> None:
+    record_duration(s.name, str(s.attrs.get("vendor") or "unknown"), s.duration)
+
+    record = {
+        "span": s.name,
+        "ms": round(s.duration * 1000, 3),
+        **s.attrs,
+    }
+    if exc is not None:
+        record["error"] = f"{type(exc).__name__}: {exc}"
+    log.info(json.dumps(record, default=str))
+
+    if _state.trace_file:
+        otel = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "parentSpanId": s.parent_id or "",
+            "name": s.name,
+            "startTimeUnixNano": s.start_ns,
+            "endTimeUnixNano": s.start_ns + int(s.duration * 1e9),
+            "attributes": {k: v for k, v in s.attrs.items() if v is not None},
+            "status": {"code": "ERROR", "message": str(exc)} if exc is not None else {"code": "OK"},
+        }
+        line = json.dumps(otel, default=str) + "\n"
+        with _state.lock, open(_state.trace_file, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def record_duration(phase: str, vendor: str, seconds: float) -> None:
+    """Add one duration to the (phase, vendor) histogram."""
+    with _state.lock:
+        hist = _state.histograms.get((phase, vendor))
+        if hist is None:
+            hist = _state.histograms[(phase, vendor)] = Histogram()
+        hist.add(seconds)
+
+
+def summary() -> List[Dict[str, object]]:
+    """
+    Per-run histogram rows, one per (phase, vendor) plus an 'all' row per
+    phase; times in milliseconds.
+    """
+    groups: Dict[Tuple[str, str], Histogram] = {}
+    with _state.lock:
+        for (phase, vendor), hist in _state.histograms.items():
+            groups[(phase, vendor)] = copy = Histogram()
+            copy.merge(hist)
+            groups.setdefault((phase, "all"), Histogram()).merge(hist)
+
+    rows = []
+    for (phase, vendor), hist in sorted(groups.items()):
+        rows.append({
+            "phase": phase,
+            "vendor": vendor,
+            "count": hist.count,
+            "p50_ms": round(hist.percentile(50) * 1000, 3),
+            "p95_ms": round(hist.percentile(95) * 1000, 3),
+            "p99_ms": round(hist.percentile(99) * 1000, 3),
+            "max_ms": round(hist.max * 1000, 3),
+            "total_ms": round(hist.total * 1000, 3),
+        })
+    return rows
+
+
+def log_summary() -> None:
+    """Emit the per-run summary as JSON lines (and into the trace file)."""
+    if not _state.enabled:
+        return
+    rows = summary()
+    for row in rows:
+        log.info(json.dumps({"summary": row}))
+    if _state.trace_file and rows:
+        with _state.lock, open(_state.trace_file, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps({"summary": row}) + "\n")
+
+
+configure()
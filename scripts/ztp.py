@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+Day-0 (ZTP) config server: a booting device fetches generated-configs/<name>.cfg
+by hostname, serial number or system MAC.
+
+  python3 -m scripts.ztp serve [--port 8080] [--no-render]
+  curl http://ztp:8080/ztp/R6                       # by hostname
+  curl http://ztp:8080/ztp/JPE17191234              # by serial (data/ztp/inventory.yaml)
+  curl http://ztp:8080/ztp/00:1c:73:aa:bb:06        # by MAC, any notation
+  curl -H 'X-Arista-Serial: JPE17191234' http://ztp:8080/ztp
+  python3 -m scripts.ztp bench --concurrency 300    # local load test
+
+The GUI serves the same thing at /ztp/<key> (gui/app.py); this standalone
+server is for the site-bring-up case where a few hundred devices ask at once
+and the GUI's other dependencies are not wanted.
+
+ConfigStore keeps one entry per config: path, (mtime, size), a strong ETag
+(sha1 of the content) and the body. A request costs one stat() of the
+config; the file is re-read and re-hashed only when the stat changes. If
+the device's data/devices/<name>_<type>.yaml is newer than the config (or
+there is no config yet), the config is rendered first via
+generate_config.render(), once per device even if hundreds of requests for
+it arrive together. Clients sending If-None-Match get 304 without a body.
+Devices are keyed by the YAML's device.name (what render() names the
+output), not the filename prefix. A failed render is logged, keeps the last
+good config in service and otherwise raises RenderError (HTTP 500); it is
+not retried until the YAML changes.
+
+The standalone server sends bodies with socket.sendfile() (zero-copy
+os.sendfile from the page cache); under Flask, send_file() hands the file
+to the WSGI server's file_wrapper, which gunicorn/uWSGI also turn into
+sendfile.
+"""
+
+import argparse
+import hashlib
+import io
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from typing import BinaryIO, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+try:
+    from scripts import timing
+except ImportError:  # run directly as scripts/ztp.py
+    import timing
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIGS_DIR = os.path.join(REPO_ROOT, "generated-configs")
+DEVICES_DIR = os.path.join(REPO_ROOT, "data", "devices")
+INVENTORY_PATH = os.environ.get("NETMAN_ZTP_INVENTORY") or os.path.join(REPO_ROOT, "data", "ztp", "inventory.yaml")
+
+# Identity headers sent by EOS ZTP; ?serial= / ?mac= / ?hostname= work for everything else
+IDENTITY_HEADERS = ("X-Arista-Serial", "X-Arista-SystemMAC")
+IDENTITY_ARGS = ("hostname", "serial", "mac")
+
+log = logging.getLogger("netman.ztp")
+
+_MAC_RE = re.compile(r"^[0-9A-Fa-f]{2}(?:[:.-]?[0-9A-Fa-f]{2}){5}$|^(?:[0-9A-Fa-f]{4}\.){2}[0-9A-Fa-f]{4}$")
+
+
+def normalise_key(key: str) -> str:
+    """Serial/hostname compare case-insensitively; MACs as 12 lower-case hex digits."""
+    key = key.strip()
+    if _MAC_RE.match(key):
+        return re.sub(r"[^0-9a-f]", "", key.lower())
+    return key.lower()
+
+
+def request_keys(path_key: Optional[str], args, headers) -> List[str]:
+    """Identity keys in the order to try them: URL path, query string, EOS headers."""
+    keys = [path_key] if path_key else []
+    keys += [args.get(name) for name in IDENTITY_ARGS]
+    keys += [headers.get(name) for name in IDENTITY_HEADERS]
+    return [k for k in keys if k]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """RFC 9110 weak comparison of an If-None-Match header against a bare ETag value."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"') == etag:
+            return True
+    return False
+
+
+class RenderError(Exception):
+    """A device's config could not be rendered and there is no earlier one to serve."""
+
+    def __init__(self, name: str, cause: BaseException):
+        self.name = name
+        self.kind = type(cause).__name__
+        super().__init__(f"render of {name} failed: {self.kind}: {cause}")
+
+
+class Entry(NamedTuple):
+    name: str
+    path: str
+    stat: tuple         # (mtime_ns, size) the etag/body belong to
+    etag: str
+    mtime: float
+    body: bytes
+
+
+class ConfigStore:
+    """Thread-safe key -> config lookup with a stat-validated in-memory cache."""
+
+    def __init__(self, configs_dir: str = CONFIGS_DIR, devices_dir: str = DEVICES_DIR,
+                 inventory_path: str = INVENTORY_PATH, render: bool = True):
+        self.configs_dir = configs_dir
+        self.devices_dir = devices_dir
+        self.inventory_path = inventory_path
+        self.render_on_demand = render
+        self.stats = {"hits": 0, "loads": 0, "renders": 0, "render_errors": 0}
+        self._entries: Dict[str, Entry] = {}
+        self._aliases: Dict[str, str] = {}          # normalised serial/MAC -> device name
+        self._inventory_stat = None
+        self._sources: Dict[str, str] = {}          # device name -> YAML path
+        self._yaml_names: Dict[str, Tuple[Optional[tuple], str]] = {}   # YAML path -> ((mtime_ns, size), device name)
+        self._failed: Dict[str, Tuple[int, RenderError]] = {}  # device name -> (YAML mtime_ns, error)
+        self._names: Dict[str, str] = {}            # lower-case hostname -> device name
+        self._names_stat = None
+        self._lock = threading.Lock()
+        self._render_locks: Dict[str, threading.Lock] = {}
+
+    # ---------- key -> device name ----------
+
+    def _reload_inventory(self) -> None:
+        try:
+            st = os.stat(self.inventory_path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp == self._inventory_stat:
+            return
+        aliases = {}
+        if stamp is not None:
+            import yaml
+            with open(self.inventory_path) as f:
+                doc = yaml.safe_load(f) or {}
+            for name, ids in (doc.get("devices") or {}).items():
+                for field in ("serial", "mac"):
+                    values = (ids or {}).get(field) or []
+                    for value in values if isinstance(values, list) else [values]:
+                        aliases[normalise_key(str(value))] = str(name)
+        self._aliases, self._inventory_stat = aliases, stamp
+
+    def _reload_names(self, force: bool = False) -> None:
+        # a directory's mtime changes when a file is added, removed or renamed;
+        # an in-place edit of device.name needs force (see resolve() and _stale())
+        stamps = []
+        for d in (self.devices_dir, self.configs_dir):
+            try:
+                st = os.stat(d)
+                stamps.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                stamps.append(None)
+        if stamps == self._names_stat and not force:
+            return
+        sources, names, yaml_names = {}, {}, {}
+        if stamps[0]:
+            for fn in sorted(os.listdir(self.devices_dir)):
+                base, ext = os.path.splitext(fn)
+                if ext == ".yaml" and "_" in base:
+                    path = os.path.join(self.devices_dir, fn)
+                    yaml_names[path] = self._device_name(path, base.split("_", 1)[0])
+                    sources[yaml_names[path][1]] = path
+        if stamps[1]:
+            for fn in os.listdir(self.configs_dir):
+                if fn.endswith(".cfg") and not fn.startswith("."):
+                    names[fn[:-4].lower()] = fn[:-4]
+        names.update((name.lower(), name) for name in sources)
+        self._sources, self._names, self._names_stat = sources, names, stamps
+        self._yaml_names = yaml_names
+
+    def _device_name(self, path: str, default: str) -> Tuple[Optional[tuple], str]:
+        """device.name from a YAML (what render() calls the output); re-parsed only when it changes."""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None, default
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._yaml_names.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached
+        import yaml
+        try:
+            with open(path) as f:
+                name = ((yaml.safe_load(f) or {}).get("device") or {}).get("name")
+        except Exception:
+            name = None             # render() reports the problem when this device is asked for
+        return stamp, str(name) if name else default
+
+    def resolve(self, key: str) -> Optional[str]:
+        """Device name for a hostname, serial or MAC; None if unknown."""
+        norm = normalise_key(key)
+        with self._lock:
+            self._reload_inventory()
+            self._reload_names()
+            name = self._aliases.get(norm) or self._names.get(norm)
+            if name is None:
+                # maybe a YAML was edited in place to a new device.name; re-parse changed files
+                self._reload_names(force=True)
+                name = self._names.get(norm)
+            return name
+
+    # ---------- device name -> config ----------
+
+    def _stale(self, name: str, stat: Optional[os.stat_result]) -> bool:
+        source = self._sources.get(name)
+        if not self.render_on_demand or source is None:
+            return False
+        try:
+            st = os.stat(source)
+        except FileNotFoundError:
+            return False
+        cached = self._yaml_names.get(source)
+        if cached is None or cached[0] != (st.st_mtime_ns, st.st_size):
+            with self._lock:
+                self._reload_names(force=True)      # YAML changed: its device.name may have too
+                if self._sources.get(name) != source:
+                    return False                    # renamed away from `name`
+        mtime_ns = st.st_mtime_ns
+        failed = self._failed.get(name)
+        if failed is not None and failed[0] == mtime_ns:
+            return False                    # already failed on this version of the YAML
+        return stat is None or mtime_ns > stat.st_mtime_ns
+
+    def _render(self, name: str) -> None:
+        """Re-render one device; concurrent callers for the same device wait for the first."""
+        with self._lock:
+            lock = self._render_locks.setdefault(name, threading.Lock())
+        with lock:
+            path = os.path.join(self.configs_dir, f"{name}.cfg")
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                stat = None
+            if not self._stale(name, stat):
+                return                      # someone else rendered it while we waited
+            if REPO_ROOT not in sys.path:
+                sys.path.insert(0, REPO_ROOT)
+            import generate_config
+            source, mtime_ns = self._sources[name], None
+            try:
+                mtime_ns = os.stat(source).st_mtime_ns
+                with timing.span("render", device=name):
+                    out_name, text, _ = generate_config.render(source)
+            except (SystemExit, Exception) as e:
+                # keep serving the last good config (if any) rather than nothing
+                err = RenderError(name, e)
+                with self._lock:
+                    self.stats["render_errors"] += 1
+                    self._failed[name] = (mtime_ns, err)
+                log.error("%s", err)
+                return
+            os.makedirs(self.configs_dir, exist_ok=True)
+            generate_config.write_output(out_name, text, self.configs_dir)
+            with self._lock:
+                self.stats["renders"] += 1
+                self._failed.pop(name, None)
+
+    def get(self, name: str) -> Optional[Entry]:
+        """
+        Current config for a device name, rendering it first if stale. Raises
+        RenderError if rendering failed and there is no earlier config.
+        """
+        with self._lock:
+            self._reload_names()
+        path = os.path.join(self.configs_dir, f"{name}.cfg")
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            st = None
+        if self._stale(name, st):
+            self._render(name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                st = None
+        if st is None:
+            failed = self._failed.get(name)
+            if failed is not None:
+                raise failed[1]
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        entry = self._entries.get(name)
+        if entry is not None and entry.stat == stamp:
+            with self._lock:
+                self.stats["hits"] += 1
+            return entry
+        with open(path, "rb") as f:
+            body = f.read()
+            st = os.fstat(f.fileno())
+        entry = Entry(name, path, (st.st_mtime_ns, st.st_size), hashlib.sha1(body).hexdigest(),
+                      st.st_mtime, body)
+        with self._lock:
+            self._entries[name] = entry
+            self.stats["loads"] += 1
+        return entry
+
+    def lookup(self, keys: Iterable[str]) -> Optional[Entry]:
+        """First key (hostname/serial/MAC) that maps to a config."""
+        for key in keys:
+            name = self.resolve(key)
+            if name is not None:
+                entry = self.get(name)
+                if entry is not None:
+                    return entry
+        return None
+
+
+def open_entry(entry: Entry) -> BinaryIO:
+    """
+    The bytes entry.etag was computed over: the config file itself (so it can
+    be sendfile()d) while it still has the entry's stat, otherwise the body
+    held in memory (the file was re-rendered or removed since get()).
+    """
+    try:
+        f = open(entry.path, "rb")
+    except FileNotFoundError:
+        return io.BytesIO(entry.body)
+    st = os.fstat(f.fileno())
+    if (st.st_mtime_ns, st.st_size) == entry.stat:
+        return f
+    f.close()
+    return io.BytesIO(entry.body)
+
+
+# ---------- standalone server ----------
+
+def make_server(store: ConfigStore, host: str = "0.0.0.0", port: int = 8080, backlog: int = 1024):
+    """ThreadingHTTPServer for /ztp/<key>; a listen backlog sized for a site powering up at once."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, unquote, urlsplit
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        server_version = "netman-ztp"
+
+        def _serve(self, with_body: bool) -> None:
+            url = urlsplit(self.path)
+            parts = [p for p in url.path.split("/") if p]
+            if not parts or parts[0] != "ztp" or len(parts) > 2:
+                return self._plain(404, "not found\n", with_body)
+            args = {k: v[0] for k, v in parse_qs(url.query).items()}
+            try:
+                entry = store.lookup(request_keys(unquote(parts[1]) if len(parts) == 2 else None,
+                                                  args, self.headers))
+            except RenderError as e:
+                return self._plain(500, f"render failed: {e.kind}\n", with_body)
+            if entry is None:
+                return self._plain(404, "unknown device\n", with_body)
+            if etag_matches(self.headers.get("If-None-Match"), entry.etag):
+                self.send_response(304)
+                self.send_header("ETag", f'"{entry.etag}"')
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            with open_entry(entry) as f:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Content-Length", str(entry.stat[1]))
+                self.send_header("ETag", f'"{entry.etag}"')
+                self.send_header("Last-Modified", self.date_time_string(entry.mtime))
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                if with_body:
+                    if isinstance(f, io.BytesIO):
+                        self.wfile.write(entry.body)
+                    else:
+                        self.connection.sendfile(f)
+
+        def _plain(self, code: int, text: str, with_body: bool) -> None:
+            body = text.encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if with_body:
+                self.wfile.write(body)
+
+        def do_GET(self):
+            self._serve(True)
+
+        def do_HEAD(self):
+            self._serve(False)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = backlog
+
+    return Server((host, port), Handler)
+
+
+# ---------- load test ----------
+
+def bench(url: str, keys: List[str], concurrency: int, rounds: int, revalidate: bool) -> Dict:
+    """
+    `concurrency` clients released together (a site powering up), each doing
+    `rounds` fetches on a fresh connection; with `revalidate` every fetch after
+    the first sends If-None-Match. Returns counts and latency percentiles.
+    """
+    import http.client
+    from urllib.parse import urlsplit
+
+    u = urlsplit(url)
+    start_line = threading.Barrier(concurrency)
+    latencies: List[float] = []
+    codes: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def client(i: int) -> None:
+        key = keys[i % len(keys)]
+        etag = None
+        mine, seen = [], {}
+        start_line.wait()
+        for _ in range(rounds):
+            headers = {"If-None-Match": etag} if revalidate and etag else {}
+            t0 = time.perf_counter()
+            try:
+                conn = http.client.HTTPConnection(u.hostname, u.port or 80, timeout=30)
+                conn.request("GET", f"{u.path.rstrip('/')}/ztp/{key}", headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                conn.close()
+                code = str(resp.status)
+                etag = resp.getheader("ETag") or etag
+            except Exception as e:
+                code = type(e).__name__
+            mine.append(time.perf_counter() - t0)
+            seen[code] = seen.get(code, 0) + 1
+        with lock:
+            latencies.extend(mine)
+            for code, n in seen.items():
+                codes[code] = codes.get(code, 0) + n
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+    return {"requests": len(latencies), "elapsed": elapsed, "rps": len(latencies) / elapsed,
+            "codes": codes, "p50_ms": pct(0.50), "p99_ms": pct(0.99), "max_ms": latencies[-1] * 1000}
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Serve generated configs to ZTP clients.")
+    ap.add_argument("--configs-dir", default=CONFIGS_DIR)
+    ap.add_argument("--inventory", default=INVENTORY_PATH, help="serial/MAC -> device name YAML")
+    ap.add_argument("--no-render", action="store_true",
+                    help="Serve generated-configs as they are; never render from data/devices")
+    sub = ap.add_subparsers(dest="action", required=True)
+    s = sub.add_parser("serve", help="Run the standalone server")
+    s.add_argument("--host", default="0.0.0.0")
+    s.add_argument("--port", type=int, default=8080)
+    b = sub.add_parser("bench", help="Load-test a server (a local one on a free port by default)")
+    b.add_argument("--url", help="Server to test, e.g. http://127.0.0.1:5000 for the GUI")
+    b.add_argument("--concurrency", type=int, default=300)
+    b.add_argument("--rounds", type=int, default=10, help="Fetches per client")
+    b.add_argument("--keys", nargs="*", help="Keys to fetch (default: every generated config)")
+    b.add_argument("--no-revalidate", action="store_true", help="Never send If-None-Match")
+    args = ap.parse_args(argv)
+
+    store = ConfigStore(args.configs_dir, inventory_path=args.inventory, render=not args.no_render)
+
+    if args.action == "serve":
+        server = make_server(store, args.host, args.port)
+        print(f"serving {args.configs_dir} on http://{args.host}:{args.port}/ztp/<hostname|serial|mac>")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+
+    keys = args.keys or sorted(fn[:-4] for fn in os.listdir(args.configs_dir) if fn.endswith(".cfg"))
+    if not keys:
+        print(f"No configs in {args.configs_dir}")
+        return 2
+    server = None
+    url = args.url
+    if url is None:
+        server = make_server(store, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        r = bench(url, keys, args.concurrency, args.rounds, not args.no_revalidate)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    codes = ", ".join(f"{k}: {v}" for k, v in sorted(r["codes"].items()))
+    print(f"{r['requests']} requests from {args.concurrency} clients in {r['elapsed']:.2f}s "
+          f"({r['rps']:,.0f} req/s); p50 {r['p50_ms']:.1f} ms, p99 {r['p99_ms']:.1f} ms, "
+          f"max {r['max_ms']:.1f} ms; {codes}")
+    if server is not None:
+        print(f"cache: {store.stats}")
+    return 0 if set(r["codes"]) <= {"200", "304"} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())